@@ -0,0 +1,12 @@
+import pytest
+
+from packages.shared.loop_watchdog import forbid_blocking_io, strict_mode
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """Fail tests whose application code blocks the event loop (see packages/shared/loop_watchdog.py)."""
+    if not (strict_mode() or item.get_closest_marker("no_blocking_io")):
+        return (yield)
+    with forbid_blocking_io():
+        return (yield)
@@ -0,0 +1,17 @@
+import os
+import secrets
+
+from fastapi import Header, HTTPException
+
+
+async def require_admin(x_admin_token: str = Header("", alias="X-Admin-Token")) -> None:
+    """
+    Admin endpoints are only served when ADMIN_API_TOKEN is configured;
+    otherwise they behave as if they do not exist. Async so that checking the
+    header does not cost a threadpool hop.
+    """
+    expected = os.getenv("ADMIN_API_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
@@ -0,0 +1,109 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from packages.shared.event_feed import Subscription, get_event_hub
+from packages.shared.transcript_logger import TranscriptLogger
+
+router = APIRouter(prefix="/campaigns", tags=["campaigns"])
+
+SSE_KEEPALIVE_SECONDS = 15  # Comment line sent when a feed is quiet
+WS_CLOSE_TRY_AGAIN_LATER = 1013  # Close code used when a slow consumer is dropped
+
+
+def _validate(campaign_id: str) -> None:
+    if not TranscriptLogger._is_valid_campaign_id(campaign_id):
+        raise HTTPException(status_code=400, detail=f"Invalid campaign_id: {campaign_id!r}")
+
+
+def _format_sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_stream(subscription: Subscription, keepalive: float = SSE_KEEPALIVE_SECONDS):
+    """Render a subscription as server-sent events until it ends or is dropped."""
+    try:
+        if subscription.missed_events:
+            yield _format_sse("gap", {"campaign_id": subscription.campaign_id})
+        iterator = subscription.__aiter__()
+        pending = None
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=keepalive)
+            if not done:
+                yield ": keepalive\n\n"
+                continue
+            try:
+                event = pending.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+            yield _format_sse("transcript", event, event["seq"])
+        if subscription.dropped:
+            yield _format_sse("dropped", {"reason": "consumer too slow, resume with Last-Event-ID"})
+    finally:
+        if pending is not None:
+            pending.cancel()
+        subscription.close()
+
+
+@router.get("/{campaign_id}/events", summary="Follow a campaign's live events (SSE)")
+async def campaign_events(
+    campaign_id: str,
+    since: Optional[int] = Query(None, description="Resume after this sequence number"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    _validate(campaign_id)
+    # Browsers resend Last-Event-ID when an EventSource reconnects
+    resume_from = last_event_id if last_event_id is not None else since
+    subscription = get_event_hub().subscribe(campaign_id, since=resume_from)
+    return StreamingResponse(
+        sse_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{campaign_id}/ws")
+async def campaign_events_ws(
+    websocket: WebSocket,
+    campaign_id: str,
+    since: Optional[int] = Query(None),
+):
+    if not TranscriptLogger._is_valid_campaign_id(campaign_id):
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    subscription = get_event_hub().subscribe(campaign_id, since=since)
+
+    async def close_on_disconnect():
+        # Followers only listen; ending the subscription ends the send loop
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+
+    watcher = asyncio.create_task(close_on_disconnect())
+    try:
+        if subscription.missed_events:
+            await websocket.send_json({"type": "gap", "campaign_id": campaign_id})
+        async for event in subscription:
+            await websocket.send_json({"type": "transcript", **event})
+        if subscription.dropped:
+            await websocket.close(code=WS_CLOSE_TRY_AGAIN_LATER)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        subscription.close()
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import os
+import re
+import zlib
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+
+from packages.shared.campaign_archive import restore_if_archived
+from packages.shared.transcript_logger import (
+    JsonlTranscriptStore,
+    TranscriptLogger,
+    transcript_segments,
+)
+from packages.shared.transcript_store import create_transcript_store
+
+router = APIRouter(prefix="/campaigns", tags=["campaigns"])
+
+EXPORT_CHUNK_SIZE = 64 * 1024  # Bytes read (and compressed) per step
+MEDIA_TYPE = "application/x-ndjson"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range: bytes=...` header into an inclusive
+    (start, end). Returns None to serve the whole body (no header, or a form
+    this endpoint does not support such as multiple ranges); raises 416 if
+    the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _open_segments(paths: List[str]) -> Tuple[List[BinaryIO], List[int]]:
+    # Opening every segment up front pins them: a rotation (rename) or the
+    # removal of the oldest segment during the download does not affect open
+    # handles. Sizes are fixed now so entries appended later are not mixed in.
+    files, sizes = [], []
+    try:
+        for path in paths:
+            f = open(path, "rb")
+            files.append(f)
+            sizes.append(os.fstat(f.fileno()).st_size)
+    except FileNotFoundError:
+        # Rotated away between listing and opening; the caller retries
+        for f in files:
+            f.close()
+        raise
+    return files, sizes
+
+
+def _read_at(f: BinaryIO, position: int, length: int) -> bytes:
+    f.seek(position)
+    return f.read(length)
+
+
+async def _stream_segments(
+    files: List[BinaryIO], sizes: List[int], start: int, end: int
+) -> AsyncIterator[bytes]:
+    """Bytes start..end (inclusive) of the concatenated segments, chunk by chunk."""
+    try:
+        offset = 0
+        for f, size in zip(files, sizes):
+            position = max(start - offset, 0)
+            stop = min(end + 1 - offset, size)
+            while position < stop:
+                data = await asyncio.to_thread(
+                    _read_at, f, position, min(EXPORT_CHUNK_SIZE, stop - position)
+                )
+                if not data:
+                    break
+                yield data
+                position += len(data)
+            offset += size
+    finally:
+        for f in files:
+            f.close()
+
+
+def _entry_chunks(store, campaign_id: str) -> Iterator[bytes]:
+    """JSONL export of a non-file store, in chunks of about EXPORT_CHUNK_SIZE."""
+    buffer = bytearray()
+    for entry in store.iter_entries(campaign_id):
+        buffer += json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n"
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a byte stream one bounded chunk at a time, off the event loop."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    async for chunk in chunks:
+        compressed = await asyncio.to_thread(compressor.compress, chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _attachment(filename: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+@router.get("/{campaign_id}/transcript", summary="Download a campaign's full transcript")
+async def download_transcript(
+    campaign_id: str,
+    gzip: bool = Query(False, description="Compress the export on the fly"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+):
+    if not TranscriptLogger._is_valid_campaign_id(campaign_id):
+        raise HTTPException(status_code=400, detail=f"Invalid campaign_id: {campaign_id!r}")
+    filename = f"{campaign_id}-transcript.jsonl"
+
+    store = create_transcript_store()
+    if not isinstance(store, JsonlTranscriptStore):
+        # Database-backed stores are exported entry by entry; no byte ranges.
+        # A per-campaign count uses the (campaign_id, timestamp) index, and
+        # the segment store's restores an archived campaign first
+        if not await asyncio.to_thread(store.count, campaign_id):
+            raise HTTPException(status_code=404, detail="Transcript not found.")
+        body = iterate_in_threadpool(_entry_chunks(store, campaign_id))
+        if gzip:
+            return StreamingResponse(
+                _gzip(body), media_type="application/gzip", headers=_attachment(filename + ".gz")
+            )
+        return StreamingResponse(body, media_type=MEDIA_TYPE, headers=_attachment(filename))
+
+    await asyncio.to_thread(restore_if_archived, campaign_id, store.base_dir)
+    for _ in range(3):
+        paths = transcript_segments(campaign_id, store.base_dir)
+        if not paths:
+            raise HTTPException(status_code=404, detail="Transcript not found.")
+        if len(paths) == 1 and not gzip:
+            # Starlette serves Range requests itself and uses the server's
+            # zero-copy path (ASGI pathsend) where available
+            return FileResponse(paths[0], media_type=MEDIA_TYPE, filename=filename)
+        try:
+            files, sizes = await asyncio.to_thread(_open_segments, paths)
+            break
+        except FileNotFoundError:
+            continue
+    else:
+        raise HTTPException(status_code=503, detail="Transcript is being rotated, retry.")
+
+    total = sum(sizes)
+    if gzip:
+        return StreamingResponse(
+            _gzip(_stream_segments(files, sizes, 0, total - 1)),
+            media_type="application/gzip",
+            headers=_attachment(filename + ".gz"),
+        )
+
+    try:
+        byte_range = parse_range(range_header, total)
+    except HTTPException:
+        for f in files:
+            f.close()
+        raise
+    headers = {**_attachment(filename), "Accept-Ranges": "bytes"}
+    if byte_range is None:
+        start, end, status = 0, total - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _stream_segments(files, sizes, start, end),
+        status_code=status,
+        media_type=MEDIA_TYPE,
+        headers=headers,
+    )
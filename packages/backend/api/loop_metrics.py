@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+
+from packages.backend.api.admin_auth import require_admin
+from packages.shared.loop_watchdog import get_loop_watchdog
+
+router = APIRouter(prefix="/admin/loop-lag", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("", summary="Event-loop lag percentiles and stall count")
+async def loop_lag():
+    # Async on purpose: the numbers describe this loop, and a threadpool hop
+    # would add to the latency being measured
+    watchdog = get_loop_watchdog()
+    return {"enabled": watchdog.enabled, **watchdog.metrics()}
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from packages.backend.api.admin_auth import require_admin
+from packages.shared.profiling import get_profiler
+
+
+def _require_profiling() -> None:
+    """Profiles are only served when profiling is enabled; otherwise the endpoints do not exist."""
+    if not get_profiler().enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["admin"],
+    dependencies=[Depends(_require_profiling), Depends(require_admin)],
+)
+
+
+@router.get("", summary="List recent profiles")
+def list_profiles():
+    return {"profiles": get_profiler().list_profiles()}
+
+
+@router.get("/{name}", summary="Download a profile dump")
+def get_profile(name: str):
+    path = get_profiler().profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {name!r} not found.")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException, Path
+from functools import lru_cache
+
+from fastapi import APIRouter, Depends, HTTPException, Path
 from packages.shared.models import ServerConfigModel, ServerConfig
 from packages.backend.components.api_key_service import APIKeyService
 from packages.shared.error_handler import (
@@ -9,16 +11,35 @@ from packages.shared.error_handler import (
 )
 import os
 
-# Initialize services (should be refactored for DI in production)
 from packages.backend.components.server_settings_manager import ServerSettingsManager
 
 
 router = APIRouter()
 
-settings_manager = ServerSettingsManager(
-    db_path=os.getenv("SERVER_SETTINGS_DB", "server_settings.db")
-)
-api_key_service = APIKeyService(manager=settings_manager)
+
+@lru_cache(maxsize=1)
+def get_settings_manager() -> ServerSettingsManager:
+    """
+    Process-wide settings manager, created on first use (or during app
+    startup) rather than at import time. Override with
+    app.dependency_overrides in tests and tools.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()  # ENCRYPTION_KEY may come from .env
+    if int(os.getenv("BACKEND_WORKERS", "1")) > 1 and not os.getenv("ENCRYPTION_KEY"):
+        # Each worker would otherwise generate its own key and be unable to
+        # decrypt keys stored by the others
+        raise RuntimeError("ENCRYPTION_KEY must be set when BACKEND_WORKERS > 1.")
+    return ServerSettingsManager(
+        db_path=os.getenv("SERVER_SETTINGS_DB", "server_settings.db")
+    )
+
+
+def get_api_key_service(
+    manager: ServerSettingsManager = Depends(get_settings_manager),
+) -> APIKeyService:
+    return APIKeyService(manager=manager)
 
 
 @router.put(
@@ -28,6 +49,7 @@ api_key_service = APIKeyService(manager=settings_manager)
 def set_server_config(
     server_id: str = Path(..., description="The Discord server ID"),
     config: ServerConfigModel = ...,
+    api_key_service: APIKeyService = Depends(get_api_key_service),
 ):
     # Example validation: API key must be present and non-empty
     api_key_value = (
@@ -1,6 +1,6 @@
 from typing import Optional
 from packages.shared.models import ServerConfig
-from packages.backend.components.server_settings import ServerSettingsManager
+from packages.backend.components.server_settings_manager import ServerSettingsManager
 
 
 class APIKeyService:
@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from packages.shared import campaign_archive, transcript_logger
+from packages.shared.transcript_logger import TranscriptLogger
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INACTIVE_DAYS = 30
+DEFAULT_MAX_BYTES_PER_SECOND = 4 * 1024 * 1024
+DEFAULT_INTERVAL_SECONDS = 60 * 60
+INITIAL_DELAY_SECONDS = 60  # Let startup traffic settle before the first scan
+NICE_INCREMENT = 19  # Lowest CPU priority
+
+
+class _Stopping(Exception):
+    """Raised from the throttle to abandon the archive being packed when stopping."""
+
+
+class CampaignArchiver:
+    """
+    Background thread that archives campaigns with no activity for
+    `inactive_days` (see packages/shared/campaign_archive.py).
+
+    A campaign's last activity is the newest modification time of its
+    directory or any file in it. The thread lowers its own CPU priority and
+    paces its reads to `bytes_per_second`, so a scan never competes with live
+    transcript writes; campaigns are archived one at a time and a campaign
+    written to while being packed is skipped until the next scan. An
+    `inactive_days` of 0 disables archival.
+
+    Every backend worker runs an archiver; a scan only runs in the worker
+    holding the archive directory's archiver lock, and the others skip it.
+    On start, the thread sweeps directories a dead process left half
+    archived or restored.
+    """
+
+    def __init__(
+        self,
+        base_dir: Optional[str] = None,
+        inactive_days: Optional[float] = None,
+        bytes_per_second: Optional[int] = None,
+        interval_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._base_dir = base_dir
+        self.inactive_days = (
+            inactive_days
+            if inactive_days is not None
+            else float(os.getenv("ARCHIVE_INACTIVE_DAYS", DEFAULT_INACTIVE_DAYS))
+        )
+        self.bytes_per_second = bytes_per_second or int(
+            os.getenv("ARCHIVE_MAX_BYTES_PER_SECOND", DEFAULT_MAX_BYTES_PER_SECOND)
+        )
+        self.interval_seconds = interval_seconds or float(
+            os.getenv("ARCHIVE_INTERVAL_SECONDS", DEFAULT_INTERVAL_SECONDS)
+        )
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._budget = 0.0
+        self._budget_at = time.monotonic()
+
+    @property
+    def base_dir(self) -> str:
+        return self._base_dir or transcript_logger.LOG_BASE_DIR
+
+    @property
+    def enabled(self) -> bool:
+        return self.inactive_days > 0
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="campaign-archiver", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the thread. An archive being packed is abandoned; blocks until then."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        try:
+            # Linux applies the nice value per thread; elsewhere this fails
+            # and the thread keeps its priority
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), NICE_INCREMENT)
+        except (AttributeError, OSError):
+            pass
+        try:
+            swept = campaign_archive.sweep_staging(self.base_dir)
+        except OSError:
+            logger.exception("Sweeping the campaign staging directory failed")
+        else:
+            if swept:
+                logger.info("Removed stale staging directories", extra={"count": swept})
+        if self._stop.wait(INITIAL_DELAY_SECONDS):
+            return
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Campaign archive scan failed")
+            self._stop.wait(self.interval_seconds)
+
+    def _throttle(self, nbytes: int) -> None:
+        """Token bucket of `bytes_per_second` holding at most one second of burst."""
+        if self._stop.is_set():
+            raise _Stopping()
+        now = time.monotonic()
+        self._budget = min(
+            self._budget + (now - self._budget_at) * self.bytes_per_second,
+            self.bytes_per_second,
+        )
+        self._budget_at = now
+        self._budget -= nbytes
+        if self._budget < 0:
+            self._stop.wait(-self._budget / self.bytes_per_second)
+
+    def last_activity(self, campaign_id: str) -> float:
+        directory = os.path.join(self.base_dir, campaign_id)
+        latest = os.stat(directory).st_mtime
+        for root, _, files in os.walk(directory):
+            for name in files:
+                latest = max(latest, os.stat(os.path.join(root, name)).st_mtime)
+        return latest
+
+    def inactive_campaigns(self) -> List[str]:
+        cutoff = self._clock() - self.inactive_days * 86400
+        try:
+            names = sorted(os.listdir(self.base_dir))
+        except FileNotFoundError:
+            return []
+        inactive = []
+        for name in names:
+            if not TranscriptLogger._is_valid_campaign_id(name):
+                continue
+            if not os.path.isdir(os.path.join(self.base_dir, name)):
+                continue
+            try:
+                if self.last_activity(name) < cutoff:
+                    inactive.append(name)
+            except FileNotFoundError:
+                continue  # Archived or removed meanwhile
+        return inactive
+
+    def run_once(self) -> Dict[str, List[str]]:
+        """Archive every inactive campaign. Returns the archived and skipped IDs."""
+        archived, skipped = [], []
+        if not self.enabled:
+            return {"archived": archived, "skipped": skipped}
+        with campaign_archive.archiver_lock(self.base_dir) as acquired:
+            if not acquired:
+                logger.debug("Another process is archiving campaigns; skipping this scan")
+                return {"archived": archived, "skipped": skipped}
+            self._archive_inactive(archived, skipped)
+        return {"archived": archived, "skipped": skipped}
+
+    def _archive_inactive(self, archived: List[str], skipped: List[str]) -> None:
+        for campaign_id in self.inactive_campaigns():
+            if self._stop.is_set():
+                break
+            try:
+                size = campaign_archive.archive_campaign(
+                    campaign_id, self.base_dir, throttle=self._throttle
+                )
+            except _Stopping:
+                break
+            if size is None:
+                skipped.append(campaign_id)
+                continue
+            archived.append(campaign_id)
+            logger.info(
+                "Archived inactive campaign",
+                extra={"campaign_id": campaign_id, "archive_bytes": size},
+            )
@@ -0,0 +1,226 @@
+import copy
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from packages.shared.error_handler import NotFoundError
+from packages.shared import campaign_archive, transcript_logger
+from packages.shared.campaign_paths import get_campaign_paths
+
+CHECKPOINT_DIR_NAME = "checkpoints"
+DEFAULT_SNAPSHOT_INTERVAL = 20  # Turns between full snapshots
+DEFAULT_KEEP_SNAPSHOTS = 10  # Older snapshot segments are pruned
+
+_SNAPSHOT_RE = re.compile(r"^snapshot-(\d{8})\.json$")
+
+_MISSING = object()
+
+
+def diff_state(old: Any, new: Any, path: Tuple = ()) -> List[list]:
+    """
+    Structural diff between two JSON-like values.
+
+    Dicts are compared key by key so only changed leaves are emitted; any
+    other changed value (lists, scalars) is replaced whole. Returns a list of
+    ["set", path, value] and ["del", path] operations.
+    """
+    if old is new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[list] = []
+        for key in old.keys() - new.keys():
+            ops.append(["del", list(path + (key,))])
+        for key, value in new.items():
+            previous = old.get(key, _MISSING)
+            if previous is _MISSING:
+                ops.append(["set", list(path + (key,)), value])
+            else:
+                ops.extend(diff_state(previous, value, path + (key,)))
+        return ops
+    if old == new:
+        return []
+    return [["set", list(path), new]]
+
+
+def apply_diff(state: Any, ops: List[list]) -> Any:
+    """Apply operations produced by diff_state, returning the updated state."""
+    for op in ops:
+        kind, path = op[0], op[1]
+        if not path:
+            state = copy.deepcopy(op[2]) if kind == "set" else None
+            continue
+        target = state
+        for key in path[:-1]:
+            target = target[key]
+        if kind == "set":
+            target[path[-1]] = copy.deepcopy(op[2])
+        else:
+            target.pop(path[-1], None)
+    return state
+
+
+class CampaignCheckpointStore:
+    """
+    Per-turn checkpoints of campaign state under
+    data/saves/<campaign_id>/checkpoints/.
+
+    Each turn appends only its structural diff to the current segment's
+    diffs file. Every `snapshot_interval` turns a full snapshot starts a new
+    segment, so restoring any turn loads the nearest snapshot and replays at
+    most `snapshot_interval - 1` diffs.
+    """
+
+    def __init__(
+        self,
+        campaign_id: str,
+        base_dir: Optional[str] = None,
+        snapshot_interval: Optional[int] = None,
+        keep_snapshots: Optional[int] = None,
+    ):
+        self.base_dir = base_dir or transcript_logger.LOG_BASE_DIR
+        # Raises ValidationError for an invalid campaign ID
+        self.directory = get_campaign_paths().path(campaign_id, self.base_dir, CHECKPOINT_DIR_NAME)
+        self.campaign_id = campaign_id
+        self.snapshot_interval = snapshot_interval or int(
+            os.getenv("CHECKPOINT_SNAPSHOT_INTERVAL", DEFAULT_SNAPSHOT_INTERVAL)
+        )
+        self.keep_snapshots = keep_snapshots or DEFAULT_KEEP_SNAPSHOTS
+        self._lock = threading.Lock()
+        self._last_state: Any = None
+        self._last_turn = 0
+        self._segment_turn = 0  # Turn of the snapshot the current segment starts from
+        self._loaded = False
+
+    def _snapshot_path(self, turn: int) -> str:
+        return os.path.join(self.directory, f"snapshot-{turn:08d}.json")
+
+    def _diffs_path(self, turn: int) -> str:
+        return os.path.join(self.directory, f"diffs-{turn:08d}.jsonl")
+
+    def _snapshot_turns(self) -> List[int]:
+        if not os.path.isdir(self.directory):
+            return []
+        turns = []
+        for name in os.listdir(self.directory):
+            match = _SNAPSHOT_RE.match(name)
+            if match:
+                turns.append(int(match.group(1)))
+        return sorted(turns)
+
+    def _ensure_loaded(self) -> None:
+        """Resume from whatever is already on disk (e.g. after a restart)."""
+        if self._loaded:
+            return
+        campaign_archive.restore_if_archived(self.campaign_id, self.base_dir)
+        turns = self._snapshot_turns()
+        if turns:
+            self._segment_turn = turns[-1]
+            self._last_state, self._last_turn = self._replay(turns[-1], None)
+        self._loaded = True
+
+    @property
+    def latest_turn(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._last_turn
+
+    def record(self, state: Dict[str, Any]) -> int:
+        """Checkpoint the state after a turn and return the new turn number."""
+        with self._lock:
+            self._ensure_loaded()
+            turn = self._last_turn + 1
+            os.makedirs(self.directory, exist_ok=True)
+            if self._segment_turn == 0 or turn - self._segment_turn >= self.snapshot_interval:
+                self._write_snapshot(turn, state)
+            else:
+                entry = {"turn": turn, "ops": diff_state(self._last_state, state)}
+                with open(self._diffs_path(self._segment_turn), "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._last_state = copy.deepcopy(state)
+            self._last_turn = turn
+            return turn
+
+    def restore(self, turn: int) -> Any:
+        """Return the state as it was after `turn`."""
+        with self._lock:
+            self._ensure_loaded()
+            base = self._base_snapshot(turn)
+            state, reached = self._replay(base, turn)
+            if reached != turn:
+                raise NotFoundError(f"No checkpoint for turn {turn}.")
+            return state
+
+    def rewind(self, turn: int) -> Any:
+        """Restore `turn` and discard every later checkpoint."""
+        with self._lock:
+            self._ensure_loaded()
+            base = self._base_snapshot(turn)
+            state, reached = self._replay(base, turn)
+            if reached != turn:
+                raise NotFoundError(f"No checkpoint for turn {turn}.")
+            for snapshot_turn in self._snapshot_turns():
+                if snapshot_turn > base:
+                    self._remove_segment(snapshot_turn)
+            self._truncate_diffs(base, turn)
+            self._segment_turn = base
+            self._last_state = copy.deepcopy(state)
+            self._last_turn = turn
+            return state
+
+    def _base_snapshot(self, turn: int) -> int:
+        if turn < 1 or turn > self._last_turn:
+            raise NotFoundError(f"No checkpoint for turn {turn}.")
+        candidates = [t for t in self._snapshot_turns() if t <= turn]
+        if not candidates:
+            raise NotFoundError(f"Checkpoint for turn {turn} has been pruned.")
+        return candidates[-1]
+
+    def _replay(self, base: int, until: Optional[int]) -> Tuple[Any, int]:
+        with open(self._snapshot_path(base), "r", encoding="utf-8") as f:
+            state = json.load(f)
+        reached = base
+        if until == base:
+            return state, reached
+        try:
+            with open(self._diffs_path(base), "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if until is not None and entry["turn"] > until:
+                        break
+                    state = apply_diff(state, entry["ops"])
+                    reached = entry["turn"]
+        except FileNotFoundError:
+            pass
+        return state, reached
+
+    def _write_snapshot(self, turn: int, state: Any) -> None:
+        path = self._snapshot_path(turn)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._segment_turn = turn
+        for old_turn in self._snapshot_turns()[: -self.keep_snapshots]:
+            self._remove_segment(old_turn)
+
+    def _remove_segment(self, turn: int) -> None:
+        for path in (self._snapshot_path(turn), self._diffs_path(turn)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _truncate_diffs(self, base: int, turn: int) -> None:
+        path = self._diffs_path(base)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            kept = [line for line in f if line.strip() and json.loads(line)["turn"] <= turn]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(tmp_path, path)
@@ -1 +1,115 @@
-# placeholder for campaign memory
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from packages.shared.error_handler import ValidationError
+from packages.shared import campaign_archive, transcript_logger
+from packages.shared.campaign_paths import get_campaign_paths
+
+MEMORY_INDEX_FILE_NAME = "memory_index.json"
+# Bump when the index layout or tokenization changes; indexes built with an
+# older version must be rebuilt (see packages/backend/tools/rebuild_memory.py)
+MEMORY_INDEX_VERSION = 1
+MIN_TERM_LENGTH = 3
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class CampaignMemoryIndex:
+    """
+    Minimal retrieval index over a campaign transcript.
+
+    Entries are numbered in transcript order. The index keeps an inverted
+    index of terms to entry numbers, per-author message counts and the
+    timestamp of the last entry. It is stored as
+    data/saves/<campaign_id>/memory_index.json.
+    """
+
+    def __init__(self):
+        self.entry_count = 0
+        self.last_timestamp: Optional[str] = None
+        self.authors: Counter = Counter()
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Distinct lowercase terms of a message, in first-seen order."""
+        terms = (t.lower() for t in _TERM_RE.findall(text))
+        return list(dict.fromkeys(t for t in terms if len(t) >= MIN_TERM_LENGTH))
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Index one transcript entry ({"timestamp", "author", "message"})."""
+        number = self.entry_count
+        self.entry_count += 1
+        self.last_timestamp = entry.get("timestamp", self.last_timestamp)
+        self.authors[entry.get("author", "")] += 1
+        for term in self.tokenize(str(entry.get("message", ""))):
+            self.postings[term].append(number)
+
+    def search(self, query: str, limit: int = 10) -> List[int]:
+        """Entry numbers containing every query term, most recent first."""
+        terms = self.tokenize(query)
+        if not terms:
+            return []
+        matches = set(self.postings.get(terms[0], ()))
+        for term in terms[1:]:
+            matches.intersection_update(self.postings.get(term, ()))
+        return sorted(matches, reverse=True)[:limit]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": MEMORY_INDEX_VERSION,
+            "entry_count": self.entry_count,
+            "last_timestamp": self.last_timestamp,
+            "authors": dict(self.authors),
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CampaignMemoryIndex":
+        if data.get("version") != MEMORY_INDEX_VERSION:
+            raise ValidationError(
+                f"Memory index version {data.get('version')} is not "
+                f"{MEMORY_INDEX_VERSION}; rebuild it from the transcript."
+            )
+        index = cls()
+        index.entry_count = data["entry_count"]
+        index.last_timestamp = data["last_timestamp"]
+        index.authors.update(data["authors"])
+        index.postings.update(data["postings"])
+        return index
+
+
+def memory_index_path(campaign_id: str, base_dir: Optional[str] = None) -> str:
+    """Raises ValidationError for an invalid campaign ID."""
+    return get_campaign_paths().path(
+        campaign_id, base_dir or transcript_logger.LOG_BASE_DIR, MEMORY_INDEX_FILE_NAME
+    )
+
+
+def save_memory_index(
+    campaign_id: str, index: CampaignMemoryIndex, base_dir: Optional[str] = None
+) -> str:
+    """Write a campaign's index atomically. Returns its path."""
+    path = memory_index_path(campaign_id, base_dir)
+    get_campaign_paths().ensure_dir(campaign_id, base_dir or transcript_logger.LOG_BASE_DIR)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_memory_index(
+    campaign_id: str, base_dir: Optional[str] = None
+) -> Optional[CampaignMemoryIndex]:
+    """Load a campaign's index, or None if it has not been built."""
+    path = memory_index_path(campaign_id, base_dir)
+    campaign_archive.restore_if_archived(campaign_id, base_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return CampaignMemoryIndex.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,296 @@
+import heapq
+import struct
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from packages.shared.error_handler import NotFoundError, ValidationError
+
+SIDES = ("party", "monsters")
+MAX_UNDO = 20
+
+_MAGIC = b"CMB1"
+_HEADER = struct.Struct("<4sIII")  # magic, round, next sequence, combatant count
+_RECORD = struct.Struct("<BiihhhIB")  # side, hp, max hp, ac, initiative, tiebreak, seq, turn state
+_LENGTH = struct.Struct("<H")
+
+# Turn state of a combatant within the current round
+_PENDING, _ACTED, _CURRENT = 0, 1, 2
+
+OrderKey = Tuple[int, int, int, str]
+
+
+class CombatantRecord:
+    """Mutable per-combatant state. Uses __slots__ to keep large battles compact."""
+
+    __slots__ = (
+        "combatant_id",
+        "name",
+        "side",
+        "hit_points",
+        "max_hit_points",
+        "armor_class",
+        "initiative",
+        "tiebreak",
+        "seq",
+        "conditions",
+    )
+
+    def __init__(
+        self,
+        combatant_id: str,
+        name: str,
+        side: str,
+        hit_points: int,
+        armor_class: int,
+        initiative: int,
+        tiebreak: int = 0,
+        max_hit_points: Optional[int] = None,
+        conditions: Tuple[str, ...] = (),
+    ):
+        if side not in SIDES:
+            raise ValidationError(f"Side must be one of {SIDES}.")
+        self.combatant_id = combatant_id
+        self.name = name
+        self.side = side
+        self.hit_points = hit_points
+        self.max_hit_points = hit_points if max_hit_points is None else max_hit_points
+        self.armor_class = armor_class
+        self.initiative = initiative
+        self.tiebreak = tiebreak  # Usually the dexterity modifier
+        self.seq = 0
+        self.conditions = tuple(conditions)
+
+    @property
+    def is_down(self) -> bool:
+        return self.hit_points <= 0
+
+    def order_key(self) -> OrderKey:
+        # Heap pops the smallest key: highest initiative, then highest tiebreak,
+        # then whoever joined first
+        return (-self.initiative, -self.tiebreak, self.seq, self.combatant_id)
+
+
+class InitiativeOrder:
+    """
+    Turn order for one encounter.
+
+    Combatants still to act this round live in one heap and those who have
+    already acted in another, so advancing a turn, adding a combatant and
+    removing one are all O(log n). Removal is lazy: stale heap entries are
+    discarded when they reach the top.
+    """
+
+    def __init__(self):
+        self._pending: List[OrderKey] = []
+        self._acted: List[OrderKey] = []
+        self._live: Dict[str, OrderKey] = {}
+        self._acted_ids: set = set()
+        self._cursor: Optional[OrderKey] = None  # Last key to take a turn this round
+        self.current: Optional[OrderKey] = None
+        self.round = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def add(self, key: OrderKey, acted: bool = False) -> None:
+        self._live[key[3]] = key
+        if acted:
+            self._acted_ids.add(key[3])
+        heapq.heappush(self._acted if acted else self._pending, key)
+
+    def remove(self, combatant_id: str) -> None:
+        key = self._live.pop(combatant_id, None)
+        self._acted_ids.discard(combatant_id)
+        if self.current is not None and self.current == key:
+            self.current = None
+
+    def has_acted(self, key: OrderKey) -> bool:
+        """Whether a combatant joining now, with this key, already missed its slot."""
+        return self._cursor is not None and key < self._cursor
+
+    def _pop_live(self, heap: List[OrderKey]) -> Optional[OrderKey]:
+        while heap:
+            key = heapq.heappop(heap)
+            if self._live.get(key[3]) == key:
+                return key
+        return None
+
+    def advance(self) -> Optional[str]:
+        """End the current turn and return the id of the next combatant to act."""
+        if self.current is not None and self._live.get(self.current[3]) == self.current:
+            heapq.heappush(self._acted, self.current)
+            self._acted_ids.add(self.current[3])
+        self.current = self._pop_live(self._pending)
+        if self.current is None:
+            self._pending, self._acted = self._acted, []
+            self._acted_ids.clear()
+            self.round += 1
+            self.current = self._pop_live(self._pending)
+        elif self.round == 0:
+            self.round = 1
+        self._cursor = self.current
+        return self.current[3] if self.current is not None else None
+
+    def turn_state(self, combatant_id: str) -> int:
+        if self.current is not None and self.current[3] == combatant_id:
+            return _CURRENT
+        return _ACTED if combatant_id in self._acted_ids else _PENDING
+
+    def upcoming(self) -> List[str]:
+        """Ids in the order they will act from now on (O(n log n), for display)."""
+        pending = sorted(k for k in self._live.values() if self.turn_state(k[3]) == _PENDING)
+        acted = sorted(k for k in self._live.values() if self.turn_state(k[3]) == _ACTED)
+        head = [self.current[3]] if self.current is not None else []
+        return head + [k[3] for k in pending] + [k[3] for k in acted]
+
+
+class CombatState:
+    """
+    Live encounter state: slotted combatant records plus initiative order,
+    with compact binary serialization for per-turn checkpoints and a bounded
+    undo stack built on the same snapshots.
+    """
+
+    def __init__(self):
+        self._combatants: Dict[str, CombatantRecord] = {}
+        self._order = InitiativeOrder()
+        self._next_seq = 0
+        self._undo: deque = deque(maxlen=MAX_UNDO)
+
+    def __len__(self) -> int:
+        return len(self._combatants)
+
+    def __iter__(self) -> Iterator[CombatantRecord]:
+        return iter(self._combatants.values())
+
+    @property
+    def round(self) -> int:
+        return self._order.round
+
+    @property
+    def current(self) -> Optional[CombatantRecord]:
+        key = self._order.current
+        return self._combatants[key[3]] if key is not None else None
+
+    def get(self, combatant_id: str) -> CombatantRecord:
+        try:
+            return self._combatants[combatant_id]
+        except KeyError:
+            raise NotFoundError(f"Combatant {combatant_id!r} is not in this encounter.")
+
+    def add_combatant(self, record: CombatantRecord) -> None:
+        if record.combatant_id in self._combatants:
+            raise ValidationError(f"Combatant {record.combatant_id!r} already exists.")
+        record.seq = self._next_seq
+        self._next_seq += 1
+        self._combatants[record.combatant_id] = record
+        key = record.order_key()
+        self._order.add(key, acted=self._order.has_acted(key))
+
+    def remove_combatant(self, combatant_id: str) -> None:
+        self.get(combatant_id)
+        del self._combatants[combatant_id]
+        self._order.remove(combatant_id)
+
+    def next_turn(self) -> Optional[CombatantRecord]:
+        """Advance to the next combatant, starting a new round when needed."""
+        combatant_id = self._order.advance()
+        return self._combatants[combatant_id] if combatant_id is not None else None
+
+    def apply_damage(self, combatant_id: str, amount: int) -> int:
+        record = self.get(combatant_id)
+        record.hit_points = max(record.hit_points - max(amount, 0), 0)
+        return record.hit_points
+
+    def heal(self, combatant_id: str, amount: int) -> int:
+        record = self.get(combatant_id)
+        record.hit_points = min(record.hit_points + max(amount, 0), record.max_hit_points)
+        return record.hit_points
+
+    def turn_order(self) -> List[str]:
+        return self._order.upcoming()
+
+    # Snapshots and undo
+
+    def checkpoint(self) -> None:
+        """Push the current state onto the undo stack."""
+        self._undo.append(self.to_bytes())
+
+    def undo(self) -> None:
+        """Restore the most recent checkpoint."""
+        if not self._undo:
+            raise ValidationError("Nothing to undo.")
+        restored = CombatState.from_bytes(self._undo.pop())
+        self._combatants = restored._combatants
+        self._order = restored._order
+        self._next_seq = restored._next_seq
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact binary form (fixed-size records plus strings)."""
+        parts = [_HEADER.pack(_MAGIC, self._order.round, self._next_seq, len(self))]
+        for record in self._combatants.values():
+            parts.append(
+                _RECORD.pack(
+                    SIDES.index(record.side),
+                    record.hit_points,
+                    record.max_hit_points,
+                    record.armor_class,
+                    record.initiative,
+                    record.tiebreak,
+                    record.seq,
+                    self._order.turn_state(record.combatant_id),
+                )
+            )
+            for text in (record.combatant_id, record.name, ",".join(record.conditions)):
+                encoded = text.encode("utf-8")
+                parts.append(_LENGTH.pack(len(encoded)))
+                parts.append(encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CombatState":
+        magic, round_number, next_seq, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValidationError("Not a combat state snapshot.")
+        state = cls()
+        offset = _HEADER.size
+        pending: List[OrderKey] = []
+        acted: List[OrderKey] = []
+        for _ in range(count):
+            side, hp, max_hp, ac, init, tiebreak, seq, turn = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            texts = []
+            for _ in range(3):
+                (length,) = _LENGTH.unpack_from(data, offset)
+                offset += _LENGTH.size
+                texts.append(data[offset : offset + length].decode("utf-8"))
+                offset += length
+            combatant_id, name, conditions = texts
+            record = CombatantRecord(
+                combatant_id,
+                name,
+                SIDES[side],
+                hp,
+                ac,
+                init,
+                tiebreak,
+                max_hit_points=max_hp,
+                conditions=tuple(conditions.split(",")) if conditions else (),
+            )
+            record.seq = seq
+            state._combatants[combatant_id] = record
+            key = record.order_key()
+            state._order._live[combatant_id] = key
+            if turn == _CURRENT:
+                state._order.current = key
+            else:
+                (acted if turn == _ACTED else pending).append(key)
+        heapq.heapify(pending)
+        heapq.heapify(acted)
+        state._order._pending = pending
+        state._order._acted = acted
+        state._order._acted_ids = {key[3] for key in acted}
+        state._order._cursor = state._order.current or (max(acted) if acted else None)
+        state._order.round = round_number
+        state._next_seq = next_seq
+        return state
@@ -0,0 +1,242 @@
+import random
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from packages.shared.error_handler import ValidationError
+
+MAX_DICE_PER_TERM = 100
+MAX_DIE_SIDES = 1000
+MAX_EXPRESSION_LENGTH = 100
+SAMPLE_CHUNK_ROWS = 1 << 18  # Rows generated per NumPy batch when sampling
+DEFAULT_SAMPLES = 100_000
+
+_TERM_RE = re.compile(
+    r"""
+    (?P<sign>[+-])?
+    (?:
+        (?P<count>\d*)d(?P<sides>\d+|%)
+        (?P<mods>(?:(?:kh|kl|dh|dl|k|ro|r)\d+)*)
+      |
+        (?P<const>\d+)
+    )
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+_MOD_RE = re.compile(r"(kh|kl|dh|dl|ro|r|k)(\d+)", re.IGNORECASE)
+_OPERATOR_SPACING_RE = re.compile(r"\s*([+-])\s*")
+_MODE_SUFFIX_RE = re.compile(
+    r"\s+(adv|advantage|dis|disadvantage)\s*$", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    """A single `NdS` group with its keep and reroll modifiers."""
+
+    sign: int
+    count: int
+    sides: int
+    keep: int  # Number of dice kept after sorting
+    keep_highest: bool
+    reroll_at_most: int  # Reroll (once) any die showing this value or lower; 0 disables
+
+    def roll(self, rng: random.Random) -> Tuple[int, List[int], List[int]]:
+        """Roll the term once, returning (subtotal, all dice, kept dice)."""
+        dice = [rng.randint(1, self.sides) for _ in range(self.count)]
+        if self.reroll_at_most:
+            dice = [
+                rng.randint(1, self.sides) if d <= self.reroll_at_most else d
+                for d in dice
+            ]
+        kept = sorted(dice, reverse=self.keep_highest)[: self.keep]
+        return self.sign * sum(kept), dice, kept
+
+    def sample(self, rows: int, rng: np.random.Generator) -> np.ndarray:
+        """Vectorized subtotals for `rows` independent rolls of this term."""
+        dice = rng.integers(1, self.sides + 1, size=(rows, self.count), dtype=np.int32)
+        if self.reroll_at_most:
+            mask = dice <= self.reroll_at_most
+            rerolls = rng.integers(
+                1, self.sides + 1, size=int(mask.sum()), dtype=np.int32
+            )
+            dice[mask] = rerolls
+        if self.keep < self.count:
+            dice.sort(axis=1)
+            dice = dice[:, -self.keep :] if self.keep_highest else dice[:, : self.keep]
+        return self.sign * dice.sum(axis=1, dtype=np.int64)
+
+
+@dataclass
+class RollResult:
+    """Outcome of a single evaluated dice expression."""
+
+    expression: str
+    total: int
+    rolls: List[Dict]
+
+
+@dataclass(frozen=True)
+class DicePlan:
+    """
+    A dice expression compiled once into an evaluation plan.
+
+    The same plan can be evaluated as a single roll (for display to players)
+    or as NumPy-vectorized bulk samples (for probability queries).
+    """
+
+    expression: str
+    terms: Tuple[DiceTerm, ...]
+    constant: int
+
+    @property
+    def minimum(self) -> int:
+        return self.constant + sum(
+            t.keep * (1 if t.sign > 0 else -t.sides) for t in self.terms
+        )
+
+    @property
+    def maximum(self) -> int:
+        return self.constant + sum(
+            t.keep * (t.sides if t.sign > 0 else -1) for t in self.terms
+        )
+
+    def roll(self, rng: random.Random) -> RollResult:
+        total = self.constant
+        rolls = []
+        for term in self.terms:
+            subtotal, dice, kept = term.roll(rng)
+            total += subtotal
+            rolls.append(
+                {"die": f"d{term.sides}", "dice": dice, "kept": kept, "subtotal": subtotal}
+            )
+        return RollResult(expression=self.expression, total=total, rolls=rolls)
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """Return an int64 array with the totals of `n` independent rolls."""
+        if n <= 0:
+            raise ValidationError("Sample count must be a positive integer.")
+        totals = np.full(n, self.constant, dtype=np.int64)
+        for start in range(0, n, SAMPLE_CHUNK_ROWS):
+            stop = min(start + SAMPLE_CHUNK_ROWS, n)
+            for term in self.terms:
+                totals[start:stop] += term.sample(stop - start, rng)
+        return totals
+
+
+def _parse_term(match: "re.Match") -> Tuple[Optional[DiceTerm], int]:
+    sign = -1 if match.group("sign") == "-" else 1
+    if match.group("const") is not None:
+        return None, sign * int(match.group("const"))
+
+    count = int(match.group("count") or 1)
+    sides_raw = match.group("sides")
+    sides = 100 if sides_raw == "%" else int(sides_raw)
+    if not 1 <= count <= MAX_DICE_PER_TERM:
+        raise ValidationError(f"Dice count must be between 1 and {MAX_DICE_PER_TERM}.")
+    if not 2 <= sides <= MAX_DIE_SIDES:
+        raise ValidationError(f"Die sides must be between 2 and {MAX_DIE_SIDES}.")
+
+    keep, keep_highest, reroll_at_most = count, True, 0
+    for mod, value in _MOD_RE.findall(match.group("mods") or ""):
+        mod, value = mod.lower(), int(value)
+        if mod in ("kh", "k"):
+            keep, keep_highest = value, True
+        elif mod == "kl":
+            keep, keep_highest = value, False
+        elif mod == "dh":
+            keep, keep_highest = count - value, False
+        elif mod == "dl":
+            keep, keep_highest = count - value, True
+        else:  # "r" and "ro" both reroll once
+            reroll_at_most = value
+    if not 1 <= keep <= count:
+        raise ValidationError("Keep/drop modifiers must leave at least one die.")
+    if reroll_at_most >= sides:
+        raise ValidationError("Reroll threshold must be lower than the die size.")
+    term = DiceTerm(sign, count, sides, keep, keep_highest, reroll_at_most)
+    return term, 0
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> DicePlan:
+    """
+    Parse a dice expression such as `4d6kh3+2`, `2d20kl1`, `1d8r2+3` or
+    `d20+5 adv` into a reusable DicePlan. Results are cached per expression.
+
+    Raises ValidationError for malformed or out-of-range expressions.
+    """
+    if not isinstance(expression, str) or not expression.strip():
+        raise ValidationError("Dice expression must be a non-empty string.")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValidationError("Dice expression is too long.")
+
+    body = expression.strip()
+    mode = None
+    suffix = _MODE_SUFFIX_RE.search(body)
+    if suffix:
+        mode = suffix.group(1).lower()[:3]
+        body = body[: suffix.start()]
+    body = _OPERATOR_SPACING_RE.sub(r"\1", body.strip())
+
+    terms: List[DiceTerm] = []
+    constant = 0
+    pos = 0
+    while pos < len(body):
+        match = _TERM_RE.match(body, pos)
+        if not match or match.end() == pos or (pos > 0 and not match.group("sign")):
+            raise ValidationError(f"Invalid dice expression: {expression!r}")
+        term, value = _parse_term(match)
+        if term is None:
+            constant += value
+        else:
+            terms.append(term)
+        pos = match.end()
+
+    if mode is not None:
+        # Advantage/disadvantage turns every single d20 into 2d20 keep high/low
+        terms = [
+            DiceTerm(t.sign, 2, 20, 1, mode == "adv", t.reroll_at_most)
+            if t.sides == 20 and t.count == 1
+            else t
+            for t in terms
+        ]
+        if not any(t.sides == 20 and t.count == 2 and t.keep == 1 for t in terms):
+            raise ValidationError("Advantage/disadvantage requires a single d20.")
+
+    return DicePlan(expression=expression.strip(), terms=tuple(terms), constant=constant)
+
+
+class DiceEngine:
+    """
+    Rolls dice expressions from a seeded RNG and answers probability queries
+    using vectorized NumPy sampling.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._np_rng = np.random.default_rng(seed)
+
+    def roll(self, expression: str) -> RollResult:
+        """Roll an expression once and return the total with per-die detail."""
+        return compile_expression(expression).roll(self._rng)
+
+    def sample(self, expression: str, n: int = DEFAULT_SAMPLES) -> np.ndarray:
+        """Return the totals of `n` simulated rolls as a NumPy array."""
+        return compile_expression(expression).sample(n, self._np_rng)
+
+    def chance_at_least(
+        self, expression: str, target: int, n: int = DEFAULT_SAMPLES
+    ) -> float:
+        """Estimate P(total >= target), e.g. the chance an attack roll hits an AC."""
+        return float(np.count_nonzero(self.sample(expression, n) >= target) / n)
+
+    def distribution(
+        self, expression: str, n: int = DEFAULT_SAMPLES
+    ) -> Dict[int, float]:
+        """Estimate the probability of every possible total."""
+        values, counts = np.unique(self.sample(expression, n), return_counts=True)
+        return {int(v): float(c) / n for v, c in zip(values, counts)}
@@ -0,0 +1,250 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from packages.backend.components.dice_engine import DicePlan, compile_expression
+from packages.shared.error_handler import ValidationError
+
+MAX_ROUNDS = 100  # Combats still running after this many rounds count as draws
+PARALLEL_THRESHOLD = 50_000  # Batches larger than this are spread across processes
+DEFAULT_BATCHES = 10_000
+
+_HIT_POINTS_RE = re.compile(r"^\s*(\d+)")
+_ATTACK_BONUS_RE = re.compile(r"([+-]\d+)\s*to hit", re.IGNORECASE)
+_DAMAGE_RE = re.compile(r"\((\d+d\d+(?:\s*[+-]\s*\d+)?)\)")
+
+
+@dataclass(frozen=True)
+class Combatant:
+    """Combat statistics for one creature in a simulated encounter."""
+
+    name: str
+    hit_points: int
+    armor_class: int
+    attack_bonus: int
+    damage: str  # Dice expression rolled on a hit, e.g. "1d8+3"
+    attacks_per_round: int = 1
+    initiative_bonus: int = 0
+
+
+def combatant_from_monster_row(row: Sequence) -> Combatant:
+    """
+    Build a Combatant from a `Monsters` table row
+    (monster_name, armor_class, hit_points, actions).
+
+    `hit_points` is the SRD text form ("7 (2d6)"); the attack bonus and damage
+    dice are taken from the first "+N to hit ... (XdY + Z)" action.
+    """
+    name, armor_class, hit_points, actions = row
+    hp_match = _HIT_POINTS_RE.match(str(hit_points))
+    if not hp_match:
+        raise ValidationError(f"Unrecognized hit points for {name}: {hit_points!r}")
+    actions = actions or ""
+    bonus_match = _ATTACK_BONUS_RE.search(actions)
+    damage_match = _DAMAGE_RE.search(actions)
+    return Combatant(
+        name=name,
+        hit_points=int(hp_match.group(1)),
+        armor_class=int(armor_class),
+        attack_bonus=int(bonus_match.group(1)) if bonus_match else 0,
+        damage=damage_match.group(1).replace(" ", "") if damage_match else "1d4",
+    )
+
+
+@dataclass
+class EncounterResult:
+    """Aggregated outcome of a batch of simulated combats."""
+
+    battles: int
+    party_win_rate: float
+    draw_rate: float
+    survival_rates: Dict[str, float]  # Per party member
+    mean_party_deaths: float
+    round_distribution: Dict[int, float]
+
+    @property
+    def difficulty(self) -> str:
+        """Rough difficulty rating derived from win rate and expected deaths."""
+        if self.party_win_rate < 0.5 or self.mean_party_deaths >= 1.0:
+            return "deadly"
+        if self.party_win_rate < 0.8 or self.mean_party_deaths >= 0.3:
+            return "hard"
+        if self.party_win_rate < 0.95 or self.mean_party_deaths >= 0.05:
+            return "medium"
+        return "easy"
+
+    def round_percentile(self, q: float) -> int:
+        """Return the smallest round count covering fraction `q` of combats."""
+        cumulative = 0.0
+        for rounds in sorted(self.round_distribution):
+            cumulative += self.round_distribution[rounds]
+            if cumulative >= q:
+                return rounds
+        return max(self.round_distribution)
+
+
+def _critical_plan(plan: DicePlan) -> DicePlan:
+    # Critical hits roll the damage dice a second time, without the modifier
+    return DicePlan(expression=plan.expression, terms=plan.terms, constant=0)
+
+
+def _run_batch(
+    party: Sequence[Combatant],
+    monsters: Sequence[Combatant],
+    battles: int,
+    seed: Optional[int],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Simulate `battles` combats at once.
+
+    Every combat is one row of a (battles, combatants) array; each turn slot
+    is resolved for all rows in a handful of vectorized operations.
+    Returns (rounds, winner, party_alive) where winner is 1 for the party,
+    -1 for the monsters and 0 for a draw.
+    """
+    rng = np.random.default_rng(seed)
+    combatants = list(party) + list(monsters)
+    count = len(combatants)
+    party_size = len(party)
+    is_party = np.arange(count) < party_size
+
+    armor_class = np.array([c.armor_class for c in combatants], dtype=np.int64)
+    attack_bonus = np.array([c.attack_bonus for c in combatants], dtype=np.int64)
+    plans = [compile_expression(c.damage) for c in combatants]
+    crit_plans = [_critical_plan(p) for p in plans]
+
+    hp = np.tile(
+        np.array([c.hit_points for c in combatants], dtype=np.int64), (battles, 1)
+    )
+    initiative = rng.integers(1, 21, size=(battles, count)) + np.array(
+        [c.initiative_bonus for c in combatants]
+    )
+    # Tiny random tie-breaker keeps equal initiatives from always favouring
+    # the lower index
+    order = np.argsort(-(initiative + rng.random((battles, count))), axis=1)
+
+    rounds = np.zeros(battles, dtype=np.int64)
+    winner = np.zeros(battles, dtype=np.int64)
+    active = np.ones(battles, dtype=bool)
+    rows = np.arange(battles)
+
+    for round_number in range(1, MAX_ROUNDS + 1):
+        rounds[active] = round_number
+        for slot in range(count):
+            actor = order[:, slot]
+            for index, combatant in enumerate(combatants):
+                acting = active & (actor == index) & (hp[:, index] > 0)
+                for _ in range(combatant.attacks_per_round):
+                    acting_rows = rows[acting & active]
+                    if acting_rows.size == 0:
+                        break
+                    # Pick a random living enemy for every acting row
+                    enemy = is_party != is_party[index]
+                    scores = rng.random((acting_rows.size, count))
+                    scores[~(enemy & (hp[acting_rows] > 0))] = -1.0
+                    target = scores.argmax(axis=1)
+
+                    d20 = rng.integers(1, 21, size=acting_rows.size)
+                    critical = d20 == 20
+                    hits = critical | (
+                        (d20 != 1) & (d20 + attack_bonus[index] >= armor_class[target])
+                    )
+                    if not hits.any():
+                        continue
+                    hit_rows, hit_targets = acting_rows[hits], target[hits]
+                    damage = plans[index].sample(hit_rows.size, rng)
+                    if critical[hits].any():
+                        extra = crit_plans[index].sample(hit_rows.size, rng)
+                        damage += np.where(critical[hits], extra, 0)
+                    hp[hit_rows, hit_targets] -= np.maximum(damage, 0)
+
+                    alive = hp > 0
+                    party_up = alive[:, is_party].any(axis=1)
+                    monsters_up = alive[:, ~is_party].any(axis=1)
+                    finished = active & ~(party_up & monsters_up)
+                    winner[finished] = np.where(party_up[finished], 1, -1)
+                    active &= ~finished
+        if not active.any():
+            break
+
+    party_alive = hp[:, :party_size] > 0
+    return rounds, winner, party_alive
+
+
+def _summarize(
+    party: Sequence[Combatant],
+    rounds: np.ndarray,
+    winner: np.ndarray,
+    party_alive: np.ndarray,
+) -> EncounterResult:
+    battles = rounds.size
+    values, counts = np.unique(rounds, return_counts=True)
+    return EncounterResult(
+        battles=battles,
+        party_win_rate=float(np.count_nonzero(winner == 1) / battles),
+        draw_rate=float(np.count_nonzero(winner == 0) / battles),
+        survival_rates={
+            member.name: float(party_alive[:, i].mean())
+            for i, member in enumerate(party)
+        },
+        mean_party_deaths=float((~party_alive).sum(axis=1).mean()),
+        round_distribution={int(v): float(c) / battles for v, c in zip(values, counts)},
+    )
+
+
+class EncounterSimulator:
+    """
+    Monte Carlo encounter balance estimates for a party against a group of
+    monsters. Thousands of combats run in parallel as NumPy arrays; very
+    large batches are split across a process pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def simulate(
+        self,
+        party: Sequence[Combatant],
+        monsters: Sequence[Combatant],
+        battles: int = DEFAULT_BATCHES,
+        seed: Optional[int] = None,
+    ) -> EncounterResult:
+        if not party or not monsters:
+            raise ValidationError("An encounter needs at least one party member and one monster.")
+        if battles <= 0:
+            raise ValidationError("Battle count must be a positive integer.")
+        for combatant in list(party) + list(monsters):
+            if combatant.hit_points <= 0:
+                raise ValidationError(f"{combatant.name} must have positive hit points.")
+            compile_expression(combatant.damage)  # Fail fast on bad dice
+
+        workers = min(self.max_workers, -(-battles // PARALLEL_THRESHOLD))
+        if workers <= 1:
+            rounds, winner, party_alive = _run_batch(party, monsters, battles, seed)
+            return _summarize(party, rounds, winner, party_alive)
+
+        sizes = [battles // workers + (i < battles % workers) for i in range(workers)]
+        seeds = [
+            int(s.generate_state(1)[0])
+            for s in np.random.SeedSequence(seed).spawn(workers)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = list(
+                pool.map(
+                    _run_batch,
+                    [party] * workers,
+                    [monsters] * workers,
+                    sizes,
+                    seeds,
+                )
+            )
+        return _summarize(
+            party,
+            np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]),
+            np.concatenate([p[2] for p in parts]),
+        )
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+DEFAULT_MAX_IDS_PER_CAMPAIGN = 4096
+DEFAULT_WINDOW_SECONDS = 10 * 60  # 10 minutes
+DEFAULT_MAX_CAMPAIGNS = 1024
+
+
+class MessageDeduplicator:
+    """
+    Remembers recently processed message IDs per campaign so redelivered
+    messages can be dropped.
+
+    Each campaign keeps an insertion-ordered map of message ID to first-seen
+    time, capped at `max_ids_per_campaign` and trimmed of IDs older than
+    `window_seconds`; the campaigns themselves are kept in LRU order and
+    capped at `max_campaigns`. Memory is therefore bounded by
+    max_campaigns * max_ids_per_campaign IDs, and every check is O(1)
+    amortized.
+    """
+
+    def __init__(
+        self,
+        max_ids_per_campaign: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        max_campaigns: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_ids_per_campaign = max_ids_per_campaign or int(
+            os.getenv("MESSAGE_DEDUPE_MAX_IDS", DEFAULT_MAX_IDS_PER_CAMPAIGN)
+        )
+        self.window_seconds = window_seconds or float(
+            os.getenv("MESSAGE_DEDUPE_WINDOW_SECONDS", DEFAULT_WINDOW_SECONDS)
+        )
+        self.max_campaigns = max_campaigns or int(
+            os.getenv("MESSAGE_DEDUPE_MAX_CAMPAIGNS", DEFAULT_MAX_CAMPAIGNS)
+        )
+        self._clock = clock
+        self._campaigns: "OrderedDict[str, OrderedDict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def check_and_record(self, campaign_id: str, message_id: str) -> bool:
+        """
+        Record a message ID. Returns False if it was already seen within the
+        window (a duplicate), True if it is new.
+        """
+        now = self._clock()
+        with self._lock:
+            seen = self._campaigns.get(campaign_id)
+            if seen is None:
+                seen = self._campaigns[campaign_id] = OrderedDict()
+                while len(self._campaigns) > self.max_campaigns:
+                    self._campaigns.popitem(last=False)
+            else:
+                self._campaigns.move_to_end(campaign_id)
+            self._expire(seen, now)
+            if message_id in seen:
+                self.duplicates += 1
+                return False
+            seen[message_id] = now
+            if len(seen) > self.max_ids_per_campaign:
+                seen.popitem(last=False)
+            return True
+
+    def forget(self, campaign_id: str, message_id: str) -> None:
+        """Drop a recorded ID, e.g. when processing it failed and a retry is expected."""
+        with self._lock:
+            seen = self._campaigns.get(campaign_id)
+            if seen is not None:
+                seen.pop(message_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(seen) for seen in self._campaigns.values())
+
+    def _expire(self, seen: "OrderedDict[str, float]", now: float) -> None:
+        deadline = now - self.window_seconds
+        # Insertion order is first-seen order, so expired IDs are at the front
+        while seen:
+            oldest_id, first_seen = next(iter(seen.items()))
+            if first_seen > deadline:
+                break
+            del seen[oldest_id]
@@ -1,26 +1,76 @@
 import asyncio
+import logging
+from typing import Optional
+
+from packages.backend.components.message_deduplicator import MessageDeduplicator
+from packages.shared.campaign_paths import CampaignPathResolver, get_campaign_paths
+from packages.shared.error_handler import ValidationError
+from packages.shared.event_feed import EventHub, get_event_hub
 from packages.shared.transcript_logger import TranscriptLogger
 
+logger = logging.getLogger(__name__)
+
 
 class MessageProcessor:
     """
     Processes in-character player messages for a campaign.
     Appends each message to the campaign transcript log using TranscriptLogger.
+    Messages passed with a message ID are processed at most once per
+    dedupe window, so redelivered Discord events are ignored. Logged entries
+    are published to the live campaign event feed (the process-wide hub by
+    default).
+
+    Campaign IDs are validated once, on the way in, through the shared
+    campaign path resolver; the logger and store below receive a CampaignId
+    and do not check it again.
     """
 
-    def __init__(self):
-        self.transcript_logger = TranscriptLogger()
+    def __init__(
+        self,
+        deduplicator: Optional[MessageDeduplicator] = None,
+        event_hub: Optional[EventHub] = None,
+        campaign_paths: Optional[CampaignPathResolver] = None,
+    ):
+        self.transcript_logger = TranscriptLogger(event_hub=event_hub or get_event_hub())
+        self.deduplicator = deduplicator or MessageDeduplicator()
+        self.campaign_paths = campaign_paths or get_campaign_paths()
 
-    async def process_player_message(self, campaign_id: str, author: str, message: str):
+    async def process_player_message(
+        self,
+        campaign_id: str,
+        author: str,
+        message: str,
+        message_id: Optional[str] = None,
+    ) -> bool:
         """
         Process an in-character player message as an in-game action.
         Appends the message to the campaign transcript log.
+
+        Returns False if `message_id` was already processed (the message is
+        a duplicate and was skipped), True otherwise.
         """
         try:
-            await self.transcript_logger.log_message(campaign_id, author, message)
+            campaign_id = self.campaign_paths.parse(campaign_id)
+        except ValidationError:
+            logger.warning("Invalid campaign_id: %r", campaign_id)
+            return True
+        if message_id is not None:
+            message_id = str(message_id)
+            if not self.deduplicator.check_and_record(campaign_id, message_id):
+                logger.info(
+                    "Skipping duplicate message %s for campaign %r", message_id, campaign_id
+                )
+                return False
+        try:
+            stored = await self.transcript_logger.log_message(campaign_id, author, message)
         except Exception as e:
             # Robust error handling: log and continue
-            print(f"[MessageProcessor] Error logging message: {e}")
+            logger.error(f"Error logging message: {e}")
+            stored = False
+        if not stored and message_id is not None:
+            # Let a redelivery retry it
+            self.deduplicator.forget(campaign_id, message_id)
+        return True
 
     async def log_ai_response(self, campaign_id: str, message: str):
         """
@@ -40,7 +90,8 @@ class MessageProcessor:
         The log entry will have author="AI" and include a timestamp.
         """
         try:
+            campaign_id = self.campaign_paths.parse(campaign_id)
             await self.transcript_logger.log_message(campaign_id, "AI", message)
         except Exception as e:
             # Robust error handling: log and continue
-            print(f"[MessageProcessor] Error logging AI response: {e}")
+            logger.error(f"Error logging AI response: {e}")
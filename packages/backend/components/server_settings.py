@@ -1,15 +1,12 @@
 from typing import Optional
 import os
-from cryptography.fernet import Fernet
-from dotenv import load_dotenv
 import sqlite3
 
-load_dotenv()  # Load environment variables from .env file
-
 
 class ServerSettingsManager:
     def __init__(self, db_path: str = "server_settings.db"):
         self.key = self.load_encryption_key()
+        self._fernet = None
         self.db_path = db_path
         if db_path == ":memory:":
             self._conn = sqlite3.connect(db_path)
@@ -41,17 +38,25 @@ class ServerSettingsManager:
     def load_encryption_key(self) -> bytes:
         key = os.getenv("ENCRYPTION_KEY")
         if key is None:
+            from cryptography.fernet import Fernet
+
             key = Fernet.generate_key()
             os.environ["ENCRYPTION_KEY"] = key.decode()
         return key
 
+    @property
+    def fernet(self):
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+
+            self._fernet = Fernet(self.key)
+        return self._fernet
+
     def encrypt(self, data: str) -> str:
-        fernet = Fernet(self.key)
-        return fernet.encrypt(data.encode()).decode()
+        return self.fernet.encrypt(data.encode()).decode()
 
     def decrypt(self, encrypted_data: str) -> str:
-        fernet = Fernet(self.key)
-        return fernet.decrypt(encrypted_data.encode()).decode()
+        return self.fernet.decrypt(encrypted_data.encode()).decode()
 
     def store_api_key(self, server_id: str, api_key: str) -> None:
         encrypted_key = self.encrypt(api_key)
@@ -1,74 +1,95 @@
-from typing import Optional
+from typing import Dict, Optional
 import os
-from cryptography.fernet import Fernet
-from dotenv import load_dotenv
 import sqlite3
-
-load_dotenv()  # Load environment variables from .env file
+import threading
 
 
 class ServerSettingsManager:
+    """
+    Stores encrypted server API keys in SQLite.
+
+    One connection is kept open per manager. File databases use WAL mode so
+    several backend workers can share the same file, and decrypted keys are
+    cached in-process. The cache is dropped whenever `PRAGMA data_version`
+    changes, which SQLite bumps when another connection (in this or any other
+    process) commits to the database, so a write in one worker is visible to
+    the others on their next read.
+    """
+
     def __init__(self, db_path: str = "server_settings.db"):
         self.key = self.load_encryption_key()
+        self._fernet = None
         self.db_path = db_path
-        # For in-memory DB, keep a persistent connection
-        if db_path == ":memory:":
-            self._conn = sqlite3.connect(db_path)
-            self._init_db(self._conn)
-        else:
-            self._conn = None
-            self._init_db()
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Optional[str]] = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_db(self._conn)
+        self._data_version = self._read_data_version()
 
     def _init_db(self, conn=None):
         """Initialize the SQLite database and ensure the ServerAPIKeys table exists."""
         if conn is None:
-            conn = sqlite3.connect(self.db_path)
-            close_conn = True
-        else:
-            close_conn = False
-        try:
-            with conn:
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS ServerAPIKeys (
-                        server_id TEXT PRIMARY KEY,
-                        api_key TEXT NOT NULL
-                    )
-                    """
+            conn = self._conn
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ServerAPIKeys (
+                    server_id TEXT PRIMARY KEY,
+                    api_key TEXT NOT NULL
                 )
-        finally:
-            if close_conn:
-                conn.close()
+                """
+            )
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_cache(self) -> None:
+        """Drop cached keys if another connection committed since the last check."""
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._cache.clear()
 
     def load_encryption_key(self) -> bytes:
         """Load the encryption key from an environment variable
         or generate a new one."""
         key = os.getenv("ENCRYPTION_KEY")
         if key is None:
+            from cryptography.fernet import Fernet
+
             key = Fernet.generate_key()
             os.environ["ENCRYPTION_KEY"] = key.decode()
         return key  # Return the key directly as it is already in bytes
 
+    @property
+    def fernet(self):
+        """Fernet instance, built on first use so cryptography loads lazily."""
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+
+            self._fernet = Fernet(self.key)
+        return self._fernet
+
     def encrypt(self, data: str) -> str:
         """Encrypt the data using the Fernet encryption."""
-        fernet = Fernet(self.key)
-        return fernet.encrypt(data.encode()).decode()
+        return self.fernet.encrypt(data.encode()).decode()
 
     def decrypt(self, encrypted_data: str) -> str:
         """Decrypt the data using the Fernet encryption."""
-        fernet = Fernet(self.key)
-        return fernet.decrypt(encrypted_data.encode()).decode()
+        return self.fernet.decrypt(encrypted_data.encode()).decode()
 
     def store_api_key(self, server_id: str, api_key: str) -> None:
         """Store the API key securely in SQLite."""
         encrypted_key = self.encrypt(api_key)
-        if self.db_path == ":memory:":
-            conn = self._conn
-        else:
-            conn = sqlite3.connect(self.db_path)
-        try:
-            with conn:
-                conn.execute(
+        with self._lock:
+            # Pick up other workers' writes first so they are not masked by
+            # the entry cached below
+            self._check_cache()
+            with self._conn:
+                self._conn.execute(
                     """
                     INSERT INTO ServerAPIKeys (server_id, api_key)
                     VALUES (?, ?)
@@ -76,27 +97,25 @@ class ServerSettingsManager:
                     """,
                     (server_id, encrypted_key),
                 )
-        finally:
-            if self.db_path != ":memory:":
-                conn.close()
+            # Commits on this connection do not change its own data_version
+            self._cache[server_id] = api_key
 
     def retrieve_api_key(self, server_id: str) -> Optional[str]:
         """Retrieve the API key for the given server ID from SQLite."""
-        if self.db_path == ":memory:":
-            conn = self._conn
-        else:
-            conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute(
+        with self._lock:
+            self._check_cache()
+            if server_id in self._cache:
+                return self._cache[server_id]
+            row = self._conn.execute(
                 "SELECT api_key FROM ServerAPIKeys WHERE server_id = ?",
                 (server_id,),
-            )
-            row = cur.fetchone()
-            if row:
-                encrypted_key = row[0]
-                return self.decrypt(encrypted_key)
-            return None
-        finally:
-            if self.db_path != ":memory:":
-                conn.close()
+            ).fetchone()
+            api_key = self.decrypt(row[0]) if row else None
+            self._cache[server_id] = api_key
+            return api_key
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+            self._cache.clear()
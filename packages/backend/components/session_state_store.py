@@ -0,0 +1,229 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+from packages.shared.error_handler import ValidationError
+from packages.shared.transcript_logger import TranscriptLogger
+
+SPILL_BASE_DIR = os.path.join("data", "sessions")
+DEFAULT_MEMORY_BUDGET_BYTES = 64 * 1024 * 1024  # 64 MB
+DEFAULT_IDLE_TTL_SECONDS = 30 * 60  # 30 minutes
+LATENCY_SAMPLES = 256  # Rehydrate latencies kept for percentile metrics
+
+
+class _Entry:
+    __slots__ = ("state", "size", "last_access")
+
+    def __init__(self, state: Any, size: int, last_access: float):
+        self.state = state
+        self.size = size
+        self.last_access = last_access
+
+
+class SessionStateStore:
+    """
+    In-memory live session/encounter state keyed by campaign_id, bounded by a
+    memory budget.
+
+    Entries are kept in LRU order. When the resident size exceeds the budget,
+    or an entry has been idle longer than the TTL, it is pickled to
+    SPILL_BASE_DIR and dropped from memory; the next `get` rehydrates it.
+    Sizes are the pickled size of each state when it was stored or rehydrated.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.memory_budget_bytes = (
+            memory_budget_bytes
+            if memory_budget_bytes is not None
+            else int(os.getenv("SESSION_STATE_MEMORY_BUDGET_BYTES", DEFAULT_MEMORY_BUDGET_BYTES))
+        )
+        self.idle_ttl_seconds = (
+            idle_ttl_seconds
+            if idle_ttl_seconds is not None
+            else float(os.getenv("SESSION_STATE_IDLE_TTL_SECONDS", DEFAULT_IDLE_TTL_SECONDS))
+        )
+        self.spill_dir = spill_dir or os.getenv("SESSION_STATE_SPILL_DIR", SPILL_BASE_DIR)
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+        self._spill_count = 0
+        self._rehydrate_count = 0
+        self._rehydrate_latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        # Campaigns with a spill file on disk, so hot paths skip filesystem checks
+        self._spilled = set()
+        if os.path.isdir(self.spill_dir):
+            self._spilled.update(
+                name[: -len(".state")]
+                for name in os.listdir(self.spill_dir)
+                if name.endswith(".state")
+            )
+
+    def _spill_path(self, campaign_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{campaign_id}.state")
+
+    @staticmethod
+    def _validate(campaign_id: str) -> None:
+        if not TranscriptLogger._is_valid_campaign_id(campaign_id):
+            raise ValidationError(f"Invalid campaign_id: {campaign_id!r}")
+
+    def put(self, campaign_id: str, state: Any) -> None:
+        """Store (or replace) the live state for a campaign."""
+        self._validate(campaign_id)
+        size = len(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._drop(campaign_id)
+            self._entries[campaign_id] = _Entry(state, size, self._clock())
+            self._resident_bytes += size
+            self._discard_spill(campaign_id)
+            self._enforce_limits(keep=campaign_id)
+
+    def get(self, campaign_id: str) -> Optional[Any]:
+        """Return the state for a campaign, rehydrating it from disk if spilled."""
+        self._validate(campaign_id)
+        with self._lock:
+            entry = self._entries.get(campaign_id)
+            if entry is not None:
+                entry.last_access = self._clock()
+                self._entries.move_to_end(campaign_id)
+                self._enforce_limits(keep=campaign_id)
+                return entry.state
+            state = self._rehydrate(campaign_id)
+            self._enforce_limits(keep=campaign_id)
+            return state
+
+    def delete(self, campaign_id: str) -> None:
+        """Forget a campaign's state, both in memory and on disk."""
+        self._validate(campaign_id)
+        with self._lock:
+            self._drop(campaign_id)
+            self._discard_spill(campaign_id)
+
+    def release(self, campaign_id: str) -> bool:
+        """
+        Hand a campaign off to another worker: write its state to the spill
+        directory and forget it here. Returns False if it was not resident.
+        """
+        self._validate(campaign_id)
+        with self._lock:
+            if campaign_id not in self._entries:
+                return False
+            self._spill(campaign_id)
+            self._spilled.discard(campaign_id)
+            return True
+
+    def adopt(self, campaign_id: str) -> bool:
+        """
+        Take over a campaign released by another worker sharing the spill
+        directory; the state is loaded on the next `get`. Returns False if
+        there is no released state to pick up.
+        """
+        self._validate(campaign_id)
+        with self._lock:
+            if not os.path.exists(self._spill_path(campaign_id)):
+                return False
+            self._drop(campaign_id)
+            self._spilled.add(campaign_id)
+            return True
+
+    def evict_idle(self) -> int:
+        """Spill every entry idle longer than the TTL. Returns the number spilled."""
+        with self._lock:
+            return self._evict_idle()
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = sorted(self._rehydrate_latencies)
+            return {
+                "resident_entries": len(self._entries),
+                "resident_bytes": self._resident_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "spill_count": self._spill_count,
+                "rehydrate_count": self._rehydrate_count,
+                "rehydrate_latency_p50_ms": _percentile(latencies, 0.50),
+                "rehydrate_latency_p99_ms": _percentile(latencies, 0.99),
+            }
+
+    def _drop(self, campaign_id: str) -> Optional[_Entry]:
+        entry = self._entries.pop(campaign_id, None)
+        if entry is not None:
+            self._resident_bytes -= entry.size
+        return entry
+
+    def _enforce_limits(self, keep: Optional[str] = None) -> None:
+        self._evict_idle()
+        # Oldest entries first; never spill the entry that was just touched
+        while self._resident_bytes > self.memory_budget_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            self._spill(oldest)
+
+    def _evict_idle(self) -> int:
+        deadline = self._clock() - self.idle_ttl_seconds
+        spilled = 0
+        # LRU order means idle entries are always at the front
+        while self._entries:
+            oldest, entry = next(iter(self._entries.items()))
+            if entry.last_access > deadline:
+                break
+            self._spill(oldest)
+            spilled += 1
+        return spilled
+
+    def _spill(self, campaign_id: str) -> None:
+        entry = self._drop(campaign_id)
+        if entry is None:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self._spill_path(campaign_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry.state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._spilled.add(campaign_id)
+        self._spill_count += 1
+
+    def _rehydrate(self, campaign_id: str) -> Optional[Any]:
+        if campaign_id not in self._spilled:
+            return None
+        path = self._spill_path(campaign_id)
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._spilled.discard(campaign_id)
+            return None
+        state = pickle.loads(data)
+        self._entries[campaign_id] = _Entry(state, len(data), self._clock())
+        self._resident_bytes += len(data)
+        self._discard_spill(campaign_id)
+        self._rehydrate_count += 1
+        self._rehydrate_latencies.append((time.perf_counter() - started) * 1000)
+        return state
+
+    def _discard_spill(self, campaign_id: str) -> None:
+        if campaign_id not in self._spilled:
+            return
+        self._spilled.discard(campaign_id)
+        try:
+            os.remove(self._spill_path(campaign_id))
+        except FileNotFoundError:
+            pass
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(q * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
@@ -1,10 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from packages.backend.api.server_config import router as server_config_router
+from packages.backend.api.server_config import (
+    router as server_config_router,
+    get_settings_manager,
+)
+from packages.backend.api.campaign_events import router as campaign_events_router
+from packages.backend.api.campaign_transcripts import router as campaign_transcripts_router
+from packages.backend.api.loop_metrics import router as loop_metrics_router
+from packages.backend.api.profiles import router as profiles_router
+from packages.backend.components.campaign_archiver import CampaignArchiver
+from packages.backend.middleware.admission import AdmissionMiddleware
+from packages.backend.middleware.profiling import ProfilingMiddleware
+from packages.shared.logging_config import setup_logging
+from packages.shared.loop_watchdog import get_loop_watchdog
+from packages.shared.shutdown import (
+    flush_transcripts,
+    get_shutdown_coordinator,
+    reset_shutdown_coordinator,
+)
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watchdog = get_loop_watchdog()
+    watchdog.start()
+    # Open the settings DB and load the encryption key before serving
+    # traffic, instead of as a side effect of importing the routers. SQLite
+    # and the key file are blocking I/O, so keep them off the loop
+    await asyncio.to_thread(app.dependency_overrides.get(get_settings_manager, get_settings_manager))
+    archiver = CampaignArchiver()
+    archiver.start()
+    yield
+    # uvicorn has stopped accepting connections and drained requests (up to
+    # --timeout-graceful-shutdown); what is left is work they started
+    coordinator = get_shutdown_coordinator()
+    # Joined in a thread, under the deadline, not on the loop
+    coordinator.add_step("archiver", archiver.stop)
+    coordinator.add_step("transcripts", flush_transcripts)
+    coordinator.add_step("settings", _close_settings_manager)
+    await coordinator.shutdown()
+    # An app started again in this process (as the tests do) accepts work again
+    reset_shutdown_coordinator()
+    watchdog.stop()
+
+
+def _close_settings_manager() -> None:
+    # Only the manager this module created; an override belongs to whoever set it
+    if get_settings_manager.cache_info().currsize:
+        get_settings_manager().close()
+        get_settings_manager.cache_clear()
+
 
 app = FastAPI(
     title="AI DM Backend API",
     version="1.0.0",
     description="API for managing campaigns, settings, and interacting with the AI Dungeon Master.",
+    lifespan=lifespan,
 )
 
+app.add_middleware(ProfilingMiddleware)
+# Added last so it runs first: shed requests before any other work is done
+app.add_middleware(AdmissionMiddleware)
 app.include_router(server_config_router)
+app.include_router(profiles_router)
+app.include_router(loop_metrics_router)
+app.include_router(campaign_events_router)
+app.include_router(campaign_transcripts_router)
@@ -0,0 +1 @@
+# Middleware package for cross-cutting backend concerns (profiling, etc.)
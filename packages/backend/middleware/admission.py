@@ -0,0 +1,170 @@
+"""
+Admission control for the backend.
+
+Every HTTP request is classified by priority before it is admitted:
+
+- low: config writes (non-GET requests under /servers/) and admin routes
+- normal: everything else, including campaign and AI actions
+
+A request is refused with 429 and a Retry-After header, before any work is
+queued for it, when the backend is overloaded:
+
+- low-priority requests once ADMISSION_LOW_PRIORITY_SHARE (default 0.5) of
+  ADMISSION_MAX_IN_FLIGHT (default 64) requests are in flight, or the event
+  loop lags by ADMISSION_MAX_LOOP_LAG_MS (default 250);
+- normal requests once ADMISSION_MAX_IN_FLIGHT requests are in flight, or
+  the loop lags by twice ADMISSION_MAX_LOOP_LAG_MS.
+
+Loop lag is read from the process's LoopWatchdog (see
+packages/shared/loop_watchdog.py), which the app's lifespan starts: the worst
+of its recent heartbeats, so a stall keeps shedding until its backlog has
+had time to drain. With the watchdog disabled (LOOP_WATCHDOG_THRESHOLD_MS=0)
+only the in-flight limits apply. Long-lived streams (the SSE event feed)
+and WebSockets are checked on connect but do not hold an in-flight slot.
+The loop-lag metrics endpoint (/admin/loop-lag) is never shed, so it keeps
+answering while the loop lags. Setting a limit to 0 disables that check.
+"""
+
+import os
+import re
+from typing import Dict, Optional
+
+from starlette.responses import JSONResponse
+
+from packages.shared.error_handler import OverloadError, retry_after_seconds
+from packages.shared.loop_watchdog import LoopWatchdog, get_loop_watchdog
+
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_LOW_PRIORITY_SHARE = 0.5
+DEFAULT_MAX_LOOP_LAG_MS = 250
+DEFAULT_RETRY_AFTER_SECONDS = 1
+
+LOW = "low"
+NORMAL = "normal"
+
+_READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+_STREAM_PATH_RE = re.compile(r"^/campaigns/[^/]+/events$")
+# Diagnostics needed most while overloaded; cheap and bypass admission
+_EXEMPT_PATHS = frozenset({"/admin/loop-lag"})
+
+
+def classify(method: str, path: str) -> str:
+    """Priority of a request: config writes and admin routes are shed first."""
+    if path.startswith("/admin/"):
+        return LOW
+    if path.startswith("/servers/") and method not in _READ_METHODS:
+        return LOW
+    return NORMAL
+
+
+class AdmissionController:
+    """Tracks in-flight requests and event-loop lag, and decides admission."""
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        low_priority_share: Optional[float] = None,
+        max_loop_lag_ms: Optional[float] = None,
+        retry_after: Optional[float] = None,
+        watchdog: Optional[LoopWatchdog] = None,
+    ):
+        self.max_in_flight = (
+            max_in_flight
+            if max_in_flight is not None
+            else int(os.getenv("ADMISSION_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT))
+        )
+        self.low_priority_share = (
+            low_priority_share
+            if low_priority_share is not None
+            else float(os.getenv("ADMISSION_LOW_PRIORITY_SHARE", DEFAULT_LOW_PRIORITY_SHARE))
+        )
+        max_loop_lag_ms = (
+            max_loop_lag_ms
+            if max_loop_lag_ms is not None
+            else float(os.getenv("ADMISSION_MAX_LOOP_LAG_MS", DEFAULT_MAX_LOOP_LAG_MS))
+        )
+        self.max_loop_lag = max_loop_lag_ms / 1000
+        self.retry_after = retry_after or float(
+            os.getenv("ADMISSION_RETRY_AFTER_SECONDS", DEFAULT_RETRY_AFTER_SECONDS)
+        )
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {LOW: 0, NORMAL: 0}
+        self._watchdog = watchdog
+
+    @property
+    def loop_lag(self) -> float:
+        """Current event-loop lag in seconds, as measured by the loop watchdog."""
+        return (self._watchdog or get_loop_watchdog()).current_lag()
+
+    def limits(self, priority: str):
+        """(max in flight, max loop lag in seconds) for a priority; 0 = unlimited."""
+        if priority == LOW:
+            # A small share must not round down to 0, which would mean unlimited
+            low_in_flight = max(1, int(self.max_in_flight * self.low_priority_share))
+            return (low_in_flight if self.max_in_flight else 0), self.max_loop_lag
+        return self.max_in_flight, self.max_loop_lag * 2
+
+    def check(self, priority: str) -> None:
+        """Raise OverloadError if a request of `priority` must be shed now."""
+        max_in_flight, max_lag = self.limits(priority)
+        overloaded = max_in_flight and self.in_flight >= max_in_flight
+        lag = self.loop_lag if max_lag else 0.0
+        lagging = max_lag and lag >= max_lag
+        if overloaded or lagging:
+            self.shed[priority] += 1
+            # A lagging loop needs at least as long as it is behind to catch up
+            raise OverloadError(max(self.retry_after, lag if lagging else 0))
+        self.admitted += 1
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide admission controller configured from the environment on first use."""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that sheds requests with 429 and Retry-After under
+    overload, low-priority routes first (see AdmissionController).
+    """
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self._controller = controller
+
+    @property
+    def controller(self) -> AdmissionController:
+        return self._controller or get_admission_controller()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or scope["path"] in _EXEMPT_PATHS:
+            return await self.app(scope, receive, send)
+        controller = self.controller
+        path = scope["path"]
+        priority = classify(scope.get("method", "GET"), path)
+        try:
+            controller.check(priority)
+        except OverloadError as error:
+            if scope["type"] == "websocket":
+                # Refuse the handshake; there is no HTTP response to carry Retry-After
+                return await send({"type": "websocket.close", "code": 1013})
+            response = JSONResponse(
+                {"detail": str(error)},
+                status_code=429,
+                headers={"Retry-After": str(retry_after_seconds(error.retry_after))},
+            )
+            return await response(scope, receive, send)
+        if scope["type"] == "websocket" or _STREAM_PATH_RE.match(path):
+            return await self.app(scope, receive, send)
+        controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.in_flight -= 1
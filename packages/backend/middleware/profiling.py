@@ -0,0 +1,27 @@
+from typing import Optional
+
+from packages.shared.profiling import Profiler, get_profiler
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a sampled fraction of HTTP requests.
+
+    A disabled profiler costs one attribute check per request, so the
+    middleware is always installed and switched with PROFILING_ENABLED.
+    """
+
+    def __init__(self, app, profiler: Optional[Profiler] = None):
+        self.app = app
+        self._profiler = profiler
+
+    @property
+    def profiler(self) -> Profiler:
+        return self._profiler or get_profiler()
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if scope["type"] != "http" or not profiler.enabled:
+            return await self.app(scope, receive, send)
+        with profiler.profile(f"{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send)
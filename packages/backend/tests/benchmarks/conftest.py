@@ -0,0 +1,128 @@
+"""
+Benchmark harness shared by the files in this directory.
+
+Run with `pytest -m benchmark`. Every measurement is written to
+BENCHMARK_RESULTS_DIR (default `.benchmarks/`) as a timestamped JSON file,
+and `latest.json` is used as the baseline for the next run. Set
+BENCHMARK_MAX_REGRESSION (e.g. `0.25` for 25%) to fail measurements that
+got slower than the baseline by more than that fraction.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", ".benchmarks")
+LATEST_FILE = "latest.json"
+_RESULTS_KEY = pytest.StashKey[dict]()
+
+
+class Benchmark:
+    """Times callables and compares the median against the previous run."""
+
+    def __init__(self, baseline: dict, results: dict):
+        self._baseline = baseline
+        self._results = results
+        max_regression = os.getenv("BENCHMARK_MAX_REGRESSION")
+        self.max_regression = float(max_regression) if max_regression else None
+
+    def measure(self, name: str, func, rounds: int = 5, operations: int = 1, **meta):
+        """Time `func()` over several rounds. `operations` is the work per call."""
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return self.record(name, timings, operations, **meta)
+
+    def measure_async(self, name: str, factory, rounds: int = 5, operations: int = 1, **meta):
+        """Like measure, for a zero-argument coroutine factory."""
+
+        async def run():
+            timings = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                await factory()
+                timings.append(time.perf_counter() - started)
+            return timings
+
+        return self.record(name, asyncio.run(run()), operations, **meta)
+
+    def record(self, name: str, timings, operations: int = 1, **meta):
+        """Record timings (in seconds) measured elsewhere, e.g. in a subprocess."""
+        median = statistics.median(timings)
+        result = {
+            "median_s": median,
+            "min_s": min(timings),
+            "max_s": max(timings),
+            "rounds": len(timings),
+            "ops_per_s": operations / median if median else None,
+            **meta,
+        }
+        previous = self._baseline.get(name)
+        if previous:
+            result["change"] = (median - previous["median_s"]) / previous["median_s"]
+        self._results[name] = result
+        if (
+            self.max_regression is not None
+            and result.get("change") is not None
+            and result["change"] > self.max_regression
+        ):
+            pytest.fail(
+                f"{name} regressed {result['change']:.0%} "
+                f"(median {median * 1000:.2f} ms vs {previous['median_s'] * 1000:.2f} ms)"
+            )
+        return result
+
+
+@pytest.fixture(scope="session")
+def _benchmark_results(request):
+    latest_path = os.path.join(RESULTS_DIR, LATEST_FILE)
+    baseline = {}
+    if os.path.exists(latest_path):
+        with open(latest_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+    results: dict = {}
+    yield baseline, results
+    if not results:
+        return
+    # Keep measurements from the previous run that were not re-run this time
+    merged = {**baseline, **results}
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": merged,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    for filename in (f"{stamp}.json", LATEST_FILE):
+        with open(os.path.join(RESULTS_DIR, filename), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    request.config.stash[_RESULTS_KEY] = results
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(_RESULTS_KEY, None)
+    if not results:
+        return
+    terminalreporter.write_sep("-", "benchmark results")
+    for name, result in sorted(results.items()):
+        change = result.get("change")
+        change_text = f"{change:+.1%}" if change is not None else "new"
+        terminalreporter.write_line(
+            f"{name:<55} {result['median_s'] * 1000:>10.3f} ms  {change_text:>8}"
+        )
+
+
+@pytest.fixture
+def bench(_benchmark_results):
+    baseline, results = _benchmark_results
+    return Benchmark(baseline, results)
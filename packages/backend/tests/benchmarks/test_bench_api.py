@@ -0,0 +1,32 @@
+import httpx
+import pytest
+from packages.backend.api.server_config import get_settings_manager
+from packages.backend.components.server_settings_manager import ServerSettingsManager
+from packages.backend.main import app
+
+pytestmark = pytest.mark.benchmark
+
+REQUESTS = 100
+PAYLOAD = {
+    "api_key": "bench-key",
+    "dm_roll_visibility": "public",
+    "player_roll_mode": "digital",
+    "character_sheet_mode": "digital_sheet",
+}
+
+
+def test_put_server_config_latency(bench, tmp_path, monkeypatch):
+    manager = ServerSettingsManager(db_path=str(tmp_path / "settings.db"))
+    monkeypatch.setitem(app.dependency_overrides, get_settings_manager, lambda: manager)
+    transport = httpx.ASGITransport(app=app)
+
+    async def put_many():
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for i in range(REQUESTS):
+                response = await client.put(f"/servers/{i}/config", json=PAYLOAD)
+                assert response.status_code == 200
+
+    result = bench.measure_async(
+        "api.put_server_config", put_many, rounds=3, operations=REQUESTS
+    )
+    assert result["ops_per_s"] > 0
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+ROUNDS = 3
+TOP_MODULES = 10
+
+# Entry points whose cold-start import cost is tracked
+ENTRY_POINTS = {
+    "backend": "packages.backend.main",
+    "bot.admin_cog": "packages.bot.cogs.admin_cog",
+}
+
+
+def parse_importtime(output: str):
+    """
+    Parse `python -X importtime` output into {module: (self_us, cumulative_us)}.
+    Lines look like `import time:   1411 |   4745 |   packages.shared.logging_config`.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+def run_importtime(module: str, cwd: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       816 |       3334 |     logging.handlers\n"
+        "import time:      3259 |     370352 | packages.backend.main\n"
+    )
+    assert parse_importtime(output) == {
+        "logging.handlers": (816, 3334),
+        "packages.backend.main": (3259, 370352),
+    }
+
+
+@pytest.mark.parametrize("name", sorted(ENTRY_POINTS))
+def test_import_time(bench, tmp_path, name):
+    module = ENTRY_POINTS[name]
+    timings, modules = [], {}
+    for _ in range(ROUNDS):
+        modules = run_importtime(module, cwd=str(tmp_path))
+        timings.append(modules[module][1] / 1e6)
+
+    slowest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+    top_level = [
+        (mod, cumulative) for mod, (_, cumulative) in slowest if "." not in mod and mod != module
+    ][:TOP_MODULES]
+    result = bench.record(
+        f"import_time.{name}",
+        timings,
+        modules_imported=len(modules),
+        slowest_packages_ms={mod: cumulative / 1000 for mod, cumulative in top_level},
+    )
+    assert result["median_s"] > 0
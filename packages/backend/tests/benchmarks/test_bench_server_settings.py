@@ -0,0 +1,36 @@
+import pytest
+from packages.backend.components.server_settings_manager import ServerSettingsManager
+
+pytestmark = pytest.mark.benchmark
+
+OPERATIONS = 200
+
+
+@pytest.fixture(params=["file", "memory"])
+def manager(request, tmp_path):
+    db_path = str(tmp_path / "settings.db") if request.param == "file" else ":memory:"
+    return request.param, ServerSettingsManager(db_path=db_path)
+
+
+def test_store_api_key(bench, manager):
+    kind, settings = manager
+
+    def store_many():
+        for i in range(OPERATIONS):
+            settings.store_api_key(f"server_{i}", f"key_{i}")
+
+    bench.measure(f"server_settings.store_api_key[{kind}]", store_many, operations=OPERATIONS)
+
+
+def test_retrieve_api_key(bench, manager):
+    kind, settings = manager
+    for i in range(OPERATIONS):
+        settings.store_api_key(f"server_{i}", f"key_{i}")
+
+    def retrieve_many():
+        for i in range(OPERATIONS):
+            assert settings.retrieve_api_key(f"server_{i}") == f"key_{i}"
+
+    bench.measure(
+        f"server_settings.retrieve_api_key[{kind}]", retrieve_many, operations=OPERATIONS
+    )
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import pytest
+from packages.shared import transcript_durability, transcript_logger
+from packages.shared.transcript_durability import DURABILITY_MODES, GroupCommitter
+from packages.shared.transcript_logger import TranscriptLogger
+
+pytestmark = pytest.mark.benchmark
+
+MESSAGES_PER_CAMPAIGN = 5
+DURABILITY_CAMPAIGNS = 100
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_logger, "LOG_BASE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("campaigns", [1, 100, 1000])
+def test_log_message_throughput(bench, log_dir, campaigns):
+    logger = TranscriptLogger()
+    campaign_ids = [f"bench_campaign_{i}" for i in range(campaigns)]
+
+    async def write_burst():
+        for i in range(MESSAGES_PER_CAMPAIGN):
+            await asyncio.gather(
+                *(logger.log_message(cid, "Player", f"Action {i}") for cid in campaign_ids)
+            )
+
+    result = bench.measure_async(
+        f"transcript_logger.log_message[{campaigns}_campaigns]",
+        write_burst,
+        rounds=3,
+        operations=campaigns * MESSAGES_PER_CAMPAIGN,
+    )
+    assert result["ops_per_s"] > 0
+
+
+def test_rotation_cost_near_max_size(bench, log_dir):
+    logger = TranscriptLogger()
+    log_path = os.path.join(log_dir, "rotating", "transcript.log")
+
+    def prepare_full_log():
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, "ab") as f:
+            f.truncate(transcript_logger.MAX_LOG_SIZE_BYTES)
+
+    async def rotate_once():
+        prepare_full_log()
+        await logger.log_message("rotating", "Player", "Triggers rotation")
+
+    bench.measure_async("transcript_logger.rotation_at_max_size", rotate_once, rounds=5)
+    assert os.path.exists(f"{log_path}.1")
+
+
+@pytest.mark.parametrize("durability", DURABILITY_MODES)
+def test_log_message_durability_cost(bench, log_dir, monkeypatch, durability):
+    # A fresh committer per run, so each measurement uses its own commit cycle
+    committer = GroupCommitter()
+    monkeypatch.setattr(transcript_durability, "_group_committer", committer)
+    monkeypatch.setenv("TRANSCRIPT_DURABILITY", durability)
+    logger = TranscriptLogger()
+    campaign_ids = [f"bench_campaign_{i}" for i in range(DURABILITY_CAMPAIGNS)]
+
+    async def write_burst():
+        for i in range(MESSAGES_PER_CAMPAIGN):
+            await asyncio.gather(
+                *(logger.log_message(cid, "Player", f"Action {i}") for cid in campaign_ids)
+            )
+
+    try:
+        result = bench.measure_async(
+            f"transcript_logger.log_message_durability[{durability}]",
+            write_burst,
+            rounds=3,
+            operations=DURABILITY_CAMPAIGNS * MESSAGES_PER_CAMPAIGN,
+            durability=durability,
+        )
+    finally:
+        committer.close()
+    assert result["ops_per_s"] > 0
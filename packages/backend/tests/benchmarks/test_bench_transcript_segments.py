@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+from packages.shared.transcript_logger import JsonlTranscriptStore
+from packages.shared.transcript_segment_store import SegmentTranscriptStore
+
+pytestmark = pytest.mark.benchmark
+
+ENTRIES = 20_000
+CONTEXT_ENTRIES = 50
+
+
+def _entries():
+    authors = ["Player1", "Player2", "Player3", "AI"]
+    return [
+        {
+            "timestamp": f"2025-01-01T{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}.{i + 1:06d}+00:00",
+            "author": authors[i % len(authors)],
+            "message": f"I swing my sword at the goblin number {i} and hope for the best",
+        }
+        for i in range(ENTRIES)
+    ]
+
+
+@pytest.fixture(scope="module")
+def stores(tmp_path_factory):
+    base_dir = str(tmp_path_factory.mktemp("saves"))
+    entries = _entries()
+    jsonl = JsonlTranscriptStore(base_dir)
+    os.makedirs(os.path.join(base_dir, "camp"))
+    with open(os.path.join(base_dir, "camp", "transcript.log"), "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+    segment = SegmentTranscriptStore(base_dir)
+    for entry in entries:
+        segment.append_sync("camp", entry)
+    return {"jsonl": jsonl, "segment": segment}
+
+
+def _bytes_on_disk(store) -> int:
+    if isinstance(store, SegmentTranscriptStore):
+        directory = store.segment_dir("camp")
+    else:
+        directory = os.path.join(store.base_dir, "camp")
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, name))
+    )
+
+
+@pytest.mark.parametrize("kind", ["jsonl", "segment"])
+def test_full_replay(bench, stores, kind):
+    store = stores[kind]
+    bench.measure(
+        f"transcript_format.full_replay[{kind}]",
+        lambda: sum(1 for _ in store.iter_entries("camp")),
+        rounds=3,
+        operations=ENTRIES,
+        bytes_on_disk=_bytes_on_disk(store),
+    )
+
+
+@pytest.mark.parametrize("kind", ["jsonl", "segment"])
+def test_recent_context(bench, stores, kind):
+    store = stores[kind]
+    if kind == "segment":
+        recent = lambda: store.recent_entries("camp", CONTEXT_ENTRIES)  # noqa: E731
+    else:
+        recent = lambda: list(store.iter_entries("camp"))[-CONTEXT_ENTRIES:]  # noqa: E731
+    assert len(recent()) == CONTEXT_ENTRIES
+    bench.measure(f"transcript_format.recent_context[{kind}]", recent, rounds=5)
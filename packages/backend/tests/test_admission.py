@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from packages.backend.middleware.admission import (
+    LOW,
+    NORMAL,
+    AdmissionController,
+    AdmissionMiddleware,
+    classify,
+)
+from packages.shared.error_handler import OverloadError
+from packages.shared.loop_watchdog import LoopWatchdog
+
+
+class FakeWatchdog:
+    def __init__(self, lag=0.0):
+        self.lag = lag
+
+    def current_lag(self):
+        return self.lag
+
+
+def test_config_writes_and_admin_routes_are_low_priority():
+    assert classify("PUT", "/servers/1/config") == LOW
+    assert classify("GET", "/admin/profiles") == LOW
+    assert classify("GET", "/servers/1/config") == NORMAL
+    assert classify("GET", "/campaigns/camp/transcript") == NORMAL
+
+
+def test_low_priority_is_shed_first():
+    controller = AdmissionController(max_in_flight=4, low_priority_share=0.5, max_loop_lag_ms=0)
+    controller.in_flight = 2
+    with pytest.raises(OverloadError):
+        controller.check(LOW)
+    controller.check(NORMAL)
+    controller.in_flight = 4
+    with pytest.raises(OverloadError) as excinfo:
+        controller.check(NORMAL)
+    assert excinfo.value.retry_after == 1
+    assert controller.shed == {LOW: 1, NORMAL: 1} and controller.admitted == 1
+
+
+def test_zero_low_priority_share_only_admits_low_priority_when_idle(monkeypatch):
+    monkeypatch.setenv("ADMISSION_LOW_PRIORITY_SHARE", "0.9")
+    controller = AdmissionController(max_in_flight=4, low_priority_share=0, max_loop_lag_ms=0)
+    assert controller.low_priority_share == 0
+    controller.check(LOW)
+    controller.in_flight = 1
+    with pytest.raises(OverloadError):
+        controller.check(LOW)
+    controller.check(NORMAL)
+
+
+def test_loop_lag_sheds_by_priority():
+    watchdog = FakeWatchdog(lag=0.15)
+    controller = AdmissionController(
+        max_in_flight=0, max_loop_lag_ms=100, retry_after=1, watchdog=watchdog
+    )
+    with pytest.raises(OverloadError):
+        controller.check(LOW)
+    controller.check(NORMAL)
+    watchdog.lag = 2.5
+    with pytest.raises(OverloadError) as excinfo:
+        controller.check(NORMAL)
+    assert excinfo.value.retry_after == 2.5
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_comes_from_the_watchdog():
+    watchdog = LoopWatchdog(threshold_ms=100, sample_ms=10, report_seconds=0)
+    controller = AdmissionController(max_loop_lag_ms=100, watchdog=watchdog)
+    assert controller.loop_lag == 0  # Not watching a loop yet
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.02)
+        time.sleep(0.2)  # Block the loop
+        # Seen as soon as the loop runs again, before the late heartbeat lands
+        assert controller.loop_lag >= 0.1
+        await asyncio.sleep(0.02)
+        assert controller.loop_lag >= 0.1
+        with pytest.raises(OverloadError):
+            controller.check(LOW)
+    finally:
+        watchdog.stop()
+
+
+def _app(controller, release):
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.put("/servers/{server_id}/config")
+    async def put_config(server_id: str):
+        return {"ok": True}
+
+    @app.post("/campaigns/{campaign_id}/act")
+    async def act(campaign_id: str):
+        await release.wait()
+        return {"ok": True}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_middleware_answers_429_with_retry_after():
+    controller = AdmissionController(max_in_flight=2, low_priority_share=0.5, max_loop_lag_ms=0)
+    release = asyncio.Event()
+    transport = httpx.ASGITransport(app=_app(controller, release))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = asyncio.ensure_future(client.post("/campaigns/camp/act"))
+        while controller.in_flight < 1:
+            await asyncio.sleep(0.001)
+
+        shed = await client.put("/servers/1/config")
+        assert shed.status_code == 429
+        assert shed.headers["Retry-After"] == "1"
+
+        second = asyncio.ensure_future(client.post("/campaigns/camp/act"))
+        while controller.in_flight < 2:
+            await asyncio.sleep(0.001)
+        assert (await client.post("/campaigns/camp/act")).status_code == 429
+
+        release.set()
+        assert (await first).status_code == 200 and (await second).status_code == 200
+        assert controller.in_flight == 0
+        assert (await client.put("/servers/1/config")).status_code == 200
+    assert controller.shed == {LOW: 1, NORMAL: 1}
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_endpoint_answers_while_the_loop_lags(monkeypatch):
+    from packages.backend.main import app
+    from packages.backend.middleware import admission
+
+    # Far over both priorities' limits
+    controller = AdmissionController(max_loop_lag_ms=100, watchdog=FakeWatchdog(lag=10.0))
+    monkeypatch.setattr(admission, "_admission_controller", controller)
+    monkeypatch.setenv("ADMIN_API_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/admin/profiles", headers=headers)).status_code == 429
+        assert (await client.get("/admin/loop-lag", headers=headers)).status_code == 200
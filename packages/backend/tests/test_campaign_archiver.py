@@ -0,0 +1,265 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from packages.backend.components.campaign_archiver import CampaignArchiver
+from packages.backend.components.campaign_memory_service import (
+    CampaignMemoryIndex,
+    load_memory_index,
+    save_memory_index,
+)
+from packages.shared import campaign_archive, transcript_logger
+from packages.shared.transcript_logger import JsonlTranscriptStore, TranscriptLogger
+
+DAY = 86400
+
+
+@pytest.fixture
+def saves(tmp_path, monkeypatch):
+    base_dir = tmp_path / "saves"
+    base_dir.mkdir()
+    monkeypatch.setattr(transcript_logger, "LOG_BASE_DIR", str(base_dir))
+    monkeypatch.delenv("CAMPAIGN_ARCHIVE_DIR", raising=False)
+    monkeypatch.delenv("TRANSCRIPT_STORE", raising=False)
+    return base_dir
+
+
+def _make_campaign(base_dir, campaign_id, lines=3, age_days=0):
+    campaign_dir = base_dir / campaign_id
+    campaign_dir.mkdir()
+    (campaign_dir / "transcript.log").write_text(
+        "".join(json.dumps({"author": "Player", "message": f"m{i}"}) + "\n" for i in range(lines)),
+        encoding="utf-8",
+    )
+    stamp = time.time() - age_days * DAY
+    for path in (campaign_dir / "transcript.log", campaign_dir):
+        os.utime(path, (stamp, stamp))
+    return campaign_dir
+
+
+def test_archive_dir_defaults_next_to_saves(saves, monkeypatch):
+    assert campaign_archive.archive_dir() == str(saves.parent / "archive")
+    monkeypatch.setenv("CAMPAIGN_ARCHIVE_DIR", str(saves / "elsewhere"))
+    assert campaign_archive.archive_dir() == str(saves / "elsewhere")
+
+
+def test_run_once_archives_only_inactive_campaigns(saves):
+    _make_campaign(saves, "old", age_days=45)
+    _make_campaign(saves, "recent", age_days=2)
+    (saves / ".memory_rebuild.json").write_text("{}")
+
+    result = CampaignArchiver(inactive_days=30).run_once()
+
+    assert result == {"archived": ["old"], "skipped": []}
+    assert not (saves / "old").exists()
+    assert campaign_archive.is_archived("old")
+    assert (saves / "recent").is_dir()
+    assert not campaign_archive.is_archived("recent")
+
+
+def test_zero_inactive_days_disables_archival(saves):
+    _make_campaign(saves, "old", age_days=400)
+    archiver = CampaignArchiver(inactive_days=0)
+    assert not archiver.enabled
+    assert archiver.run_once() == {"archived": [], "skipped": []}
+    assert (saves / "old").is_dir()
+
+
+@pytest.mark.asyncio
+async def test_logging_to_archived_campaign_restores_it_first(saves):
+    _make_campaign(saves, "camp", lines=3, age_days=60)
+    CampaignArchiver(inactive_days=30).run_once()
+    assert not (saves / "camp").exists()
+
+    await TranscriptLogger().log_message("camp", "AI", "welcome back")
+
+    assert not campaign_archive.is_archived("camp")
+    messages = [e["message"] for e in JsonlTranscriptStore().iter_entries("camp")]
+    assert messages == ["m0", "m1", "m2", "welcome back"]
+    # The restore counts as activity, so the next scan leaves it alone
+    assert CampaignArchiver(inactive_days=30).run_once()["archived"] == []
+
+
+def test_reading_archived_campaign_restores_it(saves):
+    _make_campaign(saves, "camp", age_days=60)
+    index = CampaignMemoryIndex()
+    index.add({"timestamp": "t", "author": "AI", "message": "dragon lair"})
+    save_memory_index("camp", index)
+    old = time.time() - 60 * DAY
+    for path in (saves / "camp" / "memory_index.json", saves / "camp"):
+        os.utime(path, (old, old))
+    CampaignArchiver(inactive_days=30).run_once()
+
+    assert load_memory_index("camp").search("dragon") == [0]
+    assert (saves / "camp" / "transcript.log").is_file()
+
+
+def test_archive_is_abandoned_when_campaign_changes_while_packing(saves):
+    campaign_dir = _make_campaign(saves, "camp", age_days=60)
+
+    def write_during_packing(nbytes):
+        with open(campaign_dir / "transcript.log", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"author": "AI", "message": "late"}) + "\n")
+
+    assert campaign_archive.archive_campaign("camp", throttle=write_during_packing) is None
+    assert (campaign_dir / "transcript.log").read_text().count("\n") >= 4
+    assert not campaign_archive.is_archived("camp")
+    assert not [name for name in os.listdir(campaign_archive.archive_dir()) if name.endswith(".tmp")]
+
+
+def test_concurrent_packers_of_one_campaign_leave_one_good_archive(saves):
+    _make_campaign(saves, "camp", lines=50, age_days=60)
+    results = []
+
+    def other_worker_packs_meanwhile(nbytes):
+        # Another worker archives the same campaign while this one is packing
+        if not results:
+            results.append(campaign_archive.archive_campaign("camp"))
+
+    assert campaign_archive.archive_campaign("camp", throttle=other_worker_packs_meanwhile) is None
+    assert results[0] > 0
+    assert not [name for name in os.listdir(campaign_archive.archive_dir()) if name.endswith(".tmp")]
+    assert campaign_archive.restore_if_archived("camp")
+    messages = [e["message"] for e in JsonlTranscriptStore().iter_entries("camp")]
+    assert messages == [f"m{i}" for i in range(50)]
+
+
+def _hold_lock_in_child(kind, base_dir, held, release):
+    lock = (
+        campaign_archive.archiver_lock(base_dir)
+        if kind == "archiver"
+        else campaign_archive.campaign_lock("camp", base_dir)
+    )
+    with lock:
+        held.set()
+        release.wait(10)
+
+
+class OtherProcess:
+    """A forked process (another backend worker) holding one of the archive locks."""
+
+    def __init__(self, kind, base_dir):
+        context = multiprocessing.get_context("fork")
+        self.held, self.release = context.Event(), context.Event()
+        self.child = context.Process(
+            target=_hold_lock_in_child, args=(kind, base_dir, self.held, self.release)
+        )
+        self.child.start()
+        assert self.held.wait(10)
+
+    def stop(self):
+        self.release.set()
+        self.child.join(10)
+
+
+def test_only_one_process_archives_at_a_time(saves):
+    _make_campaign(saves, "old", age_days=400)
+    other = OtherProcess("archiver", str(saves))
+    try:
+        assert CampaignArchiver(inactive_days=30).run_once() == {"archived": [], "skipped": []}
+        assert (saves / "old").is_dir()
+    finally:
+        other.stop()
+    assert CampaignArchiver(inactive_days=30).run_once()["archived"] == ["old"]
+
+
+def test_campaign_lock_excludes_other_processes(saves):
+    other = OtherProcess("campaign", str(saves))
+    acquired = threading.Event()
+
+    def take_lock():
+        with campaign_archive.campaign_lock("camp", str(saves)):
+            acquired.set()
+
+    thread = threading.Thread(target=take_lock)
+    thread.start()
+    try:
+        assert not acquired.wait(0.2)
+    finally:
+        other.stop()
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_restore_appends_transcript_written_without_restoring(saves):
+    campaign_dir = _make_campaign(saves, "camp", lines=2, age_days=60)
+    campaign_archive.archive_campaign("camp")
+    campaign_dir.mkdir()
+    (campaign_dir / "transcript.log").write_text(json.dumps({"message": "new"}) + "\n")
+
+    assert campaign_archive.restore_if_archived("camp")
+    messages = [e["message"] for e in JsonlTranscriptStore().iter_entries("camp")]
+    assert messages == ["m0", "m1", "new"]
+
+
+def test_throttle_paces_reads_to_the_configured_rate(saves):
+    campaign_dir = _make_campaign(saves, "camp", age_days=60)
+    (campaign_dir / "blob.bin").write_bytes(os.urandom(300_000))
+    old = time.time() - 60 * DAY
+    for path in (campaign_dir / "blob.bin", campaign_dir):
+        os.utime(path, (old, old))
+    archiver = CampaignArchiver(inactive_days=30, bytes_per_second=1_000_000)
+
+    started = time.monotonic()
+    assert archiver.run_once()["archived"] == ["camp"]
+    assert time.monotonic() - started >= 0.25
+
+
+def test_stop_abandons_the_archive_being_packed(saves):
+    campaign_dir = _make_campaign(saves, "camp", age_days=60)
+    (campaign_dir / "blob.bin").write_bytes(os.urandom(300_000))
+    old = time.time() - 60 * DAY
+    for path in (campaign_dir / "blob.bin", campaign_dir):
+        os.utime(path, (old, old))
+    archiver = CampaignArchiver(inactive_days=30, bytes_per_second=100_000)  # ~3s to pack
+    results = []
+    scan = threading.Thread(target=lambda: results.append(archiver.run_once()))
+    scan.start()
+    time.sleep(0.1)
+
+    started = time.monotonic()
+    archiver.stop()
+    scan.join(5)
+    assert time.monotonic() - started < 1
+    assert results == [{"archived": [], "skipped": []}]
+    assert (campaign_dir / "blob.bin").is_file()
+    assert not campaign_archive.is_archived("camp")
+    assert not [name for name in os.listdir(campaign_archive.archive_dir()) if name.endswith(".tmp")]
+
+
+def test_staging_leftovers_are_swept_and_never_archived(saves):
+    _make_campaign(saves, "camp", age_days=45)
+    CampaignArchiver(inactive_days=30).run_once()
+    campaign_archive.restore_if_archived("camp")
+    staging = saves / ".staging"
+    assert staging.is_dir() and not os.listdir(staging)
+
+    # What a worker killed mid-archive or mid-restore leaves behind
+    for name in ("camp.archiving-4242", "other.v2.restoring-4243"):
+        (staging / name).mkdir()
+        (staging / name / "transcript.log").write_text("{}\n")
+    old = time.time() - 60 * DAY
+    os.utime(staging, (old, old))
+
+    assert CampaignArchiver(inactive_days=30).inactive_campaigns() == []
+    assert campaign_archive.sweep_staging() == 2
+    assert not os.listdir(staging)
+    assert (saves / "camp" / "transcript.log").is_file()
+
+
+def test_start_and_stop_background_thread(saves):
+    leftover = saves / ".staging" / "camp.restoring-4242"
+    leftover.mkdir(parents=True)
+    archiver = CampaignArchiver(inactive_days=30, interval_seconds=3600)
+    archiver.start()
+    assert archiver._thread.name == "campaign-archiver"
+    deadline = time.monotonic() + 5
+    while leftover.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not leftover.exists()  # Swept on start, before the first scan
+    archiver.stop(timeout=5)
+    assert archiver._thread is None
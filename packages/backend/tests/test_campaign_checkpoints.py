@@ -0,0 +1,79 @@
+import os
+import pytest
+from packages.backend.components.campaign_checkpoints import (
+    CampaignCheckpointStore,
+    apply_diff,
+    diff_state,
+)
+from packages.shared.error_handler import NotFoundError
+
+
+def make_turn(turn):
+    return {
+        "party": {"pc1": {"hp": 40 - turn, "conditions": []}},
+        "npcs": {"innkeeper": {"mood": "calm" if turn < 3 else "angry"}},
+        "turn_note": f"turn {turn}",
+    }
+
+
+def test_diff_only_contains_changed_leaves():
+    old = {"a": {"b": 1, "c": 2}, "d": [1], "gone": True}
+    new = {"a": {"b": 1, "c": 3}, "d": [1, 2], "added": "x"}
+    ops = diff_state(old, new)
+    assert ["set", ["a", "c"], 3] in ops
+    assert ["set", ["d"], [1, 2]] in ops
+    assert ["del", ["gone"]] in ops
+    assert ["set", ["added"], "x"] in ops
+    assert len(ops) == 4
+    assert apply_diff(old, ops) == new
+
+
+def test_restore_any_turn(tmp_path):
+    store = CampaignCheckpointStore("camp", base_dir=str(tmp_path), snapshot_interval=3)
+    for turn in range(1, 9):
+        assert store.record(make_turn(turn)) == turn
+    for turn in range(1, 9):
+        assert store.restore(turn) == make_turn(turn)
+    files = sorted(os.listdir(tmp_path / "camp" / "checkpoints"))
+    assert files == [
+        "diffs-00000001.jsonl",
+        "diffs-00000004.jsonl",
+        "diffs-00000007.jsonl",
+        "snapshot-00000001.json",
+        "snapshot-00000004.json",
+        "snapshot-00000007.json",
+    ]
+
+
+def test_store_resumes_after_restart(tmp_path):
+    store = CampaignCheckpointStore("camp", base_dir=str(tmp_path), snapshot_interval=4)
+    for turn in range(1, 6):
+        store.record(make_turn(turn))
+    resumed = CampaignCheckpointStore("camp", base_dir=str(tmp_path), snapshot_interval=4)
+    assert resumed.latest_turn == 5
+    assert resumed.record(make_turn(6)) == 6
+    assert resumed.restore(6) == make_turn(6)
+
+
+def test_rewind_discards_later_turns(tmp_path):
+    store = CampaignCheckpointStore("camp", base_dir=str(tmp_path), snapshot_interval=3)
+    for turn in range(1, 8):
+        store.record(make_turn(turn))
+    assert store.rewind(2) == make_turn(2)
+    assert store.latest_turn == 2
+    with pytest.raises(NotFoundError):
+        store.restore(5)
+    store.record({"branch": True})
+    assert store.restore(3) == {"branch": True}
+    assert store.restore(2) == make_turn(2)
+
+
+def test_old_snapshots_are_pruned(tmp_path):
+    store = CampaignCheckpointStore(
+        "camp", base_dir=str(tmp_path), snapshot_interval=2, keep_snapshots=2
+    )
+    for turn in range(1, 10):
+        store.record(make_turn(turn))
+    with pytest.raises(NotFoundError):
+        store.restore(1)
+    assert store.restore(9) == make_turn(9)
@@ -0,0 +1,156 @@
+import os
+import shutil
+
+import pytest
+
+from packages.backend.components.message_processor import MessageProcessor
+from packages.shared import campaign_paths, transcript_logger
+from packages.shared.campaign_archive import archive_campaign
+from packages.shared.campaign_paths import CampaignId, CampaignPathResolver
+from packages.shared.error_handler import ValidationError
+from packages.shared.transcript_logger import JsonlTranscriptStore, TranscriptLogger
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    resolver = CampaignPathResolver(max_entries=8)
+    monkeypatch.setattr(campaign_paths, "_campaign_paths", resolver)
+    return resolver
+
+
+@pytest.fixture
+def fs_calls(monkeypatch):
+    """Count directory checks and creations."""
+    calls = []
+    real_makedirs, real_isdir = os.makedirs, os.path.isdir
+
+    def makedirs(path, *args, **kwargs):
+        calls.append(("makedirs", path))
+        return real_makedirs(path, *args, **kwargs)
+
+    def isdir(path):
+        calls.append(("isdir", path))
+        return real_isdir(path)
+
+    monkeypatch.setattr(os, "makedirs", makedirs)
+    monkeypatch.setattr(os.path, "isdir", isdir)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "campaign_id, valid",
+    [
+        ("campaign_1", True),
+        ("Dragon lair-2.0", True),
+        ("キャンペーン", True),
+        ("a" * 100, True),
+        ("a" * 101, False),
+        ("", False),
+        ("   ", False),
+        (".", False),
+        ("...", False),
+        ("a..b", False),
+        (".hidden", True),
+        (".staging", False),
+        ("a/b", False),
+        ("a\\b", False),
+        ("a∕b", False),
+        ("a\x00b", False),
+        ("a\nb", False),
+        ("a\n", False),
+        (None, False),
+    ],
+)
+def test_campaign_id_validation(campaign_id, valid):
+    assert TranscriptLogger._is_valid_campaign_id(campaign_id) is valid
+    if valid:
+        assert CampaignId(campaign_id) == campaign_id
+    else:
+        with pytest.raises(ValidationError):
+            CampaignId(campaign_id)
+
+
+def test_parse_caches_valid_ids_only(resolver):
+    parsed = resolver.parse("camp")
+    assert type(parsed) is CampaignId
+    assert resolver.parse("camp") is parsed
+    assert resolver.parse(parsed) is parsed
+    for n in range(20):
+        with pytest.raises(ValidationError):
+            resolver.parse(f"../junk{n}")
+    assert resolver.parse("camp") is parsed
+    for n in range(20):
+        resolver.parse(f"camp{n}")
+    assert len(resolver._ids) == 8
+
+
+def test_ensure_dir_creates_each_directory_once(resolver, tmp_path, fs_calls):
+    restored = []
+
+    def on_missing(campaign_id, base_dir):
+        restored.append(campaign_id)
+
+    path = resolver.ensure_dir("camp", str(tmp_path), "sub", on_missing=on_missing)
+    assert path == str(tmp_path / "camp" / "sub") and os.path.isdir(path)
+    fs_calls.clear()
+    for _ in range(2):
+        assert resolver.ensure_dir("camp", str(tmp_path), "sub", on_missing=on_missing) == path
+    assert fs_calls == []
+    assert restored == ["camp"]
+
+    resolver.forget("camp", str(tmp_path))
+    resolver.ensure_dir("camp", str(tmp_path), "sub", on_missing=on_missing)
+    assert restored == ["camp", "camp"]
+
+
+@pytest.mark.asyncio
+async def test_transcript_writes_skip_directory_checks(resolver, tmp_path, fs_calls):
+    store = JsonlTranscriptStore(str(tmp_path))
+    await store.append("camp", {"timestamp": "t0", "author": "A", "message": "m0"})
+    fs_calls.clear()
+    for i in range(1, 5):
+        await store.append("camp", {"timestamp": f"t{i}", "author": "A", "message": f"m{i}"})
+    assert fs_calls == []
+    assert [e["message"] for e in store.iter_entries("camp")] == [f"m{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_write_recovers_when_cached_directory_disappears(resolver, tmp_path):
+    store = JsonlTranscriptStore(str(tmp_path))
+    await store.append("camp", {"timestamp": "t0", "author": "A", "message": "m0"})
+    # Removed without telling the resolver, as another worker would
+    shutil.rmtree(tmp_path / "camp")
+    await store.append("camp", {"timestamp": "t1", "author": "A", "message": "m1"})
+    assert [e["message"] for e in store.iter_entries("camp")] == ["m1"]
+
+
+@pytest.mark.asyncio
+async def test_archiving_forgets_the_directory(resolver, tmp_path, monkeypatch):
+    monkeypatch.setenv("CAMPAIGN_ARCHIVE_DIR", str(tmp_path / "archive"))
+    store = JsonlTranscriptStore(str(tmp_path / "saves"))
+    await store.append("camp", {"timestamp": "t0", "author": "A", "message": "m0"})
+    assert archive_campaign("camp", str(tmp_path / "saves"))
+    assert resolver._dirs == {}
+    await store.append("camp", {"timestamp": "t1", "author": "A", "message": "m1"})
+    assert [e["message"] for e in store.iter_entries("camp")] == ["m0", "m1"]
+
+
+@pytest.mark.asyncio
+async def test_message_processor_validates_once(resolver, tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_logger, "LOG_BASE_DIR", str(tmp_path))
+    processor = MessageProcessor()
+    assert processor.campaign_paths is resolver
+    await processor.process_player_message("../escape", "Player1", "hello")
+    assert list(tmp_path.iterdir()) == []
+
+    seen = []
+    real_log_message = processor.transcript_logger.log_message
+
+    async def log_message(campaign_id, author, message):
+        seen.append(campaign_id)
+        await real_log_message(campaign_id, author, message)
+
+    monkeypatch.setattr(processor.transcript_logger, "log_message", log_message)
+    await processor.process_player_message("camp", "Player1", "hello")
+    assert [type(c) for c in seen] == [CampaignId]
+    assert (tmp_path / "camp" / "transcript.log").exists()
@@ -0,0 +1,148 @@
+import multiprocessing
+
+import pytest
+
+from packages.backend.components.session_state_store import SessionStateStore
+from packages.shared.campaign_router import CampaignRouter, Handoff
+
+CAMPAIGNS = [f"campaign_{i}" for i in range(60)]
+
+
+def test_owner_is_stable_and_deterministic():
+    first = CampaignRouter(["a", "b", "c"])
+    second = CampaignRouter(["c", "a", "b"])
+    for cid in CAMPAIGNS:
+        assert first.owner(cid) == first.owner(cid) == second.owner(cid)
+    assert {first.owner(cid) for cid in CAMPAIGNS} == {"a", "b", "c"}
+
+
+def test_add_node_only_moves_campaigns_to_the_new_node():
+    router = CampaignRouter(["a", "b", "c"])
+    before = {cid: router.owner(cid) for cid in CAMPAIGNS}
+    handoffs = router.add_node("d", CAMPAIGNS)
+
+    moved = {h.campaign_id for h in handoffs}
+    assert 0 < len(moved) < len(CAMPAIGNS) / 2
+    for handoff in handoffs:
+        assert handoff == Handoff(handoff.campaign_id, before[handoff.campaign_id], "d")
+    for cid in CAMPAIGNS:
+        assert router.owner(cid) == ("d" if cid in moved else before[cid])
+
+
+def test_remove_node_only_moves_its_campaigns():
+    router = CampaignRouter(["a", "b", "c"])
+    before = {cid: router.owner(cid) for cid in CAMPAIGNS}
+    handoffs = router.remove_node("b", CAMPAIGNS)
+
+    assert {h.campaign_id for h in handoffs} == {c for c, o in before.items() if o == "b"}
+    assert all(h.source == "b" and h.target in ("a", "c") for h in handoffs)
+    assert router.nodes == ["a", "c"]
+
+
+def test_membership_edge_cases():
+    router = CampaignRouter()
+    with pytest.raises(LookupError):
+        router.owner("campaign")
+    assert router.add_node("a", ["campaign"]) == [Handoff("campaign", None, "a")]
+    assert router.add_node("a", ["campaign"]) == []
+    assert router.remove_node("missing", ["campaign"]) == []
+    assert router.remove_node("a", ["campaign"]) == [Handoff("campaign", "a", None)]
+
+
+def test_from_env_parses_worker_list(monkeypatch):
+    monkeypatch.setenv("FAST_API", "http://w1:8000/, http://w2:8000")
+    assert CampaignRouter.from_env().nodes == ["http://w1:8000", "http://w2:8000"]
+    monkeypatch.setenv("FAST_API", "")
+    assert CampaignRouter.from_env().nodes == ["http://localhost:8000"]
+
+
+def _worker(name, spill_dir, conn):
+    """A backend worker holding live campaign state in its own SessionStateStore."""
+    store = SessionStateStore(spill_dir=spill_dir)
+    while True:
+        command, campaign_id = conn.recv()
+        if command == "stop":
+            conn.send(None)
+            return
+        if command == "turn":
+            state = store.get(campaign_id) or {"turns": 0, "workers": []}
+            state["turns"] += 1
+            state["workers"].append(name)
+            store.put(campaign_id, state)
+            conn.send(state)
+        elif command == "release":
+            conn.send(store.release(campaign_id))
+        elif command == "adopt":
+            conn.send(store.adopt(campaign_id))
+
+
+class _Cluster:
+    def __init__(self, spill_dir):
+        self.spill_dir = spill_dir
+        self.router = CampaignRouter()
+        self.workers = {}
+
+    def call(self, name, command, campaign_id=None):
+        conn = self.workers[name][1]
+        conn.send((command, campaign_id))
+        return conn.recv()
+
+    def _apply(self, handoffs):
+        for handoff in handoffs:
+            assert self.call(handoff.source, "release", handoff.campaign_id)
+            assert self.call(handoff.target, "adopt", handoff.campaign_id)
+
+    def join(self, name, campaigns=()):
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_worker, args=(name, self.spill_dir, child))
+        process.start()
+        self.workers[name] = (process, parent)
+        handoffs = self.router.add_node(name, campaigns)
+        self._apply(handoffs)
+        return handoffs
+
+    def leave(self, name, campaigns=()):
+        handoffs = self.router.remove_node(name, campaigns)
+        self._apply(handoffs)
+        self.call(name, "stop")
+        process, _ = self.workers.pop(name)
+        process.join(timeout=10)
+        return handoffs
+
+    def turn(self, campaign_id):
+        owner = self.router.owner(campaign_id)
+        return owner, self.call(owner, "turn", campaign_id)
+
+    def stop(self):
+        for name in list(self.workers):
+            self.call(name, "stop")
+            self.workers.pop(name)[0].join(timeout=10)
+
+
+def test_state_follows_ownership_across_processes(tmp_path):
+    cluster = _Cluster(str(tmp_path / "sessions"))
+    campaigns = CAMPAIGNS[:24]
+    try:
+        for name in ("w1", "w2", "w3"):
+            cluster.join(name)
+        for _ in range(2):
+            for cid in campaigns:
+                cluster.turn(cid)
+
+        joined = cluster.join("w4", campaigns)
+        left = cluster.leave("w2", campaigns)
+        assert joined and left
+
+        for cid in campaigns:
+            owner, state = cluster.turn(cid)
+            # No turn was lost in a handoff, and a campaign only ever ran on
+            # its owner of the time (one change per handoff it took part in)
+            assert state["turns"] == 3
+            assert state["workers"][-1] == owner
+            changes = sum(
+                1 for prev, cur in zip(state["workers"], state["workers"][1:]) if prev != cur
+            )
+            moves = sum(1 for h in joined + left if h.campaign_id == cid)
+            assert changes == moves
+    finally:
+        cluster.stop()
@@ -0,0 +1,171 @@
+import gzip
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from packages.backend.api import campaign_transcripts
+from packages.backend.api.campaign_transcripts import parse_range
+from packages.backend.main import app
+from packages.shared import transcript_logger, transcript_store
+
+
+def _lines(prefix, count):
+    return "".join(
+        json.dumps({"timestamp": f"t{i}", "author": "P", "message": f"{prefix}-{i}"}) + "\n"
+        for i in range(count)
+    ).encode()
+
+
+@pytest.fixture
+def saves(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_logger, "LOG_BASE_DIR", str(tmp_path))
+    monkeypatch.delenv("TRANSCRIPT_STORE", raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def rotated_campaign(saves, monkeypatch):
+    # Small chunks so the stream spans several reads per segment
+    monkeypatch.setattr(campaign_transcripts, "EXPORT_CHUNK_SIZE", 100)
+    campaign = saves / "camp"
+    campaign.mkdir()
+    segments = [_lines("old", 20), _lines("mid", 20), _lines("new", 5)]
+    for name, data in zip(["transcript.log.2", "transcript.log.1", "transcript.log"], segments):
+        (campaign / name).write_bytes(data)
+    return b"".join(segments)
+
+
+async def _get(url, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(url, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_download_concatenates_segments_in_order(rotated_campaign):
+    response = await _get("/campaigns/camp/transcript")
+    assert response.status_code == 200
+    assert response.content == rotated_campaign
+    assert response.headers["content-length"] == str(len(rotated_campaign))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "camp-transcript.jsonl" in response.headers["content-disposition"]
+
+
+@pytest.mark.asyncio
+async def test_range_spanning_segments(rotated_campaign):
+    first_size = len(_lines("old", 20))
+    start, end = first_size - 10, first_size + 250
+    response = await _get("/campaigns/camp/transcript", headers={"Range": f"bytes={start}-{end}"})
+    assert response.status_code == 206
+    assert response.content == rotated_campaign[start : end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(rotated_campaign)}"
+
+    suffix = await _get("/campaigns/camp/transcript", headers={"Range": "bytes=-50"})
+    assert suffix.content == rotated_campaign[-50:]
+
+    unsatisfiable = await _get("/campaigns/camp/transcript", headers={"Range": "bytes=999999-"})
+    assert unsatisfiable.status_code == 416
+
+
+@pytest.mark.asyncio
+async def test_gzip_export(rotated_campaign):
+    response = await _get("/campaigns/camp/transcript?gzip=true")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(response.content) == rotated_campaign
+
+
+@pytest.mark.asyncio
+async def test_single_segment_is_served_as_file_with_ranges(saves):
+    (saves / "solo").mkdir()
+    data = _lines("solo", 10)
+    (saves / "solo" / "transcript.log").write_bytes(data)
+
+    full = await _get("/campaigns/solo/transcript")
+    assert full.content == data
+    partial = await _get("/campaigns/solo/transcript", headers={"Range": "bytes=5-14"})
+    assert partial.status_code == 206
+    assert partial.content == data[5:15]
+
+
+@pytest.mark.asyncio
+async def test_missing_and_invalid_campaigns(saves):
+    assert (await _get("/campaigns/nobody/transcript")).status_code == 404
+    assert (await _get("/campaigns/bad..id/transcript")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_export(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRANSCRIPT_STORE", "sqlite")
+    store = transcript_store.SQLiteTranscriptStore(str(tmp_path / "transcripts.db"))
+    monkeypatch.setattr(transcript_store, "_sqlite_store", store)
+    entries = [{"timestamp": f"t{i}", "author": "P", "message": f"m{i}"} for i in range(3)]
+    store.append_many(("camp", e) for e in entries)
+
+    response = await _get("/campaigns/camp/transcript")
+    assert [json.loads(line) for line in response.text.splitlines()] == entries
+    compressed = await _get("/campaigns/camp/transcript?gzip=1")
+    assert gzip.decompress(compressed.content) == response.content
+    assert (await _get("/campaigns/other/transcript")).status_code == 404
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_existence_check_is_per_campaign_and_off_the_loop(tmp_path, monkeypatch):
+    import threading
+
+    monkeypatch.setenv("TRANSCRIPT_STORE", "sqlite")
+    store = transcript_store.SQLiteTranscriptStore(str(tmp_path / "transcripts.db"))
+    monkeypatch.setattr(transcript_store, "_sqlite_store", store)
+    store.append_many(("camp", {"timestamp": "t", "author": "P", "message": "m"}) for _ in range(3))
+    monkeypatch.setattr(store, "campaign_ids", None)  # Never list every campaign
+    threads = []
+    count = store.count
+
+    def record_thread(campaign_id):
+        threads.append(threading.current_thread())
+        return count(campaign_id)
+
+    monkeypatch.setattr(store, "count", record_thread)
+
+    assert (await _get("/campaigns/camp/transcript")).status_code == 200
+    assert (await _get("/campaigns/other/transcript")).status_code == 404
+    assert threads and threading.main_thread() not in threads
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_segment_store_download_restores_an_archived_campaign(saves, monkeypatch):
+    from packages.shared import campaign_archive
+    from packages.shared.transcript_segment_store import SegmentTranscriptStore
+
+    monkeypatch.setenv("TRANSCRIPT_STORE", "segment")
+    monkeypatch.setenv("CAMPAIGN_ARCHIVE_DIR", str(saves / "archive"))
+    entries = [
+        {"timestamp": f"2025-01-01T00:00:0{i}+00:00", "author": "P", "message": f"m{i}"}
+        for i in range(3)
+    ]
+    store = SegmentTranscriptStore()
+    for entry in entries:
+        await store.append("camp", entry)
+    store.close()
+    assert campaign_archive.archive_campaign("camp")
+    assert not (saves / "camp").exists()
+
+    response = await _get("/campaigns/camp/transcript")
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == entries
+    assert not campaign_archive.is_archived("camp")
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=95-200", 100) == (95, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(HTTPException):
+        parse_range("bytes=100-", 100)
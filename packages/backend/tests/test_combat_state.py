@@ -0,0 +1,73 @@
+import pytest
+from packages.backend.components.combat_state import CombatState, CombatantRecord
+from packages.shared.error_handler import NotFoundError, ValidationError
+
+
+@pytest.fixture
+def state():
+    state = CombatState()
+    state.add_combatant(CombatantRecord("pc1", "Fighter", "party", 44, 18, 15, 2))
+    state.add_combatant(CombatantRecord("m1", "Goblin", "monsters", 7, 15, 18, 2))
+    state.add_combatant(CombatantRecord("pc2", "Rogue", "party", 30, 15, 15, 4))
+    return state
+
+
+def test_turns_follow_initiative_then_tiebreak(state):
+    turns = [state.next_turn().combatant_id for _ in range(4)]
+    assert turns == ["m1", "pc2", "pc1", "m1"]
+    assert state.round == 2
+
+
+def test_combatant_joining_mid_round_waits_for_its_slot(state):
+    state.next_turn()  # m1 (18)
+    state.next_turn()  # pc2 (15, dex 4)
+    state.add_combatant(CombatantRecord("m2", "Wolf", "monsters", 11, 13, 20))
+    state.add_combatant(CombatantRecord("m3", "Rat", "monsters", 1, 10, 1))
+    assert state.turn_order() == ["pc2", "pc1", "m3", "m2", "m1"]
+    assert [state.next_turn().combatant_id for _ in range(3)] == ["pc1", "m3", "m2"]
+    assert state.round == 2
+
+
+def test_removed_combatants_are_skipped(state):
+    state.next_turn()
+    state.remove_combatant("pc2")
+    assert state.next_turn().combatant_id == "pc1"
+    with pytest.raises(NotFoundError):
+        state.get("pc2")
+
+
+def test_damage_and_healing_are_clamped(state):
+    assert state.apply_damage("m1", 10) == 0
+    assert state.get("m1").is_down
+    assert state.heal("m1", 100) == 7
+
+
+def test_round_trip_serialization_preserves_turn_state(state):
+    state.next_turn()
+    state.next_turn()
+    state.get("pc1").conditions = ("prone", "poisoned")
+    restored = CombatState.from_bytes(state.to_bytes())
+    assert restored.round == state.round
+    assert restored.current.combatant_id == "pc2"
+    assert restored.turn_order() == state.turn_order()
+    assert restored.get("pc1").conditions == ("prone", "poisoned")
+    assert [restored.next_turn().combatant_id for _ in range(3)] == ["pc1", "m1", "pc2"]
+
+
+def test_undo_restores_previous_checkpoint(state):
+    state.next_turn()
+    state.checkpoint()
+    state.apply_damage("pc1", 20)
+    state.next_turn()
+    state.undo()
+    assert state.get("pc1").hit_points == 44
+    assert state.current.combatant_id == "m1"
+    with pytest.raises(ValidationError):
+        state.undo()
+
+
+def test_records_use_slots():
+    record = CombatantRecord("x", "X", "party", 1, 10, 10)
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(ValidationError):
+        CombatantRecord("y", "Y", "neutral", 1, 10, 10)
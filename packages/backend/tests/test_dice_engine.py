@@ -0,0 +1,78 @@
+import pytest
+from packages.backend.components.dice_engine import DiceEngine, compile_expression
+from packages.shared.error_handler import ValidationError
+
+
+def test_compile_keep_highest_with_modifier():
+    plan = compile_expression("4d6kh3+2")
+    assert len(plan.terms) == 1
+    term = plan.terms[0]
+    assert (term.count, term.sides, term.keep, term.keep_highest) == (4, 6, 3, True)
+    assert plan.constant == 2
+    assert plan.minimum == 5
+    assert plan.maximum == 20
+
+
+def test_compile_is_cached():
+    assert compile_expression("1d8+3") is compile_expression("1d8+3")
+
+
+@pytest.mark.parametrize(
+    "expression,keep_highest",
+    [("d20+5 adv", True), ("1d20+5 disadvantage", False)],
+)
+def test_advantage_and_disadvantage(expression, keep_highest):
+    term = compile_expression(expression).terms[0]
+    assert (term.count, term.keep, term.keep_highest) == (2, 1, keep_highest)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["", "abc", "1d1", "0d6", "4d6kh5", "1d6r6", "2d6 3", "1d6 adv", "101d6"],
+)
+def test_invalid_expressions_raise_validation_error(expression):
+    with pytest.raises(ValidationError):
+        compile_expression(expression)
+
+
+def test_seeded_single_rolls_are_reproducible():
+    first = DiceEngine(seed=42)
+    second = DiceEngine(seed=42)
+    assert [first.roll("3d6+1").total for _ in range(20)] == [
+        second.roll("3d6+1").total for _ in range(20)
+    ]
+    result = DiceEngine(seed=7).roll("4d6kh3")
+    assert len(result.rolls[0]["dice"]) == 4
+    assert result.rolls[0]["kept"] == sorted(result.rolls[0]["dice"], reverse=True)[:3]
+    assert result.total == sum(result.rolls[0]["kept"])
+
+
+def test_sample_stays_within_bounds():
+    engine = DiceEngine(seed=1)
+    samples = engine.sample("2d6-1d4+3", n=50_000)
+    plan = compile_expression("2d6-1d4+3")
+    assert samples.shape == (50_000,)
+    assert samples.min() >= plan.minimum
+    assert samples.max() <= plan.maximum
+
+
+def test_chance_at_least_matches_analytic_probability():
+    engine = DiceEngine(seed=3)
+    # P(d20 >= 11) = 0.5, with advantage = 1 - 0.5^2 = 0.75
+    assert engine.chance_at_least("1d20", 11, n=200_000) == pytest.approx(0.5, abs=0.01)
+    assert engine.chance_at_least("1d20 adv", 11, n=200_000) == pytest.approx(
+        0.75, abs=0.01
+    )
+
+
+def test_reroll_raises_the_average():
+    engine = DiceEngine(seed=5)
+    plain = engine.sample("2d6", n=200_000).mean()
+    great_weapon = engine.sample("2d6r2", n=200_000).mean()
+    assert great_weapon > plain + 0.5
+
+
+def test_distribution_sums_to_one():
+    distribution = DiceEngine(seed=9).distribution("1d4", n=10_000)
+    assert set(distribution) == {1, 2, 3, 4}
+    assert sum(distribution.values()) == pytest.approx(1.0)
@@ -0,0 +1,68 @@
+import pytest
+from packages.backend.components import encounter_simulator
+from packages.backend.components.encounter_simulator import (
+    Combatant,
+    EncounterSimulator,
+    combatant_from_monster_row,
+)
+from packages.shared.error_handler import ValidationError
+
+FIGHTER = Combatant("Fighter", 44, 18, 7, "1d8+4", attacks_per_round=2)
+CLERIC = Combatant("Cleric", 38, 18, 5, "1d8+3")
+GOBLIN = Combatant("Goblin", 7, 15, 4, "1d6+2", initiative_bonus=2)
+OGRE = Combatant("Ogre", 59, 11, 6, "2d8+4")
+
+
+def test_combatant_from_monster_row_parses_srd_text():
+    row = (
+        "Goblin",
+        15,
+        "7 (2d6)",
+        "Scimitar. Melee Weapon Attack: +4 to hit, reach 5 ft. Hit: 5 (1d6 + 2) slashing damage.",
+    )
+    goblin = combatant_from_monster_row(row)
+    assert goblin == Combatant("Goblin", 7, 15, 4, "1d6+2")
+
+
+def test_easy_encounter_is_won_by_party():
+    result = EncounterSimulator(max_workers=1).simulate(
+        [FIGHTER, CLERIC], [GOBLIN, GOBLIN], battles=2_000, seed=1
+    )
+    assert result.battles == 2_000
+    assert result.party_win_rate > 0.95
+    assert result.difficulty in ("easy", "medium")
+    assert set(result.survival_rates) == {"Fighter", "Cleric"}
+    assert sum(result.round_distribution.values()) == pytest.approx(1.0)
+    assert 1 <= result.round_percentile(0.5) <= result.round_percentile(0.99)
+
+
+def test_deadly_encounter_is_flagged():
+    result = EncounterSimulator(max_workers=1).simulate(
+        [CLERIC], [OGRE, OGRE, OGRE], battles=2_000, seed=2
+    )
+    assert result.party_win_rate < 0.1
+    assert result.difficulty == "deadly"
+
+
+def test_seeded_simulation_is_reproducible():
+    simulator = EncounterSimulator(max_workers=1)
+    first = simulator.simulate([FIGHTER], [OGRE], battles=500, seed=3)
+    second = simulator.simulate([FIGHTER], [OGRE], battles=500, seed=3)
+    assert first == second
+
+
+def test_large_batches_are_split_across_processes(monkeypatch):
+    monkeypatch.setattr(encounter_simulator, "PARALLEL_THRESHOLD", 500)
+    result = EncounterSimulator(max_workers=2).simulate(
+        [FIGHTER], [GOBLIN], battles=1_001, seed=4
+    )
+    assert result.battles == 1_001
+
+
+@pytest.mark.parametrize(
+    "party,monsters",
+    [([], [GOBLIN]), ([FIGHTER], []), ([FIGHTER], [Combatant("Bad", 5, 10, 0, "xd6")])],
+)
+def test_invalid_encounters_raise_validation_error(party, monsters):
+    with pytest.raises(ValidationError):
+        EncounterSimulator(max_workers=1).simulate(party, monsters, battles=10)
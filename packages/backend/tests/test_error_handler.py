@@ -1,6 +1,6 @@
 import pytest
 from fastapi import HTTPException
-from packages.shared.error_handler import handle_error, NotFoundError, ValidationError
+from packages.shared.error_handler import handle_error, NotFoundError, OverloadError, ValidationError
 
 
 def test_handle_error():
@@ -18,3 +18,10 @@ def test_not_found_error():
 def test_validation_error():
     with pytest.raises(ValidationError):
         raise ValidationError("Validation error occurred")
+
+
+def test_overload_error_maps_to_429_with_retry_after():
+    with pytest.raises(HTTPException) as exc_info:
+        handle_error(OverloadError(2.2))
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "3"}
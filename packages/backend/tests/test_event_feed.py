@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from packages.backend.api import campaign_events
+from packages.backend.components.message_processor import MessageProcessor
+from packages.backend.main import app
+from packages.shared.event_feed import EventHub
+
+
+async def _collect(subscription, count):
+    return [await asyncio.wait_for(subscription.__anext__(), 1) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_to_subscribers_in_order():
+    hub = EventHub()
+    first = hub.subscribe("camp")
+    second = hub.subscribe("camp")
+    other = hub.subscribe("other")
+    for i in range(3):
+        hub.publish("camp", {"message": str(i)})
+
+    for subscription in (first, second):
+        events = await _collect(subscription, 3)
+        assert [e["seq"] for e in events] == [1, 2, 3]
+        assert [e["message"] for e in events] == ["0", "1", "2"]
+    assert other._queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_resume_from_sequence_number():
+    hub = EventHub(history_size=3)
+    for i in range(5):
+        hub.publish("camp", {"message": str(i)})
+
+    resumed = hub.subscribe("camp", since=3)
+    hub.publish("camp", {"message": "live"})
+    assert [e["seq"] for e in await _collect(resumed, 3)] == [4, 5, 6]
+    assert not resumed.missed_events
+
+    # seq 2 is no longer retained
+    assert hub.subscribe("camp", since=1).missed_events
+    # Ahead of the channel: the sequence restarted
+    assert hub.subscribe("camp", since=99).missed_events
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_dropped_without_blocking_others():
+    hub = EventHub(queue_size=2)
+    slow = hub.subscribe("camp")
+    fast = hub.subscribe("camp")
+    for i in range(2):
+        hub.publish("camp", {"message": str(i)})
+    await _collect(fast, 2)
+    hub.publish("camp", {"message": "overflow"})
+
+    assert slow.dropped
+    assert [e async for e in slow] == []
+    assert hub.subscriber_count("camp") == 1
+    assert hub.dropped_subscribers == 1
+    assert (await _collect(fast, 1))[0]["message"] == "overflow"
+
+
+@pytest.mark.asyncio
+async def test_close_ends_iteration():
+    hub = EventHub()
+    subscription = hub.subscribe("camp")
+    waiter = asyncio.create_task(_collect(subscription, 1))
+    await asyncio.sleep(0)
+    subscription.close()
+    with pytest.raises(StopAsyncIteration):
+        await waiter
+    assert hub.subscriber_count("camp") == 0
+
+
+@pytest.mark.asyncio
+async def test_message_processor_publishes_logged_entries(tmp_path, monkeypatch):
+    from packages.shared import transcript_logger
+
+    monkeypatch.setattr(transcript_logger, "LOG_BASE_DIR", str(tmp_path))
+    hub = EventHub()
+    subscription = hub.subscribe("camp")
+    processor = MessageProcessor(event_hub=hub)
+
+    await processor.process_player_message("camp", "Player1", "I draw my sword.")
+    await processor.log_ai_response("camp", "The goblin flinches.")
+
+    events = await _collect(subscription, 2)
+    assert [(e["author"], e["message"]) for e in events] == [
+        ("Player1", "I draw my sword."),
+        ("AI", "The goblin flinches."),
+    ]
+    assert all("timestamp" in e for e in events)
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_formats_events_and_drop_notice():
+    hub = EventHub(queue_size=1)
+    hub.publish("camp", {"message": "old"})
+    subscription = hub.subscribe("camp", since=0)
+    stream = campaign_events.sse_stream(subscription, keepalive=0.05)
+
+    first = await stream.__anext__()
+    assert first.startswith("id: 1\nevent: transcript\ndata: ")
+    assert json.loads(first.split("data: ", 1)[1])["message"] == "old"
+    assert await stream.__anext__() == ": keepalive\n\n"
+
+    hub.publish("camp", {"message": "a"})
+    hub.publish("camp", {"message": "b"})  # Queue full: dropped
+    assert (await stream.__anext__()).startswith("event: dropped")
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert hub.subscriber_count("camp") == 0
+
+
+def test_websocket_backlog_and_live_events(monkeypatch):
+    hub = EventHub()
+    monkeypatch.setattr(campaign_events, "get_event_hub", lambda: hub)
+    hub.publish("camp", {"message": "before"})
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/campaigns/camp/ws?since=0") as ws:
+            assert ws.receive_json()["message"] == "before"
+            client.portal.call(hub.publish, "camp", {"message": "live"})
+            event = ws.receive_json()
+            assert (event["type"], event["seq"], event["message"]) == ("transcript", 2, "live")
+
+
+def test_sse_rejects_invalid_campaign_id():
+    with TestClient(app) as client:
+        assert client.get("/campaigns/bad..id/events").status_code == 400
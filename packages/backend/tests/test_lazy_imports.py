@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+
+def _imported_modules(module: str, cwd) -> set:
+    """Import `module` in a fresh interpreter and return the loaded module names."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print('\\n'.join(sys.modules))",
+        ],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_backend_import_has_no_side_effects(tmp_path):
+    modules = _imported_modules("packages.backend.main", tmp_path)
+    assert "cryptography" not in modules
+    assert "dotenv" not in modules
+    # The settings DB is opened in the lifespan, not at import
+    assert not (tmp_path / "server_settings.db").exists()
+
+
+def test_bot_cog_import_is_lazy(tmp_path):
+    modules = _imported_modules("packages.bot.cogs.admin_cog", tmp_path)
+    assert "httpx" not in modules
+    assert "fastapi" not in modules
+    assert "cryptography" not in modules
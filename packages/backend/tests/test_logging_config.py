@@ -0,0 +1,67 @@
+import io
+import json
+import logging
+import sys
+import pytest
+from packages.shared import logging_config
+from packages.shared.logging_config import DuplicateFilter, JsonFormatter
+
+
+def make_record(message, level=logging.ERROR, **extra):
+    record = logging.LogRecord("test.logger", level, __file__, 1, message, None, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(JsonFormatter().format(make_record("hello", campaign_id="c1")))
+    assert entry["message"] == "hello"
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "test.logger"
+    assert entry["campaign_id"] == "c1"
+    assert "timestamp" in entry
+
+
+def test_duplicate_errors_are_rate_limited(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logging_config.time, "monotonic", lambda: now[0])
+    dedupe = DuplicateFilter(window_seconds=60)
+
+    assert dedupe.filter(make_record("boom"))
+    assert not dedupe.filter(make_record("boom"))
+    assert not dedupe.filter(make_record("boom"))
+    assert dedupe.filter(make_record("other"))
+    assert dedupe.filter(make_record("boom", level=logging.INFO))
+
+    now[0] += 61
+    record = make_record("boom")
+    assert dedupe.filter(record)
+    assert record.suppressed_repeats == 2
+
+
+@pytest.fixture
+def captured_stdout(monkeypatch):
+    logging_config.shutdown_logging()
+    stream = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stream)
+    logging_config.setup_logging()
+    yield stream
+    logging_config.shutdown_logging()
+    monkeypatch.undo()
+    logging_config.setup_logging()
+
+
+def test_records_are_written_by_the_listener_thread(captured_stdout):
+    logging.getLogger("packages.test").error("Something failed: %s", "disk full")
+    logging_config.shutdown_logging()  # Flushes the queue
+    lines = [json.loads(line) for line in captured_stdout.getvalue().splitlines()]
+    assert {"logger": "packages.test", "message": "Something failed: disk full"}.items() <= lines[-1].items()
+
+
+def test_setup_logging_is_idempotent(captured_stdout):
+    logging_config.setup_logging()
+    root_handlers = [
+        h for h in logging.getLogger().handlers if isinstance(h, logging_config._DeferredQueueHandler)
+    ]
+    assert len(root_handlers) == 1
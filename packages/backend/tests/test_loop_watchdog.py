@@ -0,0 +1,84 @@
+import asyncio
+import functools
+import logging
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from packages.backend.api.server_config import get_settings_manager
+from packages.backend.components.server_settings_manager import ServerSettingsManager
+from packages.backend.main import app, lifespan
+from packages.shared import loop_watchdog
+from packages.shared.loop_watchdog import BlockingIOOnLoopError, LoopWatchdog, forbid_blocking_io
+
+
+def blocking_callback():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_stall_is_logged_with_the_blocking_stack(caplog):
+    watchdog = LoopWatchdog(threshold_ms=100, sample_ms=10, report_seconds=0)
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger=loop_watchdog.__name__):
+            blocking_callback()
+            await asyncio.sleep(0.05)
+    finally:
+        watchdog.stop()
+
+    assert watchdog.stalls == 1
+    [record] = caplog.records
+    assert "in blocking_callback" in record.getMessage()
+    assert record.blocked_ms >= 100
+    metrics = watchdog.metrics()
+    assert metrics["samples"] > 1
+    assert metrics["lag_max_ms"] >= 200
+    assert metrics["lag_p50_ms"] <= metrics["lag_p99_ms"] <= metrics["lag_max_ms"]
+
+
+@pytest.mark.asyncio
+async def test_blocking_application_callback_fails_forbid_blocking_io(tmp_path):
+    db_path = str(tmp_path / "settings.db")
+    with pytest.raises(BlockingIOOnLoopError, match="sqlite3.connect") as excinfo:
+        with forbid_blocking_io():
+            # The loop runs application code directly, as it would a callback
+            asyncio.get_running_loop().call_soon(ServerSettingsManager, db_path)
+            await asyncio.sleep(0.01)
+    assert "server_settings_manager.py" in excinfo.value.violations[0]
+
+
+@pytest.mark.asyncio
+async def test_offloaded_and_test_owned_io_is_allowed(tmp_path):
+    with forbid_blocking_io() as violations:
+        await asyncio.to_thread(ServerSettingsManager, str(tmp_path / "settings.db"))
+        (tmp_path / "fixture.txt").write_text("set up by the test")
+        time.sleep(0.001)
+    assert violations == []
+
+
+@pytest.mark.no_blocking_io
+@pytest.mark.asyncio
+async def test_backend_startup_keeps_sqlite_off_the_loop(tmp_path):
+    manager = functools.partial(ServerSettingsManager, str(tmp_path / "settings.db"))
+    app.dependency_overrides[get_settings_manager] = manager
+    try:
+        async with lifespan(app):
+            pass
+    finally:
+        app.dependency_overrides.pop(get_settings_manager, None)
+
+
+def test_loop_lag_endpoint(monkeypatch):
+    monkeypatch.setattr(loop_watchdog, "_loop_watchdog", LoopWatchdog(threshold_ms=100))
+    assert TestClient(app).get("/admin/loop-lag").status_code == 404
+    monkeypatch.setenv("ADMIN_API_TOKEN", "secret")
+    with TestClient(app) as client:
+        response = client.get("/admin/loop-lag", headers={"X-Admin-Token": "secret"})
+        assert client.get("/admin/loop-lag", headers={"X-Admin-Token": "x"}).status_code == 403
+    assert response.status_code == 200
+    body = response.json()
+    assert body["enabled"] and body["stalls"] == 0
+    assert {"lag_p50_ms", "lag_p90_ms", "lag_p99_ms", "lag_max_ms"} <= body.keys()
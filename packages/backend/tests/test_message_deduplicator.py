@@ -0,0 +1,48 @@
+from packages.backend.components.message_deduplicator import MessageDeduplicator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_duplicates_are_detected_per_campaign():
+    dedupe = MessageDeduplicator()
+    assert dedupe.check_and_record("camp", "1")
+    assert not dedupe.check_and_record("camp", "1")
+    assert dedupe.check_and_record("other", "1")
+    assert dedupe.duplicates == 1
+
+
+def test_ids_expire_after_the_window():
+    clock = FakeClock()
+    dedupe = MessageDeduplicator(window_seconds=60, clock=clock)
+    dedupe.check_and_record("camp", "1")
+    clock.now = 30
+    dedupe.check_and_record("camp", "2")
+    clock.now = 61
+    assert dedupe.check_and_record("camp", "1")  # expired, treated as new
+    assert not dedupe.check_and_record("camp", "2")
+
+
+def test_memory_is_bounded():
+    dedupe = MessageDeduplicator(max_ids_per_campaign=10, max_campaigns=3)
+    for campaign in range(5):
+        for message in range(50):
+            dedupe.check_and_record(f"camp{campaign}", str(message))
+    assert len(dedupe) == 30
+    # Oldest IDs and least recently used campaigns were dropped
+    assert dedupe.check_and_record("camp4", "0")
+    assert not dedupe.check_and_record("camp4", "49")
+    assert dedupe.check_and_record("camp0", "49")
+
+
+def test_forget_allows_a_retry():
+    dedupe = MessageDeduplicator()
+    dedupe.check_and_record("camp", "1")
+    dedupe.forget("camp", "1")
+    dedupe.forget("missing", "1")
+    assert dedupe.check_and_record("camp", "1")
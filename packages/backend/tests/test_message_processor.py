@@ -150,3 +150,78 @@ async def test_process_player_message_handles_logging_error(monkeypatch):
 
     # Should not raise, but print error
     await processor.process_player_message("cid", "Player1", "Player says something")
+
+
+@pytest.mark.asyncio
+async def test_process_player_message_skips_redelivered_message_ids(monkeypatch):
+    import json
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        from packages.shared import transcript_logger
+
+        monkeypatch.setattr(transcript_logger, "LOG_BASE_DIR", temp_dir)
+
+        processor = MessageProcessor()
+        campaign_id = "dedupe_campaign"
+
+        assert await processor.process_player_message(
+            campaign_id, "Player1", "I open the door.", message_id=1001
+        )
+        assert not await processor.process_player_message(
+            campaign_id, "Player1", "I open the door.", message_id=1001
+        )
+        # Messages without an ID are never deduplicated
+        await processor.process_player_message(campaign_id, "Player1", "I wait.")
+        await processor.process_player_message(campaign_id, "Player1", "I wait.")
+
+        log_path = os.path.join(temp_dir, campaign_id, "transcript.log")
+        with open(log_path, "r", encoding="utf-8") as f:
+            messages = [json.loads(line)["message"] for line in f]
+        assert messages == ["I open the door.", "I wait.", "I wait."]
+
+
+@pytest.mark.asyncio
+async def test_failed_message_can_be_redelivered(monkeypatch):
+    class FlakyLogger:
+        def __init__(self):
+            self.calls = 0
+
+        async def log_message(self, *a, **kw):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("Simulated error")
+            return True
+
+    processor = MessageProcessor()
+    processor.transcript_logger = FlakyLogger()
+
+    await processor.process_player_message("cid", "Player1", "Hello", message_id="42")
+    assert await processor.process_player_message("cid", "Player1", "Hello", message_id="42")
+    assert processor.transcript_logger.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_store_write_lets_the_redelivery_through():
+    from packages.shared.transcript_logger import TranscriptLogger
+
+    class FailingOnceStore:
+        def __init__(self):
+            self.calls = 0
+            self.entries = []
+
+        async def append(self, campaign_id, entry):
+            self.calls += 1
+            if self.calls == 1:
+                raise OSError("disk full")
+            self.entries.append(entry)
+
+    store = FailingOnceStore()
+    processor = MessageProcessor()
+    processor.transcript_logger = TranscriptLogger(store=store)
+
+    assert await processor.process_player_message("cid", "Player1", "Hello", message_id="42")
+    assert store.entries == []
+    # The write failed, so the redelivery is processed rather than dropped
+    assert await processor.process_player_message("cid", "Player1", "Hello", message_id="42")
+    assert [entry["message"] for entry in store.entries] == ["Hello"]
+    assert not await processor.process_player_message("cid", "Player1", "Hello", message_id="42")
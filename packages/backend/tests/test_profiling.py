@@ -0,0 +1,99 @@
+import pstats
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+from packages.backend.main import app
+from packages.bot.cogs.utility_cog import UtilityCog
+from packages.shared import profiling
+from packages.shared.profiling import Profiler
+
+
+def busy_work():
+    return sum(i * i for i in range(20_000))
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    profiler = Profiler(enabled=True, sample_rate=1.0, output_dir=str(tmp_path))
+    monkeypatch.setattr(profiling, "_profiler", profiler)
+    return profiler
+
+
+def test_pstats_dump_is_written(profiler, tmp_path):
+    with profiler.profile("unit test") as label:
+        busy_work()
+    assert label == "unit test"
+    [dump] = profiler.list_profiles()
+    assert dump["name"].endswith(".prof")
+    stats = pstats.Stats(str(tmp_path / dump["name"]))
+    assert any(func[2] == "busy_work" for func in stats.stats)
+
+
+def test_collapsed_stacks_are_written(tmp_path):
+    profiler = Profiler(
+        enabled=True,
+        sample_rate=1.0,
+        output_dir=str(tmp_path),
+        output_format="collapsed",
+        interval_ms=1,
+    )
+    with profiler.profile("collapsed"):
+        for _ in range(20):
+            busy_work()
+    [dump] = profiler.list_profiles()
+    content = (tmp_path / dump["name"]).read_text()
+    assert "busy_work" in content
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in content.splitlines())
+
+
+def test_unsampled_and_disabled_profiles_are_skipped(tmp_path):
+    for profiler in (
+        Profiler(enabled=False, sample_rate=1.0, output_dir=str(tmp_path)),
+        Profiler(enabled=True, sample_rate=0.0, output_dir=str(tmp_path)),
+    ):
+        with profiler.profile("skipped") as label:
+            busy_work()
+        assert label is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_old_dumps_are_pruned(tmp_path):
+    profiler = Profiler(enabled=True, sample_rate=1.0, output_dir=str(tmp_path), max_files=2)
+    for i in range(4):
+        with profiler.profile(f"request {i}"):
+            pass
+    assert len(profiler.list_profiles()) == 2
+
+
+def test_middleware_and_admin_endpoints(profiler, monkeypatch):
+    monkeypatch.setenv("ADMIN_API_TOKEN", "secret")
+    client = TestClient(app)
+    client.get("/docs")
+    headers = {"X-Admin-Token": "secret"}
+
+    listing = client.get("/admin/profiles", headers=headers)
+    assert listing.status_code == 200
+    names = [p["name"] for p in listing.json()["profiles"]]
+    assert any("GET_docs" in name for name in names)
+
+    download = client.get(f"/admin/profiles/{names[-1]}", headers=headers)
+    assert download.status_code == 200
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "x"}).status_code == 403
+    assert client.get("/admin/profiles/missing.prof", headers=headers).status_code == 404
+
+
+def test_admin_endpoints_hidden_when_profiling_disabled(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "_profiler", Profiler(enabled=False, output_dir=str(tmp_path)))
+    monkeypatch.setenv("ADMIN_API_TOKEN", "secret")
+    response = TestClient(app).get("/admin/profiles", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profiled_discord_command(profiler):
+    cog = UtilityCog(bot=MagicMock())
+    interaction = AsyncMock()
+    await cog.ping.callback(cog, interaction)
+    interaction.response.send_message.assert_awaited_with("Pong!", ephemeral=True)
+    [dump] = profiler.list_profiles()
+    assert "discord-ping" in dump["name"]
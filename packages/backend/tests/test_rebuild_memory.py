@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from packages.backend.components.campaign_memory_service import (
+    MEMORY_INDEX_VERSION,
+    CampaignMemoryIndex,
+    load_memory_index,
+    save_memory_index,
+)
+from packages.backend.tools import rebuild_memory
+from packages.shared.error_handler import ValidationError
+from packages.shared.transcript_logger import read_entries, transcript_segments
+
+
+def _entry(i, message=None, author="Player"):
+    return {
+        "timestamp": f"2025-01-01T00:00:{i:02d}+00:00",
+        "author": author,
+        "message": message or f"message {i}",
+    }
+
+
+def _write_segment(path, entries):
+    path.write_text("".join(json.dumps(e) + "\n" for e in entries), encoding="utf-8")
+
+
+def _make_campaign(base_dir, campaign_id, segments):
+    """segments: list of entry lists, oldest first."""
+    campaign_dir = base_dir / campaign_id
+    campaign_dir.mkdir(parents=True)
+    names = [f"transcript.log.{n}" for n in range(len(segments) - 1, 0, -1)]
+    for name, entries in zip(names + ["transcript.log"], segments):
+        _write_segment(campaign_dir / name, entries)
+
+
+def test_transcript_segments_are_ordered_oldest_first(tmp_path):
+    _make_campaign(tmp_path, "camp", [[_entry(0)], [_entry(1)], [_entry(2)], [_entry(3)]])
+    (tmp_path / "camp" / "transcript.log.tmp").write_text("")
+    names = [p.rsplit("/", 1)[-1] for p in transcript_segments("camp", str(tmp_path))]
+    assert names == ["transcript.log.3", "transcript.log.2", "transcript.log.1", "transcript.log"]
+    assert transcript_segments("missing", str(tmp_path)) == []
+
+
+def test_read_entries_streams_across_chunk_boundaries(tmp_path):
+    entries = [_entry(i, "x" * (i * 7)) for i in range(50)]
+    path = tmp_path / "transcript.log"
+    _write_segment(path, entries)
+    assert list(read_entries(str(path), chunk_size=16)) == entries
+
+
+def test_read_entries_skips_malformed_and_truncated_lines(tmp_path):
+    path = tmp_path / "transcript.log"
+    path.write_text(
+        json.dumps(_entry(0)) + "\n" + "{not json\n" + json.dumps(_entry(1)) + "\n" + '{"author": "AI", "mes',
+        encoding="utf-8",
+    )
+    assert list(read_entries(str(path), chunk_size=8)) == [_entry(0), _entry(1)]
+
+
+def test_memory_index_search_and_round_trip(tmp_path):
+    index = CampaignMemoryIndex()
+    index.add(_entry(0, "The party meets Elara in Waterdeep", "Player1"))
+    index.add(_entry(1, "Elara offers a map of the dungeon", "AI"))
+    index.add(_entry(2, "They leave Waterdeep at dawn", "Player2"))
+    assert index.search("elara") == [1, 0]
+    assert index.search("Waterdeep Elara") == [0]
+    assert index.search("of a") == []
+
+    save_memory_index("camp", index, str(tmp_path))
+    loaded = load_memory_index("camp", str(tmp_path))
+    assert loaded.entry_count == 3
+    assert loaded.authors["AI"] == 1
+    assert loaded.search("waterdeep") == [2, 0]
+    assert load_memory_index("other", str(tmp_path)) is None
+
+
+def test_memory_index_rejects_old_versions(tmp_path):
+    data = CampaignMemoryIndex().to_dict()
+    data["version"] = MEMORY_INDEX_VERSION - 1
+    with pytest.raises(ValidationError):
+        CampaignMemoryIndex.from_dict(data)
+
+
+def test_rebuild_all_replays_segments_in_order(tmp_path):
+    _make_campaign(tmp_path, "a", [[_entry(0, "dragon")], [_entry(1, "goblin")], [_entry(2)]])
+    _make_campaign(tmp_path, "b", [[_entry(i) for i in range(5)]])
+    (tmp_path / "not a campaign..").mkdir()
+
+    report = rebuild_memory.rebuild_all(str(tmp_path), workers=2)
+
+    assert report["campaigns"] == report["rebuilt"] == 2
+    assert report["entries"] == 8
+    assert report["entries_per_s"] > 0
+    index = load_memory_index("a", str(tmp_path))
+    assert index.search("dragon") == [0]
+    assert index.search("goblin") == [1]
+    assert index.last_timestamp == _entry(2)["timestamp"]
+    assert load_memory_index("b", str(tmp_path)).entry_count == 5
+    assert not (tmp_path / rebuild_memory.CHECKPOINT_FILE_NAME).exists()
+
+
+def test_rebuild_resumes_from_checkpoint(tmp_path):
+    for cid in ("a", "b", "c"):
+        _make_campaign(tmp_path, cid, [[_entry(0), _entry(1)]])
+    # A previous run finished "a" before being interrupted
+    checkpoint = rebuild_memory.RebuildCheckpoint(
+        str(tmp_path / rebuild_memory.CHECKPOINT_FILE_NAME)
+    )
+    checkpoint.mark_done({"campaign_id": "a", "entries": 2})
+
+    report = rebuild_memory.rebuild_all(str(tmp_path), workers=1)
+
+    assert report["rebuilt"] == 2 and report["skipped"] == 1
+    assert load_memory_index("a", str(tmp_path)) is None
+    assert load_memory_index("c", str(tmp_path)).entry_count == 2
+
+
+def test_checkpoint_from_other_index_version_is_ignored(tmp_path):
+    path = tmp_path / rebuild_memory.CHECKPOINT_FILE_NAME
+    path.write_text(json.dumps({"version": MEMORY_INDEX_VERSION - 1, "completed": {"a": {}}}))
+    assert rebuild_memory.RebuildCheckpoint(str(path)).completed == {}
+    path.write_text(json.dumps({"version": MEMORY_INDEX_VERSION, "completed": {"a": {}}}))
+    assert rebuild_memory.RebuildCheckpoint(str(path), restart=True).completed == {}
+
+
+def test_cli_prints_throughput(tmp_path, capsys):
+    _make_campaign(tmp_path, "a", [[_entry(0)]])
+    rebuild_memory.main(["--base-dir", str(tmp_path), "--workers", "1"])
+    assert "entries/s" in capsys.readouterr().out
@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from cryptography.fernet import Fernet
+
+from packages.backend.components.server_settings_manager import ServerSettingsManager
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+# Upper bound for a write in one worker to become visible in another
+PROPAGATION_TIMEOUT_S = 2.0
+
+WRITER = """
+import sys
+from packages.backend.components.server_settings_manager import ServerSettingsManager
+
+manager = ServerSettingsManager(db_path=sys.argv[1])
+manager.store_api_key(sys.argv[2], sys.argv[3])
+manager.close()
+"""
+
+
+@pytest.fixture
+def shared_key(monkeypatch):
+    key = Fernet.generate_key().decode()
+    monkeypatch.setenv("ENCRYPTION_KEY", key)
+    return key
+
+
+def _write_in_other_process(db_path, server_id, api_key):
+    subprocess.run(
+        [sys.executable, "-c", WRITER, db_path, server_id, api_key],
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+        check=True,
+        timeout=30,
+    )
+
+
+def _wait_for(manager, server_id, expected):
+    deadline = time.monotonic() + PROPAGATION_TIMEOUT_S
+    while True:
+        value = manager.retrieve_api_key(server_id)
+        if value == expected or time.monotonic() > deadline:
+            return value
+        time.sleep(0.01)
+
+
+def test_file_database_uses_wal(tmp_path, shared_key):
+    manager = ServerSettingsManager(db_path=str(tmp_path / "settings.db"))
+    mode = manager._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    manager.close()
+
+
+def test_write_in_other_process_invalidates_cache(tmp_path, shared_key):
+    db_path = str(tmp_path / "settings.db")
+    reader = ServerSettingsManager(db_path=db_path)
+    reader.store_api_key("guild", "old-key")
+    assert reader.retrieve_api_key("guild") == "old-key"  # now cached
+    assert reader.retrieve_api_key("other") is None  # cached miss
+
+    _write_in_other_process(db_path, "guild", "new-key")
+    _write_in_other_process(db_path, "other", "other-key")
+
+    assert _wait_for(reader, "guild", "new-key") == "new-key"
+    assert _wait_for(reader, "other", "other-key") == "other-key"
+    reader.close()
+
+
+def test_two_managers_see_each_others_writes(tmp_path, shared_key):
+    db_path = str(tmp_path / "settings.db")
+    first = ServerSettingsManager(db_path=db_path)
+    second = ServerSettingsManager(db_path=db_path)
+    first.store_api_key("guild", "v1")
+    assert second.retrieve_api_key("guild") == "v1"
+    second.store_api_key("guild", "v2")
+    assert first.retrieve_api_key("guild") == "v2"
+    first.close()
+    second.close()
+
+
+def test_repeated_reads_are_served_from_cache(tmp_path, shared_key, monkeypatch):
+    manager = ServerSettingsManager(db_path=str(tmp_path / "settings.db"))
+    manager.store_api_key("guild", "key")
+    calls = []
+    original = manager.decrypt
+    monkeypatch.setattr(manager, "decrypt", lambda data: calls.append(data) or original(data))
+    for _ in range(3):
+        assert manager.retrieve_api_key("guild") == "key"
+    assert calls == []
+    manager.close()
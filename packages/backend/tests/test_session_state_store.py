@@ -0,0 +1,95 @@
+import os
+import pytest
+from packages.backend.components.session_state_store import SessionStateStore
+from packages.shared.error_handler import ValidationError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_store(tmp_path, clock, budget=10_000, ttl=60):
+    return SessionStateStore(
+        memory_budget_bytes=budget,
+        idle_ttl_seconds=ttl,
+        spill_dir=str(tmp_path),
+        clock=clock,
+    )
+
+
+def test_put_and_get_resident_state(tmp_path, clock):
+    store = make_store(tmp_path, clock)
+    store.put("camp1", {"round": 1, "hp": {"pc1": 10}})
+    assert store.get("camp1") == {"round": 1, "hp": {"pc1": 10}}
+    assert store.get("missing") is None
+    assert store.metrics()["resident_entries"] == 1
+
+
+def test_over_budget_spills_least_recently_used(tmp_path, clock):
+    store = make_store(tmp_path, clock, budget=3_000)
+    store.put("camp1", "a" * 1_000)
+    store.put("camp2", "b" * 1_000)
+    store.get("camp1")  # camp2 becomes least recently used
+    store.put("camp3", "c" * 1_000)
+    metrics = store.metrics()
+    assert metrics["spill_count"] == 1
+    assert metrics["resident_bytes"] <= 3_000
+    assert os.path.exists(tmp_path / "camp2.state")
+
+    assert store.get("camp2") == "b" * 1_000
+    assert not os.path.exists(tmp_path / "camp2.state")
+    assert store.metrics()["rehydrate_count"] == 1
+
+
+def test_idle_entries_are_spilled_after_ttl(tmp_path, clock):
+    store = make_store(tmp_path, clock, ttl=60)
+    store.put("camp1", [1, 2, 3])
+    clock.now = 30
+    store.put("camp2", [4])
+    clock.now = 61
+    assert store.evict_idle() == 1
+    assert store.metrics()["resident_entries"] == 1
+    assert store.get("camp1") == [1, 2, 3]
+
+
+def test_zero_ttl_is_not_replaced_by_the_environment(tmp_path, clock, monkeypatch):
+    monkeypatch.setenv("SESSION_STATE_IDLE_TTL_SECONDS", "600")
+    store = make_store(tmp_path, clock, ttl=0)
+    assert store.idle_ttl_seconds == 0
+    store.put("camp1", [1])
+    assert store.metrics()["resident_entries"] == 0
+    assert store.get("camp1") == [1]
+
+
+def test_spilled_state_survives_a_new_store(tmp_path, clock):
+    store = make_store(tmp_path, clock, ttl=1)
+    store.put("camp1", {"turn": 7})
+    clock.now = 5
+    store.evict_idle()
+    fresh = make_store(tmp_path, clock)
+    assert fresh.get("camp1") == {"turn": 7}
+
+
+def test_delete_removes_memory_and_disk(tmp_path, clock):
+    store = make_store(tmp_path, clock, ttl=1)
+    store.put("camp1", 1)
+    clock.now = 5
+    store.evict_idle()
+    store.delete("camp1")
+    assert store.get("camp1") is None
+    assert not os.listdir(tmp_path)
+
+
+def test_invalid_campaign_id_is_rejected(tmp_path, clock):
+    store = make_store(tmp_path, clock)
+    with pytest.raises(ValidationError):
+        store.put("../escape", {})
@@ -0,0 +1,171 @@
+import asyncio
+import functools
+import logging
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from packages.backend.api.server_config import get_settings_manager
+from packages.backend.components.server_settings_manager import ServerSettingsManager
+from packages.backend.main import app, lifespan
+from packages.shared import shutdown, transcript_durability
+from packages.shared.error_handler import RESTARTING_MESSAGE, discord_error_handler
+from packages.shared.shutdown import ShutdownCoordinator, get_shutdown_coordinator
+from packages.shared.transcript_logger import TranscriptLogger
+from packages.shared.transcript_store import TranscriptStore
+
+
+@pytest.fixture
+def coordinator(monkeypatch):
+    coordinator = ShutdownCoordinator(deadline_seconds=1)
+    monkeypatch.setattr(shutdown, "_shutdown_coordinator", coordinator)
+    return coordinator
+
+
+class SlowStore(TranscriptStore):
+    def __init__(self, delay):
+        self.delay = delay
+        self.entries = []
+
+    async def append(self, campaign_id, entry):
+        await asyncio.sleep(self.delay)
+        self.entries.append(entry)
+
+    def iter_entries(self, campaign_id):
+        return iter(self.entries)
+
+    def campaign_ids(self):
+        return ["c1"] if self.entries else []
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drains_in_flight_writes_before_the_steps(coordinator):
+    store = SlowStore(delay=0.05)
+    steps = []
+    coordinator.add_step("first", lambda: steps.append(("first", len(store.entries))))
+    coordinator.add_step("second", AsyncMock(side_effect=lambda: steps.append(("second", 0))))
+
+    writes = [
+        asyncio.create_task(TranscriptLogger(store=store).log_message("c1", "Player", str(i)))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    report = await coordinator.shutdown()
+
+    assert all(write.done() for write in writes)
+    assert report["completed"] == 3 and report["abandoned"] == 0
+    assert report["steps"] == {"first": "ok", "second": "ok"}
+    assert steps == [("first", 3), ("second", 0)]
+    assert not coordinator.accepting
+    assert await coordinator.shutdown() is report
+
+
+@pytest.mark.asyncio
+async def test_work_left_at_the_deadline_is_reported_abandoned(caplog):
+    coordinator = ShutdownCoordinator(deadline_seconds=0.1)
+    coordinator.add_step("late", lambda: None)
+
+    async def stuck():
+        async with coordinator.work():
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(stuck())
+    await asyncio.sleep(0)
+    with caplog.at_level(logging.WARNING, logger=shutdown.__name__):
+        report = await coordinator.shutdown()
+    task.cancel()
+
+    assert report["completed"] == 0 and report["abandoned"] == 1
+    assert report["steps"] == {"late": "skipped"}
+    assert report["elapsed_s"] < 1
+    [record] = caplog.records
+    assert record.abandoned == 1
+
+
+@pytest.mark.asyncio
+async def test_a_slow_or_failing_step_does_not_stop_the_others():
+    coordinator = ShutdownCoordinator(deadline_seconds=0.3)
+    coordinator.add_step("broken", MagicMock(side_effect=OSError("disk gone")))
+    coordinator.add_step("slow", functools.partial(time.sleep, 0.1))
+
+    async def hangs():
+        await asyncio.sleep(10)
+
+    coordinator.add_step("hangs", hangs)
+    coordinator.add_step("after", lambda: None)
+
+    report = await coordinator.shutdown()
+    assert report["steps"] == {
+        "broken": "error: disk gone",
+        "slow": "ok",
+        "hangs": "timeout",
+        "after": "skipped",
+    }
+
+
+@pytest.mark.asyncio
+async def test_zero_deadline_runs_the_steps_without_draining(monkeypatch):
+    monkeypatch.setenv("SHUTDOWN_DEADLINE_SECONDS", "30")
+    coordinator = ShutdownCoordinator(deadline_seconds=0)
+    coordinator.add_step("flush", functools.partial(time.sleep, 0.01))
+
+    async def stuck():
+        async with coordinator.work():
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(stuck())
+    await asyncio.sleep(0)
+    report = await asyncio.wait_for(coordinator.shutdown(), 1)
+    task.cancel()
+    assert report["abandoned"] == 1
+    assert report["steps"] == {"flush": "ok"}
+
+
+class DummyCog:
+    def __init__(self, coordinator):
+        self.coordinator = coordinator
+        self.tracked = []
+
+    @discord_error_handler()
+    async def act(self, interaction):
+        self.tracked.append(self.coordinator.in_flight)
+
+
+@pytest.mark.asyncio
+async def test_commands_are_tracked_and_refused_once_shutting_down(coordinator):
+    cog = DummyCog(coordinator)
+    interaction = MagicMock()
+    interaction.response = AsyncMock()
+
+    await cog.act(interaction)
+    await coordinator.shutdown()
+    await cog.act(interaction)
+
+    assert cog.tracked == [1]
+    interaction.response.send_message.assert_called_once_with(RESTARTING_MESSAGE, ephemeral=True)
+
+
+@pytest.mark.asyncio
+async def test_backend_lifespan_flushes_and_closes_on_the_way_out(tmp_path, caplog):
+    committer = transcript_durability.get_group_committer()
+    manager = ServerSettingsManager(str(tmp_path / "settings.db"))
+    app.dependency_overrides[get_settings_manager] = lambda: manager
+    try:
+        with caplog.at_level(logging.INFO, logger=shutdown.__name__):
+            async with lifespan(app):
+                first = get_shutdown_coordinator()
+    finally:
+        app.dependency_overrides.pop(get_settings_manager, None)
+
+    assert not first.accepting
+    [record] = caplog.records
+    assert record.steps == {"archiver": "ok", "transcripts": "ok", "settings": "ok"}
+    # The committer was closed and a later write gets a fresh one
+    assert transcript_durability._group_committer is None
+    assert transcript_durability.get_group_committer() is not committer
+    # The next app started in this process accepts work again
+    assert get_shutdown_coordinator().accepting
+    # An overridden settings manager is left to its owner
+    assert manager.retrieve_api_key("1") is None
+    manager.close()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from packages.shared import transcript_durability, transcript_logger
+from packages.shared.transcript_durability import GroupCommitter, trim_partial_tail
+from packages.shared.transcript_logger import JsonlTranscriptStore
+from packages.shared.transcript_store import SQLiteTranscriptStore
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Count fsync calls (still performing them)."""
+    calls = []
+    real_fsync = os.fsync
+
+    def counting_fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", counting_fsync)
+    return calls
+
+
+@pytest.fixture
+def committer(monkeypatch):
+    committer = GroupCommitter(interval_ms=50, max_entries=10_000)
+    monkeypatch.setattr(transcript_durability, "_group_committer", committer)
+    yield committer
+    committer.close()
+
+
+def _entry(i):
+    return {"timestamp": f"t{i}", "author": "Player", "message": f"m{i}"}
+
+
+def test_unknown_durability_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("TRANSCRIPT_DURABILITY", "sometimes")
+    with pytest.raises(ValueError, match="TRANSCRIPT_DURABILITY"):
+        JsonlTranscriptStore()
+
+
+@pytest.mark.asyncio
+async def test_none_mode_never_fsyncs(tmp_path, fsyncs):
+    store = JsonlTranscriptStore(str(tmp_path), durability="none")
+    for i in range(5):
+        await store.append("camp", _entry(i))
+    assert fsyncs == []
+    assert list(store.iter_entries("camp")) == [_entry(i) for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_always_mode_fsyncs_every_entry(tmp_path, fsyncs):
+    store = JsonlTranscriptStore(str(tmp_path), durability="always")
+    for i in range(5):
+        await store.append("camp", _entry(i))
+    # One per entry, plus the directory when the transcript was created
+    assert len(fsyncs) == 6
+
+
+@pytest.mark.asyncio
+async def test_group_commit_shares_fsyncs_across_campaigns(tmp_path, fsyncs, committer):
+    store = JsonlTranscriptStore(str(tmp_path), durability="group-commit")
+    campaigns = [f"camp{n}" for n in range(5)]
+    for cid in campaigns:
+        await store.append(cid, _entry(0))
+    fsyncs.clear()
+    commits = committer.commits
+
+    await asyncio.gather(
+        *(store.append(cid, _entry(i)) for i in range(1, 11) for cid in campaigns)
+    )
+
+    # 50 entries in 5 files: one sync per file per commit cycle
+    cycles = committer.commits - commits
+    assert len(fsyncs) <= 5 * cycles < 50
+    for cid in campaigns:
+        assert len(list(store.iter_entries(cid))) == 11
+
+
+@pytest.mark.asyncio
+async def test_group_commit_returns_early_when_batch_is_full(tmp_path, monkeypatch):
+    committer = GroupCommitter(interval_ms=10_000, max_entries=4)
+    monkeypatch.setattr(transcript_durability, "_group_committer", committer)
+    store = JsonlTranscriptStore(str(tmp_path), durability="group-commit")
+    try:
+        started = time.monotonic()
+        await asyncio.gather(*(store.append("camp", _entry(i)) for i in range(4)))
+        assert time.monotonic() - started < 5
+    finally:
+        committer.close()
+
+
+def test_group_commit_reports_fsync_errors(tmp_path, monkeypatch, committer):
+    def failing_fsync(fd):
+        raise OSError(5, "Input/output error")
+
+    monkeypatch.setattr(os, "fsync", failing_fsync)
+    fd = os.open(tmp_path / "transcript.log", os.O_WRONLY | os.O_CREAT)
+    with pytest.raises(OSError, match="Input/output"):
+        committer.add(fd).result(timeout=5)
+
+
+def test_close_commits_queued_entries(tmp_path):
+    committer = GroupCommitter(interval_ms=10_000)
+    fd = os.open(tmp_path / "transcript.log", os.O_WRONLY | os.O_CREAT)
+    future = committer.add(fd)
+    committer.close()
+    assert future.result(timeout=0) is None
+    with pytest.raises(RuntimeError):
+        committer.add(os.open(tmp_path / "transcript.log", os.O_RDONLY))
+
+
+@pytest.mark.parametrize(
+    "tail, expected_cut",
+    [
+        (b"", 0),
+        (b'{"author": "AI", "mess', 22),
+        (b"\0" * 100, 100),
+        (b"\0" * 100 + b"\n" + b"\0" * 20, 121),
+        (b"\n\n", 2),
+    ],
+)
+def test_trim_partial_tail(tmp_path, tail, expected_cut):
+    path = tmp_path / "transcript.log"
+    complete = b"".join(json.dumps(_entry(i)).encode() + b"\n" for i in range(3))
+    path.write_bytes(complete + tail)
+    assert trim_partial_tail(str(path)) == expected_cut
+    assert path.read_bytes() == complete
+
+
+def test_trim_partial_tail_of_file_without_complete_line(tmp_path):
+    path = tmp_path / "transcript.log"
+    path.write_bytes(b'{"author": ')
+    assert trim_partial_tail(str(path)) == 11
+    assert path.read_bytes() == b""
+    assert trim_partial_tail(str(tmp_path / "missing.log")) == 0
+
+
+@pytest.mark.asyncio
+async def test_first_write_after_crash_trims_partial_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_logger, "_recovered_paths", set())
+    log_path = tmp_path / "camp" / "transcript.log"
+    log_path.parent.mkdir()
+    log_path.write_bytes(json.dumps(_entry(0)).encode() + b'\n{"author": "AI", "mes')
+
+    store = JsonlTranscriptStore(str(tmp_path))
+    await store.append("camp", _entry(1))
+
+    assert log_path.read_bytes().count(b"\n") == 2
+    assert list(store.iter_entries("camp")) == [_entry(0), _entry(1)]
+
+
+@pytest.mark.parametrize("mode, expected", [("none", 1), ("group-commit", 2), ("always", 2)])
+def test_sqlite_synchronous_follows_durability(tmp_path, mode, expected):
+    store = SQLiteTranscriptStore(str(tmp_path / "t.db"), durability=mode)
+    try:
+        assert store._conn.execute("PRAGMA synchronous").fetchone()[0] == expected
+    finally:
+        store.close()
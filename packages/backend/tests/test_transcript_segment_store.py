@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+from packages.backend.main import app
+from packages.backend.tools import migrate_transcripts
+from packages.shared import transcript_logger
+from packages.shared.transcript_segment_store import (
+    INDEX_MAGIC,
+    SegmentReader,
+    SegmentTranscriptStore,
+    micros_to_timestamp,
+    segment_paths,
+    timestamp_to_micros,
+)
+
+
+def _entry(i, author="Player1", message=None):
+    return {
+        "timestamp": f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}.{i + 1:06d}+00:00",
+        "author": author,
+        "message": message or f"message {i} ✨",
+    }
+
+
+def _fill(store, campaign_id, entries):
+    for entry in entries:
+        store.append_sync(campaign_id, entry)
+
+
+def test_timestamps_round_trip_as_utc():
+    for timestamp in ["2025-01-01T00:00:00+00:00", "2025-06-30T12:34:56.789012+00:00"]:
+        assert micros_to_timestamp(timestamp_to_micros(timestamp)) == timestamp
+    assert micros_to_timestamp(timestamp_to_micros("2025-01-01T02:00:00+02:00")) == (
+        "2025-01-01T00:00:00+00:00"
+    )
+
+
+@pytest.mark.asyncio
+async def test_append_interns_authors_and_is_smaller_than_jsonl(tmp_path):
+    store = SegmentTranscriptStore(str(tmp_path))
+    entries = [_entry(i, author=["Player1", "AI"][i % 2]) for i in range(50)]
+    for entry in entries:
+        await store.append("camp", entry)
+
+    assert list(store.iter_entries("camp")) == entries
+    (path,) = segment_paths(store.segment_dir("camp"))
+    with SegmentReader(path) as reader:
+        assert not reader.sealed
+        assert reader.authors == ["Player1", "AI"]
+        assert reader[7] == entries[7] and reader[-1] == entries[-1]
+        with pytest.raises(IndexError):
+            reader[50]
+    jsonl_size = sum(len(json.dumps(e, ensure_ascii=False).encode()) + 1 for e in entries)
+    assert os.path.getsize(path) < jsonl_size * 0.6
+
+
+def test_full_segments_are_sealed_with_a_footer_index(tmp_path):
+    store = SegmentTranscriptStore(str(tmp_path), max_segment_bytes=1000)
+    entries = [_entry(i, author=f"P{i % 3}") for i in range(100)]
+    _fill(store, "camp", entries)
+
+    paths = segment_paths(store.segment_dir("camp"))
+    assert len(paths) > 2
+    for path in paths[:-1]:
+        with open(path, "rb") as f:
+            assert f.read()[-len(INDEX_MAGIC) :] == INDEX_MAGIC
+        with SegmentReader(path) as reader:
+            assert reader.sealed and len(reader) > 0
+    with SegmentReader(paths[-1]) as reader:
+        assert not reader.sealed
+    assert list(store.iter_entries("camp")) == entries
+    assert store.count("camp") == 100
+    assert store.recent_entries("camp", 30) == entries[-30:]
+    assert store.recent_entries("camp", 500) == entries
+
+
+def test_sealed_segment_lookups_use_the_index(tmp_path):
+    store = SegmentTranscriptStore(str(tmp_path), max_segment_bytes=600)
+    entries = [_entry(i) for i in range(40)]
+    _fill(store, "camp", entries)
+    first = segment_paths(store.segment_dir("camp"))[0]
+    with SegmentReader(first) as reader:
+        assert reader.sealed
+        assert reader._offsets == []  # Nothing was scanned
+        assert [reader[n] for n in reversed(range(len(reader)))] == entries[: len(reader)][::-1]
+
+
+def test_partial_record_from_crash_is_truncated_on_next_write(tmp_path):
+    store = SegmentTranscriptStore(str(tmp_path))
+    _fill(store, "camp", [_entry(0), _entry(1)])
+    (path,) = segment_paths(store.segment_dir("camp"))
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x02partial")
+
+    with SegmentReader(path) as reader:
+        assert len(reader) == 2  # Readers ignore the torn tail
+
+    restarted = SegmentTranscriptStore(str(tmp_path))
+    restarted.append_sync("camp", _entry(2))
+    assert list(restarted.iter_entries("camp")) == [_entry(0), _entry(1), _entry(2)]
+
+
+def test_writers_sharing_a_campaign_stay_consistent(tmp_path):
+    # Two stores stand in for two worker processes: each must notice the
+    # other's appends (and author IDs) before writing
+    first = SegmentTranscriptStore(str(tmp_path), max_segment_bytes=800)
+    second = SegmentTranscriptStore(str(tmp_path), max_segment_bytes=800)
+    entries = []
+    for i in range(60):
+        entry = _entry(i, author=f"P{i % 4}")
+        (first if i % 3 else second).append_sync("camp", entry)
+        entries.append(entry)
+    assert list(first.iter_entries("camp")) == entries
+
+
+@pytest.mark.asyncio
+async def test_segment_store_is_exported_as_jsonl(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_logger, "LOG_BASE_DIR", str(tmp_path))
+    monkeypatch.setenv("TRANSCRIPT_STORE", "segment")
+    logger = transcript_logger.TranscriptLogger()
+    assert isinstance(logger.store, SegmentTranscriptStore)
+    await asyncio.gather(*(logger.log_message("camp", "AI", f"m{i}") for i in range(3)))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/campaigns/camp/transcript")
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == list(logger.store.iter_entries("camp"))
+    assert sorted(e["message"] for e in lines) == ["m0", "m1", "m2"]
+
+
+def test_migrate_jsonl_into_segments(tmp_path):
+    entries = [_entry(i, author=["Player1", "AI"][i % 2]) for i in range(10)]
+    (tmp_path / "camp").mkdir()
+    (tmp_path / "camp" / "transcript.log").write_text(
+        "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries), encoding="utf-8"
+    )
+
+    report = migrate_transcripts.migrate(str(tmp_path), to="segment", batch_size=4)
+    assert report["migrated"] == ["camp"] and report["entries"] == 10
+    assert migrate_transcripts.migrate(str(tmp_path), to="segment")["skipped"] == ["camp"]
+    assert migrate_transcripts.migrate(str(tmp_path), to="segment", force=True)["entries"] == 10
+    assert list(SegmentTranscriptStore(str(tmp_path)).iter_entries("camp")) == entries
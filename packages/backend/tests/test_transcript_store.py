@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import pytest
+
+from packages.backend.tools import migrate_transcripts
+from packages.shared import transcript_store
+from packages.shared.transcript_logger import JsonlTranscriptStore, TranscriptLogger
+from packages.shared.transcript_segment_store import SegmentTranscriptStore
+from packages.shared.transcript_store import SQLiteTranscriptStore, create_transcript_store
+
+
+def _entry(second, author="Player1", message="hello"):
+    return {
+        "timestamp": f"2025-01-01T00:00:{second:02d}+00:00",
+        "author": author,
+        "message": message,
+    }
+
+
+ENTRIES = [
+    _entry(0, "Player1", "I search the dragon lair"),
+    _entry(1, "AI", "You find a golden key"),
+    _entry(2, "Player2", "I pick the lock with the key"),
+    _entry(3, "AI", "The dragon wakes up"),
+]
+
+
+@pytest.fixture(params=["jsonl", "sqlite", "segment"])
+def store(request, tmp_path):
+    if request.param == "jsonl":
+        store = JsonlTranscriptStore(str(tmp_path / "saves"))
+    elif request.param == "segment":
+        store = SegmentTranscriptStore(str(tmp_path / "saves"))
+    else:
+        store = SQLiteTranscriptStore(str(tmp_path / "transcripts.db"))
+    yield store
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_append_and_iterate(store):
+    for entry in ENTRIES:
+        await store.append("camp", entry)
+    await store.append("other", _entry(9))
+    assert list(store.iter_entries("camp")) == ENTRIES
+    assert store.campaign_ids() == ["camp", "other"]
+    assert list(store.iter_entries("missing")) == []
+
+
+@pytest.mark.asyncio
+async def test_query_by_author_time_and_text(store):
+    for entry in ENTRIES:
+        await store.append("camp", entry)
+    assert store.query("camp", author="AI") == [ENTRIES[1], ENTRIES[3]]
+    assert store.query("camp", since=ENTRIES[1]["timestamp"], until=ENTRIES[3]["timestamp"]) == [
+        ENTRIES[1],
+        ENTRIES[2],
+    ]
+    assert store.query("camp", text="dragon") == [ENTRIES[0], ENTRIES[3]]
+    assert store.query("camp", text="key", author="AI") == [ENTRIES[1]]
+    assert store.query("camp", limit=1) == [ENTRIES[0]]
+
+
+@pytest.mark.asyncio
+async def test_text_query_is_a_literal_substring(store):
+    entries = [
+        _entry(0, message="I can't open the trap-door"),
+        _entry(1, message='She said "AND then" and left'),
+        _entry(2, message="50% of the gold_coins"),
+        _entry(3, message="Dragonfire"),
+    ]
+    for entry in entries:
+        await store.append("camp", entry)
+    assert store.query("camp", text="can't") == [entries[0]]
+    assert store.query("camp", text="trap-door") == [entries[0]]
+    assert store.query("camp", text='"AND then"') == [entries[1]]
+    assert store.query("camp", text='"') == [entries[1]]
+    assert store.query("camp", text="AND") == [entries[1]]
+    assert store.query("camp", text="%") == [entries[2]]
+    assert store.query("camp", text="_c") == [entries[2]]
+    assert store.query("camp", text="DRAGON") == [entries[3]]
+    assert store.query("camp", text="agonf") == [entries[3]]
+    assert store.query("camp", text="NOT") == []
+
+
+@pytest.mark.asyncio
+async def test_sqlite_groups_concurrent_appends_into_batches(tmp_path, monkeypatch):
+    store = SQLiteTranscriptStore(str(tmp_path / "transcripts.db"), batch_size=50)
+    batches = []
+    original = store.append_many
+
+    def record(rows):
+        rows = list(rows)
+        batches.append(len(rows))
+        return original(rows)
+
+    monkeypatch.setattr(store, "append_many", record)
+    await asyncio.gather(*(store.append("camp", _entry(i % 60)) for i in range(120)))
+
+    assert sum(batches) == 120
+    assert len(batches) < 120 and max(batches) <= 50
+    assert store.count("camp") == 120
+    store.close()
+
+
+def test_sqlite_schema_has_indexes_and_fts(tmp_path):
+    store = SQLiteTranscriptStore(str(tmp_path / "transcripts.db"))
+    names = {row[0] for row in store._conn.execute("SELECT name FROM sqlite_master")}
+    assert {"idx_transcript_campaign_time", "idx_transcript_author", "transcript_fts"} <= names
+    plan = store._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM transcript_entries"
+        " WHERE campaign_id = 'c' AND timestamp >= '2025'"
+    ).fetchall()
+    assert "idx_transcript_campaign_time" in str([tuple(row) for row in plan])
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_logger_uses_configured_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRANSCRIPT_STORE", "sqlite")
+    monkeypatch.setenv("TRANSCRIPT_SQLITE_PATH", str(tmp_path / "transcripts.db"))
+    monkeypatch.setattr(transcript_store, "_sqlite_store", None)
+
+    logger = TranscriptLogger()
+    assert isinstance(logger.store, SQLiteTranscriptStore)
+    await logger.log_message("camp", "Player1", "Hello")
+    assert [e["message"] for e in logger.store.iter_entries("camp")] == ["Hello"]
+    logger.store.close()
+
+    monkeypatch.setenv("TRANSCRIPT_STORE", "flatfile")
+    with pytest.raises(ValueError):
+        create_transcript_store()
+
+
+def test_migrate_jsonl_into_sqlite(tmp_path):
+    base = tmp_path / "saves"
+    (base / "camp").mkdir(parents=True)
+    (base / "camp" / "transcript.log.1").write_text(
+        "".join(json.dumps(e) + "\n" for e in ENTRIES[:2]), encoding="utf-8"
+    )
+    (base / "camp" / "transcript.log").write_text(
+        "".join(json.dumps(e) + "\n" for e in ENTRIES[2:]), encoding="utf-8"
+    )
+    db_path = str(tmp_path / "transcripts.db")
+
+    report = migrate_transcripts.migrate(str(base), db_path, batch_size=3)
+    assert report["migrated"] == ["camp"] and report["entries"] == 4
+
+    again = migrate_transcripts.migrate(str(base), db_path)
+    assert again["skipped"] == ["camp"] and again["entries"] == 0
+    forced = migrate_transcripts.migrate(str(base), db_path, force=True)
+    assert forced["entries"] == 4
+
+    store = SQLiteTranscriptStore(db_path)
+    assert list(store.iter_entries("camp")) == ENTRIES
+    assert store.query("camp", text="dragon") == [ENTRIES[0], ENTRIES[3]]
+    store.close()
@@ -0,0 +1,95 @@
+"""
+Copy JSONL campaign transcripts into the SQLite or binary segment store.
+
+Usage:
+    python -m packages.backend.tools.migrate_transcripts [--base-dir data/saves]
+        [--to sqlite|segment] [--db data/transcripts.db] [--force] [--json]
+
+Each campaign's rotated and current segments are streamed oldest first and
+inserted in batches. Campaigns that already have entries in the target are
+skipped unless --force is given, in which case their entries are replaced.
+Set TRANSCRIPT_STORE to the target afterwards to switch the backend over.
+Binary segments are written next to the JSONL files, under
+<base-dir>/<campaign_id>/segments/.
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, Optional
+
+from packages.shared.logging_config import setup_logging
+from packages.shared.transcript_logger import JsonlTranscriptStore
+from packages.shared.transcript_segment_store import SegmentTranscriptStore
+from packages.shared.transcript_store import DEFAULT_BATCH_SIZE, SQLiteTranscriptStore
+
+
+def migrate(
+    base_dir: Optional[str] = None,
+    db_path: Optional[str] = None,
+    force: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    to: str = "sqlite",
+) -> Dict:
+    """Migrate every JSONL campaign. Returns a throughput report."""
+    source = JsonlTranscriptStore(base_dir)
+    if to == "segment":
+        target = SegmentTranscriptStore(base_dir)
+    else:
+        target = SQLiteTranscriptStore(db_path, batch_size=batch_size)
+    started = time.perf_counter()
+    migrated, skipped, entries = [], [], 0
+    try:
+        for campaign_id in source.campaign_ids():
+            if target.count(campaign_id):
+                if not force:
+                    skipped.append(campaign_id)
+                    continue
+                target.delete_campaign(campaign_id)
+            batch = []
+            for entry in source.iter_entries(campaign_id):
+                batch.append((campaign_id, entry))
+                if len(batch) >= batch_size:
+                    entries += target.append_many(batch)
+                    batch = []
+            entries += target.append_many(batch)
+            migrated.append(campaign_id)
+    finally:
+        target.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "migrated": migrated,
+        "skipped": skipped,
+        "entries": entries,
+        "elapsed_s": elapsed,
+        "entries_per_s": entries / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-dir", default=None, help="JSONL campaign saves directory")
+    parser.add_argument(
+        "--to", choices=["sqlite", "segment"], default="sqlite", help="Target store"
+    )
+    parser.add_argument("--db", default=None, help="SQLite transcript database")
+    parser.add_argument(
+        "--force", action="store_true", help="Replace campaigns already in the database"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    report = migrate(args.base_dir, args.db, args.force, to=args.to)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"Migrated {len(report['migrated'])} campaigns "
+            f"({len(report['skipped'])} already present): {report['entries']} entries in "
+            f"{report['elapsed_s']:.1f}s, {report['entries_per_s']:.0f} entries/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Rebuild campaign memory indexes from the transcript logs.
+
+Usage:
+    python -m packages.backend.tools.rebuild_memory [--base-dir data/saves]
+        [--workers N] [--restart] [--json]
+
+Every campaign in the configured transcript store (TRANSCRIPT_STORE) is
+replayed oldest entry first (for the JSONL store: its rotated and current
+segments, streamed) and its memory_index.json under the base directory is
+rewritten. Campaigns are processed in parallel in a process pool. Finished
+campaigns are recorded in a checkpoint file in the base directory, so an
+interrupted rebuild resumes with the campaigns that were not done; the
+checkpoint is discarded when MEMORY_INDEX_VERSION changes or with --restart.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from packages.backend.components.campaign_memory_service import (
+    MEMORY_INDEX_VERSION,
+    CampaignMemoryIndex,
+    save_memory_index,
+)
+from packages.shared import transcript_logger
+from packages.shared.logging_config import setup_logging
+from packages.shared.transcript_store import create_transcript_store
+
+CHECKPOINT_FILE_NAME = ".memory_rebuild.json"
+
+
+def find_campaigns(base_dir: str) -> List[str]:
+    """Campaign IDs with at least one transcript entry."""
+    store = create_transcript_store(base_dir=base_dir, shared=False)
+    try:
+        return store.campaign_ids()
+    finally:
+        store.close()
+
+
+def rebuild_campaign(campaign_id: str, base_dir: str) -> Dict:
+    """Replay one campaign's transcript into a fresh memory index."""
+    started = time.perf_counter()
+    index = CampaignMemoryIndex()
+    store = create_transcript_store(base_dir=base_dir, shared=False)
+    try:
+        for entry in store.iter_entries(campaign_id):
+            index.add(entry)
+    finally:
+        store.close()
+    save_memory_index(campaign_id, index, base_dir)
+    return {
+        "campaign_id": campaign_id,
+        "entries": index.entry_count,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+class RebuildCheckpoint:
+    """Campaigns already rebuilt with the current index version."""
+
+    def __init__(self, path: str, restart: bool = False):
+        self.path = path
+        self.completed: Dict[str, Dict] = {}
+        if restart:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get("version") == MEMORY_INDEX_VERSION:
+            self.completed = data.get("completed", {})
+
+    def mark_done(self, result: Dict) -> None:
+        self.completed[result["campaign_id"]] = {"entries": result["entries"]}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MEMORY_INDEX_VERSION, "completed": self.completed}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def rebuild_all(
+    base_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+    restart: bool = False,
+) -> Dict:
+    """Rebuild every campaign not already done. Returns a throughput report."""
+    base_dir = base_dir or transcript_logger.LOG_BASE_DIR
+    checkpoint = RebuildCheckpoint(os.path.join(base_dir, CHECKPOINT_FILE_NAME), restart)
+    campaigns = find_campaigns(base_dir)
+    pending = [cid for cid in campaigns if cid not in checkpoint.completed]
+
+    started = time.perf_counter()
+    entries = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(rebuild_campaign, cid, base_dir) for cid in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                checkpoint.mark_done(result)
+                entries += result["entries"]
+    elapsed = time.perf_counter() - started
+    # Everything is rebuilt; the next run starts from scratch
+    checkpoint.clear()
+
+    return {
+        "campaigns": len(campaigns),
+        "rebuilt": len(pending),
+        "skipped": len(campaigns) - len(pending),
+        "entries": entries,
+        "elapsed_s": elapsed,
+        "entries_per_s": entries / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-dir", default=None, help="Campaign saves directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore the checkpoint and rebuild everything"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    report = rebuild_all(args.base_dir, args.workers, args.restart)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"Rebuilt {report['rebuilt']} of {report['campaigns']} campaigns "
+            f"({report['skipped']} already done): {report['entries']} entries in "
+            f"{report['elapsed_s']:.1f}s, {report['entries_per_s']:.0f} entries/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 import discord
 from discord.ext import commands
-import httpx
-from dotenv import load_dotenv
 from packages.shared.error_handler import (
     handle_error,
     ValidationError,
     NotFoundError,
     discord_error_handler,
 )  # noqa: F401
-import os
+from packages.bot.rate_limiter import raise_for_overload
+from packages.shared.campaign_router import CampaignRouter
+from packages.shared.profiling import profiled_command
 
 
 class AdminCog(commands.Cog):
@@ -16,14 +16,38 @@ class AdminCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.api_base_url = os.getenv(
+        # FAST_API may list several backend workers, comma-separated;
+        # campaign-scoped requests go to backend_router.owner(campaign_id)
+        self.backend_router = CampaignRouter.from_env(
             "FAST_API", "http://localhost:8000"
         )  # Adjust if backend runs elsewhere
+        # Server settings live in the shared database, so any worker will do
+        self.api_base_url = self.backend_router.nodes[0]
+        # Long-lived client created in cog_load (or injected, e.g. routed to
+        # an in-process backend); when unset a short-lived client is created
+        # per request
+        self.http_client = None
+        self._owns_http_client = False
+
+    async def cog_load(self):
+        # httpx is only needed once the cog is loaded, not at import time
+        import httpx
+
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient()
+            self._owns_http_client = True
+
+    async def cog_unload(self):
+        if self._owns_http_client:
+            await self.http_client.aclose()
+            self.http_client = None
+            self._owns_http_client = False
 
     @discord.app_commands.command(
         name="server-setup",
         description="Explain the shared API key model and submission process",
     )
+    @profiled_command()
     @discord_error_handler()
     async def server_setup(self, interaction: discord.Interaction):
         perms = interaction.user.guild_permissions
@@ -44,6 +68,7 @@ class AdminCog(commands.Cog):
     @discord.app_commands.command(
         name="server-setkey", description="Set the server's shared API key"
     )
+    @profiled_command()
     @discord_error_handler()
     async def server_setkey(self, interaction: discord.Interaction, api_key: str):
         perms = interaction.user.guild_permissions
@@ -61,14 +86,20 @@ class AdminCog(commands.Cog):
             "player_roll_mode": "digital",
             "character_sheet_mode": "digital_sheet",
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.put(url, json=payload, timeout=10)
-            if response.status_code == 200:
-                await interaction.response.send_message(
-                    "API key securely stored for this server.", ephemeral=True
-                )
-            else:
-                raise ValidationError(f"Failed to store API key: {response.text}")
+        if self.http_client is not None:
+            response = await self.http_client.put(url, json=payload, timeout=10)
+        else:
+            import httpx
+
+            async with httpx.AsyncClient() as client:
+                response = await client.put(url, json=payload, timeout=10)
+        raise_for_overload(response)
+        if response.status_code == 200:
+            await interaction.response.send_message(
+                "API key securely stored for this server.", ephemeral=True
+            )
+        else:
+            raise ValidationError(f"Failed to store API key: {response.text}")
 
 
 async def setup(bot):
@@ -6,6 +6,7 @@ from packages.shared.error_handler import (
     NotFoundError,
     discord_error_handler,
 )
+from packages.shared.profiling import profiled_command
 
 
 # Message constants for maintainability
@@ -50,6 +51,7 @@ class UtilityCog(commands.Cog):
         pass
 
     @discord.app_commands.command(name="ping", description="Check if the bot is alive")
+    @profiled_command()
     @discord_error_handler()
     async def ping(self, interaction: discord.Interaction):
         message = "Pong!"
@@ -59,6 +61,7 @@ class UtilityCog(commands.Cog):
         name="getting-started",
         description="Show a step-by-step onboarding guide for new users and server owners.",
     )
+    @profiled_command()
     @discord_error_handler()
     async def getting_started(self, interaction: discord.Interaction):
         """Show a step-by-step onboarding guide for new users and server owners."""
@@ -68,6 +71,7 @@ class UtilityCog(commands.Cog):
         name="cost",
         description="Show transparent information about average API usage costs and link to documentation.",
     )
+    @profiled_command()
     @discord_error_handler()
     async def cost(self, interaction: discord.Interaction):
         """Show transparent information about average API usage costs and link to documentation."""
@@ -77,6 +81,7 @@ class UtilityCog(commands.Cog):
         name="help",
         description="List all available commands with brief descriptions and references to advanced help.",
     )
+    @profiled_command()
     @discord_error_handler()
     async def help(self, interaction: discord.Interaction):
         """List all available commands with brief descriptions and references to advanced help."""
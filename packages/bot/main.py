@@ -1,10 +1,18 @@
 import discord
 from discord.ext import commands
+import asyncio
+import logging
 import os
+import signal
 from dotenv import load_dotenv
+from packages.shared.logging_config import setup_logging
+from packages.shared.loop_watchdog import get_loop_watchdog
+from packages.shared.shutdown import flush_transcripts, get_shutdown_coordinator
 
 # Load environment variables from .env file
 load_dotenv()
+setup_logging()
+logger = logging.getLogger(__name__)
 
 intents = discord.Intents.default()
 intents.messages = True
@@ -16,12 +24,12 @@ bot = commands.Bot(command_prefix="/", intents=intents)
 
 @bot.event
 async def on_ready():
-    print(f"Logged in as {bot.user}")
+    logger.info(f"Logged in as {bot.user}")
     try:
         synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} commands globally.")
+        logger.info(f"Synced {len(synced)} commands globally.")
     except Exception as e:
-        print(f"Failed to sync commands: {e}")
+        logger.error(f"Failed to sync commands: {e}")
 
 
 async def load_cogs():
@@ -29,11 +37,43 @@ async def load_cogs():
     await bot.load_extension("cogs.admin_cog")
 
 
-if __name__ == "__main__":
-    import asyncio
+async def run_until_stopped(client, token, stop: asyncio.Event):
+    """
+    Run the bot until it exits or `stop` is set (SIGTERM/SIGINT), then shut
+    down: refuse new commands, drain running ones, close the Discord
+    connection (unloading cogs closes their HTTP clients) and flush
+    transcripts, within SHUTDOWN_DEADLINE_SECONDS.
+    """
+    runner = asyncio.create_task(client.start(token))
+    stopping = asyncio.create_task(stop.wait())
+    try:
+        await asyncio.wait({runner, stopping}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stopping.cancel()
+    coordinator = get_shutdown_coordinator()
+    coordinator.add_step("discord", client.close)
+    coordinator.add_step("transcripts", flush_transcripts)
+    report = await coordinator.shutdown()
+    if runner.done():
+        runner.result()  # Re-raise a failed login or connection
+    else:
+        runner.cancel()
+    return report
+
 
-    async def main():
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    watchdog = get_loop_watchdog()
+    watchdog.start()
+    try:
         await load_cogs()
-        await bot.start(os.getenv("DISCORD_BOT_TOKEN"))
+        await run_until_stopped(bot, os.getenv("DISCORD_BOT_TOKEN"), stop)
+    finally:
+        watchdog.stop()
+
 
+if __name__ == "__main__":
     asyncio.run(main())
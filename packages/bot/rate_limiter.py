@@ -0,0 +1,208 @@
+"""
+Token-bucket rate limiting for AI actions at the bot edge.
+
+Every AI action (a cog command decorated with @rate_limited(), or an
+in-character message checked with `check_message`) takes one token from
+its user's bucket and one from its guild's bucket. Buckets refill
+continuously at RATE_LIMIT_USER_PER_MINUTE / RATE_LIMIT_GUILD_PER_MINUTE
+tokens per minute and hold at most RATE_LIMIT_USER_BURST /
+RATE_LIMIT_GUILD_BURST tokens. When either is empty the action is refused
+at once with RateLimitedError, which discord_error_handler turns into an
+ephemeral "slow down" reply, instead of being queued behind the backend.
+
+Memory stays constant: a bucket that has been idle long enough to refill
+completely is indistinguishable from a new one and is dropped, and at most
+RATE_LIMIT_MAX_BUCKETS buckets are kept per scope (least recently used
+first out).
+
+The backend pushes back too: when it is overloaded it answers 429 with a
+Retry-After header (see packages/backend/middleware/admission.py), which
+`raise_for_overload` turns into OverloadError and discord_error_handler into
+an ephemeral "server is busy" reply.
+"""
+
+import functools
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from packages.shared.error_handler import OverloadError, RateLimitedError
+
+DEFAULT_USER_PER_MINUTE = 6
+DEFAULT_USER_BURST = 3
+DEFAULT_GUILD_PER_MINUTE = 30
+DEFAULT_GUILD_BURST = 10
+DEFAULT_MAX_BUCKETS = 10_000
+DEFAULT_BACKEND_RETRY_AFTER = 1.0
+
+
+class TokenBuckets:
+    """Token buckets keyed by ID, sharing one rate and capacity."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        burst: int,
+        max_buckets: int = DEFAULT_MAX_BUCKETS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_buckets = max_buckets
+        # Seconds after which an untouched bucket is full again
+        self.idle_seconds = burst / self.rate
+        self._clock = clock
+        # key -> (tokens, last update), least recently used first
+        self._buckets: "OrderedDict[object, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def tokens(self, key, now: float) -> float:
+        """Tokens available to `key` at `now`."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.burst)
+        tokens, updated = bucket
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def retry_after(self, key, now: float) -> float:
+        """Seconds until `key` has a whole token (0 if it has one now)."""
+        return max(0.0, (1 - self.tokens(key, now)) / self.rate)
+
+    def take(self, key, now: float) -> None:
+        self._buckets[key] = (self.tokens(key, now) - 1, now)
+        self._buckets.move_to_end(key)
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_buckets and now - updated < self.idle_seconds:
+                return
+            del self._buckets[key]
+
+
+class RateLimiter:
+    """Per-user and per-guild limits for AI actions."""
+
+    def __init__(
+        self,
+        user_per_minute: Optional[float] = None,
+        user_burst: Optional[int] = None,
+        guild_per_minute: Optional[float] = None,
+        guild_burst: Optional[int] = None,
+        max_buckets: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        max_buckets = max_buckets or int(os.getenv("RATE_LIMIT_MAX_BUCKETS", DEFAULT_MAX_BUCKETS))
+        self.users = TokenBuckets(
+            user_per_minute
+            or float(os.getenv("RATE_LIMIT_USER_PER_MINUTE", DEFAULT_USER_PER_MINUTE)),
+            user_burst or int(os.getenv("RATE_LIMIT_USER_BURST", DEFAULT_USER_BURST)),
+            max_buckets,
+            clock,
+        )
+        self.guilds = TokenBuckets(
+            guild_per_minute
+            or float(os.getenv("RATE_LIMIT_GUILD_PER_MINUTE", DEFAULT_GUILD_PER_MINUTE)),
+            guild_burst or int(os.getenv("RATE_LIMIT_GUILD_BURST", DEFAULT_GUILD_BURST)),
+            max_buckets,
+            clock,
+        )
+        self._clock = clock
+        self.refused = 0
+
+    def check(self, guild_id: Optional[int], user_id: int) -> None:
+        """
+        Take a token for the action or raise RateLimitedError. Tokens are
+        only taken when both the user and the guild have one, so a refused
+        action costs nothing. Actions outside a guild (DMs) only count
+        against the user.
+        """
+        now = self._clock()
+        scopes: List[Tuple[TokenBuckets, object]] = [(self.users, user_id)]
+        if guild_id is not None:
+            scopes.append((self.guilds, guild_id))
+        wait = max(buckets.retry_after(key, now) for buckets, key in scopes)
+        if wait > 0:
+            self.refused += 1
+            raise RateLimitedError(wait)
+        for buckets, key in scopes:
+            buckets.take(key, now)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured from the environment on first use."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def rate_limited():
+    """
+    Decorator for AI-facing Discord command methods. Place it below
+    @discord_error_handler() so a refusal is answered with an ephemeral
+    "slow down" message:
+
+        @discord.app_commands.command(...)
+        @profiled_command()
+        @discord_error_handler()
+        @rate_limited()
+        async def command(self, interaction, ...):
+            ...
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, interaction, *args, **kwargs):
+            get_rate_limiter().check(interaction.guild_id, interaction.user.id)
+            return await func(self, interaction, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def check_message(message) -> bool:
+    """
+    Rate-limit an in-character message (a discord.Message). Returns False if
+    it must be dropped. Messages have no ephemeral replies, so a refused
+    message is ignored rather than answered.
+    """
+    guild_id = message.guild.id if message.guild is not None else None
+    try:
+        get_rate_limiter().check(guild_id, message.author.id)
+    except RateLimitedError:
+        return False
+    return True
+
+
+def parse_retry_after(value: Optional[str], default: float = DEFAULT_BACKEND_RETRY_AFTER) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def raise_for_overload(response) -> None:
+    """Raise OverloadError if a backend response (httpx.Response) is a 429."""
+    if response.status_code == 429:
+        raise OverloadError(parse_retry_after(response.headers.get("Retry-After")))
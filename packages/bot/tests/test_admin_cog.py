@@ -50,3 +50,27 @@ async def test_server_setkey_failure(monkeypatch):
         interaction.response.send_message.assert_awaited_with(
             "Failed to store API key: Internal Server Error", ephemeral=True
         )
+
+
+@pytest.mark.asyncio
+async def test_server_setkey_backend_overloaded():
+    bot = MagicMock()
+    cog = AdminCog(bot)
+    interaction = MagicMock()
+    interaction.user.guild_permissions.administrator = True
+    interaction.guild_id = 123
+    interaction.response.send_message = AsyncMock()
+
+    class MockResponse:
+        status_code = 429
+        headers = {"Retry-After": "4"}
+        text = "Server overloaded"
+
+    async def mock_put(*args, **kwargs):
+        return MockResponse()
+
+    with patch("httpx.AsyncClient.put", new=mock_put):
+        await cog.server_setkey.callback(cog, interaction, "testkey")
+        interaction.response.send_message.assert_awaited_with(
+            "The server is busy right now. Please try again in 4s.", ephemeral=True
+        )
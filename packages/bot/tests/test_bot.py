@@ -143,3 +143,30 @@ async def test_server_setkey_success(client):
         await cog.server_setkey.callback(cog, interaction, "dummy_key")
         assert "API key securely stored" in interaction.message
     assert interaction.ephemeral is True
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = asyncio.Event()
+
+    async def start(self, token):
+        await self.closed.wait()
+
+    async def close(self):
+        self.closed.set()
+
+
+@pytest.mark.asyncio
+async def test_stop_signal_shuts_the_bot_down(monkeypatch):
+    from packages.shared import shutdown
+
+    monkeypatch.setattr(shutdown, "_shutdown_coordinator", shutdown.ShutdownCoordinator(1))
+    client = FakeClient()
+    stop = asyncio.Event()
+    asyncio.get_running_loop().call_later(0.01, stop.set)
+
+    report = await main.run_until_stopped(client, "token", stop)
+
+    assert client.closed.is_set()
+    assert report["steps"] == {"discord": "ok", "transcripts": "ok"}
+    assert report["abandoned"] == 0
@@ -0,0 +1,132 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from packages.bot import rate_limiter
+from packages.bot.rate_limiter import RateLimiter, TokenBuckets, check_message, rate_limited
+from packages.shared.error_handler import RateLimitedError, discord_error_handler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock, monkeypatch):
+    limiter = RateLimiter(
+        user_per_minute=60, user_burst=2, guild_per_minute=120, guild_burst=3, clock=clock
+    )
+    monkeypatch.setattr(rate_limiter, "_rate_limiter", limiter)
+    return limiter
+
+
+def test_user_burst_then_refill(limiter, clock):
+    limiter.check(1, 10)
+    limiter.check(1, 10)
+    with pytest.raises(RateLimitedError) as excinfo:
+        limiter.check(1, 10)
+    assert excinfo.value.retry_after == pytest.approx(1.0)
+    clock.now += 1
+    limiter.check(1, 10)
+
+
+def test_guild_limit_applies_across_users(limiter, clock):
+    for user_id in (10, 11, 12):
+        limiter.check(1, user_id)
+    with pytest.raises(RateLimitedError) as excinfo:
+        limiter.check(1, 13)
+    assert excinfo.value.retry_after == pytest.approx(0.5)
+    # Another guild is unaffected
+    limiter.check(2, 13)
+
+
+def test_refused_action_takes_no_tokens(limiter, clock):
+    for user_id in (10, 11, 12):
+        limiter.check(1, user_id)
+    for _ in range(5):
+        with pytest.raises(RateLimitedError):
+            limiter.check(1, 13)
+    assert limiter.refused == 5
+    clock.now += 0.5
+    # User 13's bucket is still full, and the guild refilled one token
+    limiter.check(1, 13)
+
+
+def test_direct_messages_only_count_against_the_user(limiter):
+    for _ in range(2):
+        limiter.check(None, 10)
+    assert len(limiter.guilds) == 0
+    with pytest.raises(RateLimitedError):
+        limiter.check(None, 10)
+
+
+def test_idle_buckets_are_evicted(clock):
+    buckets = TokenBuckets(per_minute=60, burst=5, clock=clock)
+    for key in range(100):
+        buckets.take(key, clock.now)
+    assert len(buckets) == 100
+    clock.now += buckets.idle_seconds
+    buckets.take("active", clock.now)
+    assert len(buckets) == 1
+
+
+def test_bucket_count_is_capped(clock):
+    buckets = TokenBuckets(per_minute=60, burst=5, max_buckets=10, clock=clock)
+    for key in range(1000):
+        buckets.take(key, clock.now)
+    assert len(buckets) == 10
+    assert buckets.tokens(999, clock.now) == 4
+    assert buckets.tokens(0, clock.now) == 5  # Evicted: a fresh bucket
+
+
+class DummyCog:
+    def __init__(self):
+        self.calls = 0
+
+    @discord_error_handler()
+    @rate_limited()
+    async def act(self, interaction):
+        self.calls += 1
+
+
+def _interaction(guild_id=1, user_id=10):
+    interaction = MagicMock()
+    interaction.guild_id = guild_id
+    interaction.user.id = user_id
+    interaction.response = AsyncMock()
+    return interaction
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_command_replies_slow_down(limiter):
+    cog = DummyCog()
+    interaction = _interaction()
+    for _ in range(3):
+        await cog.act(interaction)
+    assert cog.calls == 2
+    interaction.response.send_message.assert_called_once_with(
+        "Slow down! You can try again in 1s.", ephemeral=True
+    )
+
+
+def test_check_message(limiter):
+    message = MagicMock()
+    message.guild.id = 1
+    message.author.id = 10
+    assert check_message(message) and check_message(message)
+    assert not check_message(message)
+
+
+def test_parse_retry_after():
+    assert rate_limiter.parse_retry_after("3") == 3
+    assert rate_limiter.parse_retry_after(None) == 1
+    assert rate_limiter.parse_retry_after("soon") == 1
+    assert rate_limiter.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
@@ -0,0 +1 @@
+# Synthetic load generator for the bot -> backend -> transcript pipeline
@@ -0,0 +1,30 @@
+"""
+Run a load scenario against the in-process pipeline.
+
+Usage:
+    python -m packages.loadgen packages/loadgen/scenarios/smoke.json [--json] [--seed N]
+"""
+
+import argparse
+import asyncio
+import json
+
+from packages.loadgen.runner import LoadGenerator, format_report
+from packages.loadgen.scenario import Scenario
+from packages.shared.logging_config import setup_logging
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scenario", help="Path to a scenario JSON file")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    report = asyncio.run(LoadGenerator(Scenario.load(args.scenario), seed=args.seed).run())
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+
+class FakeResponse:
+    """Stands in for discord.InteractionResponse."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, message, ephemeral=False):
+        self.messages.append((message, ephemeral))
+
+    def is_done(self):
+        return bool(self.messages)
+
+
+class FakeInteraction:
+    """Minimal discord.Interaction for driving cog command callbacks."""
+
+    def __init__(self, guild_id: int, user_id: int, admin: bool = True):
+        self.guild_id = guild_id
+        self.user = SimpleNamespace(
+            id=user_id,
+            guild_permissions=SimpleNamespace(administrator=admin, manage_guild=admin),
+        )
+        self.response = FakeResponse()
+        self.followup = FakeResponse()
+        self.followup.send = self.followup.send_message
+
+
+class FakeLLMProvider:
+    """Returns canned narration after a configurable, jittered delay."""
+
+    def __init__(self, latency_ms: float, jitter_ms: float = 0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+
+    async def generate(self, prompt: str) -> str:
+        delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(delay, 0.0) / 1000)
+        return f"The world reacts to: {prompt[:80]}"
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from packages.backend.api.server_config import get_settings_manager
+from packages.backend.components.message_processor import MessageProcessor
+from packages.backend.components.server_settings_manager import ServerSettingsManager
+from packages.backend.main import app
+from packages.bot.cogs.admin_cog import AdminCog
+from packages.bot.cogs.utility_cog import UtilityCog
+from packages.loadgen.fakes import FakeInteraction, FakeLLMProvider
+from packages.loadgen.scenario import Scenario
+from packages.shared import transcript_logger
+
+BACKEND_BASE_URL = "http://backend.loadgen"
+
+# Slash command name -> (cog attribute on LoadGenerator, command attribute on the cog)
+COMMANDS = {
+    "ping": ("utility_cog", "ping"),
+    "help": ("utility_cog", "help"),
+    "cost": ("utility_cog", "cost"),
+    "getting-started": ("utility_cog", "getting_started"),
+    "server-setup": ("admin_cog", "server_setup"),
+    "server-setkey": ("admin_cog", "server_setkey"),
+}
+
+
+class StageStats:
+    """Latency samples and error count for one pipeline stage."""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+
+    def summary(self, elapsed_s: float) -> Dict[str, float]:
+        ordered = sorted(self.latencies_ms)
+
+        def percentile(q):
+            if not ordered:
+                return 0.0
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+        return {
+            "count": len(ordered),
+            "errors": self.errors,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "max_ms": ordered[-1] if ordered else 0.0,
+            "throughput_per_s": len(ordered) / elapsed_s if elapsed_s else 0.0,
+        }
+
+
+class LoadGenerator:
+    """
+    Drives fake Discord interactions through the real cogs and
+    MessageProcessor against an in-process backend and a fake LLM.
+
+    Arrivals for each stream (player messages and every slash command) follow
+    a Poisson process whose rate is shaped by the scenario's burst profile.
+    All state (settings DB, transcripts) goes to a throwaway directory.
+    """
+
+    def __init__(self, scenario: Scenario, seed: Optional[int] = None):
+        self.scenario = scenario
+        self._rng = random.Random(seed)
+        self.stages: Dict[str, StageStats] = {}
+        self.dropped = 0
+        self._tasks: set = set()
+        self.llm = FakeLLMProvider(scenario.llm_latency_ms, scenario.llm_jitter_ms, seed)
+        self.processor = MessageProcessor()
+        self.utility_cog = UtilityCog(bot=None)
+        self.admin_cog = AdminCog(bot=None)
+        self.admin_cog.api_base_url = BACKEND_BASE_URL
+
+    def _stage(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    async def _timed(self, name: str, coro):
+        started = time.perf_counter()
+        try:
+            result = await coro
+        except Exception:
+            self._stage(name).errors += 1
+            raise
+        self._stage(name).latencies_ms.append((time.perf_counter() - started) * 1000)
+        return result
+
+    def _timed_backend(self, asgi_app):
+        async def timed_app(scope, receive, send):
+            if scope["type"] != "http":
+                return await asgi_app(scope, receive, send)
+            await self._timed(f"backend.{scope['method']}", asgi_app(scope, receive, send))
+
+        return timed_app
+
+    def _pick_campaign(self):
+        index = self._rng.randrange(self.scenario.campaigns)
+        guild_id = 1_000 + index // self.scenario.campaigns_per_guild
+        return f"loadgen_campaign_{index}", guild_id
+
+    async def _player_turn(self) -> None:
+        campaign_id, _ = self._pick_campaign()
+        player = f"Player{self._rng.randrange(self.scenario.players_per_campaign)}"
+        message = f"{player} searches the room ({self._rng.random():.6f})"
+        started = time.perf_counter()
+        await self._timed(
+            "processor.player_message",
+            self.processor.process_player_message(campaign_id, player, message),
+        )
+        if self._rng.random() < self.scenario.ai_reply_probability:
+            narration = await self._timed("llm.generate", self.llm.generate(message))
+            await self._timed(
+                "processor.ai_response",
+                self.processor.log_ai_response(campaign_id, narration),
+            )
+        self._stage("pipeline.player_turn").latencies_ms.append(
+            (time.perf_counter() - started) * 1000
+        )
+
+    async def _command(self, name: str) -> None:
+        _, guild_id = self._pick_campaign()
+        cog_attr, command_attr = COMMANDS[name]
+        cog = getattr(self, cog_attr)
+        command = getattr(cog, command_attr)
+        interaction = FakeInteraction(guild_id, self._rng.randrange(1 << 40))
+        args = ("loadgen-api-key",) if name == "server-setkey" else ()
+        await self._timed(f"command.{name}", command.callback(cog, interaction, *args))
+
+    def _spawn(self, coro) -> None:
+        if len(self._tasks) >= self.scenario.max_in_flight:
+            coro.close()
+            self.dropped += 1
+            return
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _arrivals(self, rate: float, make_coro, started: float) -> None:
+        while True:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.scenario.duration_s:
+                return
+            current_rate = rate * self.scenario.rate_multiplier(elapsed)
+            if current_rate <= 0:
+                await asyncio.sleep(0.05)
+                continue
+            await asyncio.sleep(self._rng.expovariate(current_rate))
+            if time.perf_counter() - started < self.scenario.duration_s:
+                self._spawn(make_coro())
+
+    async def run(self) -> Dict:
+        """Run the scenario and return the per-stage report."""
+        for name in self.scenario.command_rates:
+            if name not in COMMANDS:
+                raise ValueError(f"Unknown command in scenario: {name!r}")
+
+        with tempfile.TemporaryDirectory(prefix="loadgen-") as data_dir:
+            original_log_dir = transcript_logger.LOG_BASE_DIR
+            transcript_logger.LOG_BASE_DIR = os.path.join(data_dir, "saves")
+            manager = ServerSettingsManager(db_path=os.path.join(data_dir, "settings.db"))
+            app.dependency_overrides[get_settings_manager] = lambda: manager
+            transport = httpx.ASGITransport(app=self._timed_backend(app))
+            try:
+                async with httpx.AsyncClient(
+                    transport=transport, base_url=BACKEND_BASE_URL
+                ) as client:
+                    self.admin_cog.http_client = client
+                    started = time.perf_counter()
+                    streams = [
+                        self._arrivals(self.scenario.message_rate, self._player_turn, started)
+                    ]
+                    for name, rate in self.scenario.command_rates.items():
+                        streams.append(
+                            self._arrivals(rate, lambda n=name: self._command(n), started)
+                        )
+                    await asyncio.gather(*streams)
+                    if self._tasks:
+                        await asyncio.gather(*self._tasks, return_exceptions=True)
+                    elapsed = time.perf_counter() - started
+            finally:
+                self.admin_cog.http_client = None
+                transcript_logger.LOG_BASE_DIR = original_log_dir
+                app.dependency_overrides.pop(get_settings_manager, None)
+
+        return {
+            "scenario": self.scenario.name,
+            "elapsed_s": elapsed,
+            "dropped": self.dropped,
+            "stages": {
+                name: stats.summary(elapsed) for name, stats in sorted(self.stages.items())
+            },
+        }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"Scenario {report['scenario']}: {report['elapsed_s']:.1f}s, "
+        f"{report['dropped']} arrivals dropped (max_in_flight reached)",
+        f"{'stage':<28}{'count':>9}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'per s':>10}",
+    ]
+    for name, stats in report["stages"].items():
+        lines.append(
+            f"{name:<28}{stats['count']:>9}{stats['errors']:>8}"
+            f"{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+            f"{stats['throughput_per_s']:>10.1f}"
+        )
+    return "\n".join(lines)
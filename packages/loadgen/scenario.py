@@ -0,0 +1,62 @@
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Dict
+
+from packages.shared.error_handler import ValidationError
+
+BURST_SHAPES = ("steady", "spike", "sine")
+
+
+@dataclass
+class Scenario:
+    """
+    Load scenario loaded from a JSON file in packages/loadgen/scenarios/.
+
+    `message_rate` is the average number of in-character player messages per
+    second across all campaigns; `command_rates` gives per-second rates for
+    slash commands. The burst shape modulates every rate over time.
+    """
+
+    name: str
+    duration_s: float
+    campaigns: int
+    campaigns_per_guild: int = 1
+    players_per_campaign: int = 4
+    message_rate: float = 10.0
+    ai_reply_probability: float = 1.0
+    command_rates: Dict[str, float] = field(default_factory=dict)
+    burst: Dict[str, float] = field(default_factory=lambda: {"shape": "steady"})
+    llm_latency_ms: float = 50.0
+    llm_jitter_ms: float = 20.0
+    max_in_flight: int = 500
+
+    def __post_init__(self):
+        if self.duration_s <= 0 or self.campaigns <= 0:
+            raise ValidationError("Scenario duration and campaign count must be positive.")
+        if self.burst.get("shape", "steady") not in BURST_SHAPES:
+            raise ValidationError(f"Burst shape must be one of {BURST_SHAPES}.")
+
+    @property
+    def guilds(self) -> int:
+        return math.ceil(self.campaigns / self.campaigns_per_guild)
+
+    def rate_multiplier(self, elapsed_s: float) -> float:
+        """Factor applied to every base rate at `elapsed_s` into the run."""
+        shape = self.burst.get("shape", "steady")
+        if shape == "spike":
+            start = self.burst.get("start_s", self.duration_s / 2)
+            length = self.burst.get("length_s", self.duration_s / 10)
+            if start <= elapsed_s < start + length:
+                return self.burst.get("factor", 10.0)
+            return 1.0
+        if shape == "sine":
+            period = self.burst.get("period_s", self.duration_s)
+            amplitude = self.burst.get("amplitude", 0.8)
+            return max(1.0 + amplitude * math.sin(2 * math.pi * elapsed_s / period), 0.0)
+        return 1.0
+
+    @classmethod
+    def load(cls, path: str) -> "Scenario":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
@@ -0,0 +1,61 @@
+import pytest
+from packages.loadgen.runner import LoadGenerator, format_report
+from packages.loadgen.scenario import Scenario
+from packages.shared import transcript_logger
+from packages.shared.error_handler import ValidationError
+
+
+def small_scenario(**overrides):
+    values = dict(
+        name="test",
+        duration_s=0.5,
+        campaigns=10,
+        campaigns_per_guild=2,
+        message_rate=60,
+        command_rates={"ping": 20, "server-setkey": 10},
+        llm_latency_ms=1,
+        llm_jitter_ms=0,
+    )
+    values.update(overrides)
+    return Scenario(**values)
+
+
+@pytest.mark.asyncio
+async def test_run_reports_every_stage():
+    original_log_dir = transcript_logger.LOG_BASE_DIR
+    report = await LoadGenerator(small_scenario(), seed=1).run()
+
+    stages = report["stages"]
+    for name in (
+        "processor.player_message",
+        "llm.generate",
+        "processor.ai_response",
+        "pipeline.player_turn",
+        "command.ping",
+        "command.server-setkey",
+        "backend.PUT",
+    ):
+        assert stages[name]["count"] > 0, name
+        assert stages[name]["p50_ms"] <= stages[name]["p99_ms"]
+    assert stages["backend.PUT"]["count"] == stages["command.server-setkey"]["count"]
+    assert transcript_logger.LOG_BASE_DIR == original_log_dir
+    assert "pipeline.player_turn" in format_report(report)
+
+
+@pytest.mark.asyncio
+async def test_arrivals_beyond_max_in_flight_are_dropped():
+    scenario = small_scenario(command_rates={}, llm_latency_ms=1000, max_in_flight=1)
+    report = await LoadGenerator(scenario, seed=2).run()
+    assert report["dropped"] > 0
+
+
+def test_burst_shapes():
+    spike = small_scenario(
+        duration_s=10, burst={"shape": "spike", "start_s": 2, "length_s": 1, "factor": 5}
+    )
+    assert spike.rate_multiplier(1) == 1.0
+    assert spike.rate_multiplier(2.5) == 5
+    sine = small_scenario(duration_s=10, burst={"shape": "sine", "amplitude": 0.5})
+    assert sine.rate_multiplier(2.5) == pytest.approx(1.5)
+    with pytest.raises(ValidationError):
+        small_scenario(burst={"shape": "square"})
@@ -0,0 +1,295 @@
+"""
+Per-campaign archives of inactive campaign directories.
+
+An archived campaign's directory (transcripts, checkpoints, memory index)
+is packed into one `<campaign_id>.tar.gz` under the archive directory and
+removed from the saves directory. Code that opens a campaign calls
+`restore_if_archived` first, which unpacks it back in place, so archival is
+invisible to callers apart from the latency of the first access.
+
+The archive directory is CAMPAIGN_ARCHIVE_DIR, or an `archive` directory
+next to the saves directory (data/archive for data/saves).
+
+Writers and the archiver coordinate through `campaign_lock`. It holds an
+in-process lock and an `flock` on a lock file in <archive dir>/.locks, so it
+also covers other backend workers. Campaigns share 64 lock stripes (and
+files, whose descriptors stay open), keeping the per-write cost to one
+flock/unlock pair. The archiver only removes a directory while holding the
+campaign's lock and after checking nothing changed since it was packed, and
+writers hold the same lock around each write. Archives are packed into a
+temporary file unique to the packer. With several workers,
+`archiver_lock` lets one process at a time scan for campaigns to archive.
+
+Campaign directories being removed or unpacked live in
+<saves dir>/.staging (a name campaign IDs cannot take) under a name ending
+in the process ID. `sweep_staging` removes what a process that died mid-way
+left there; the archiver runs it when it starts.
+
+The lock directory must not be removed while the backend runs. On
+platforms without fcntl the locks only cover the current process.
+"""
+
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not POSIX: in-process locking only
+    fcntl = None
+
+from packages.shared import transcript_logger
+from packages.shared.campaign_paths import STAGING_DIR_NAME, get_campaign_paths
+
+ARCHIVE_SUFFIX = ".tar.gz"
+LOCK_DIR_NAME = ".locks"
+ARCHIVER_LOCK_NAME = ".archiver.lock"
+_LOCK_STRIPES = 64
+
+_locks = [threading.RLock() for _ in range(_LOCK_STRIPES)]
+_lock_files: Dict[Tuple[str, int], int] = {}  # (lock dir, stripe) -> open descriptor
+_lock_files_guard = threading.Lock()
+_held = threading.local()  # (lock dir, stripe) -> depth of this thread's holds
+
+
+def _stripe(campaign_id: str) -> int:
+    # crc32 rather than hash(): str hashes differ between processes
+    return zlib.crc32(campaign_id.encode("utf-8")) % _LOCK_STRIPES
+
+
+def _lock_file(lock_dir: str, stripe: int) -> int:
+    key = (lock_dir, stripe)
+    fd = _lock_files.get(key)
+    if fd is None:
+        with _lock_files_guard:
+            fd = _lock_files.get(key)
+            if fd is None:
+                os.makedirs(lock_dir, exist_ok=True)
+                path = os.path.join(lock_dir, f"{stripe}.lock")
+                fd = _lock_files[key] = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    return fd
+
+
+def _forget_lock_files() -> None:
+    # A forked child shares its parent's open descriptors, and with them the
+    # parent's flocks: it must open its own
+    for fd in _lock_files.values():
+        os.close(fd)
+    _lock_files.clear()
+    _held.__dict__.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_lock_files)
+
+
+@contextmanager
+def campaign_lock(campaign_id: str, base_dir: Optional[str] = None) -> Iterator[None]:
+    """
+    Hold a campaign's lock, across threads and processes, guarding its
+    directory against being archived mid-write. Re-entrant per thread.
+    """
+    stripe = _stripe(campaign_id)
+    with _locks[stripe]:
+        if fcntl is None:
+            yield
+            return
+        key = (os.path.join(archive_dir(base_dir), LOCK_DIR_NAME), stripe)
+        held = _held.__dict__.setdefault("depth", {})
+        fd = _lock_file(*key)
+        if key not in held:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            held[key] = 0
+        held[key] += 1
+        try:
+            yield
+        finally:
+            held[key] -= 1
+            if not held[key]:
+                del held[key]
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def archiver_lock(base_dir: Optional[str] = None) -> Iterator[bool]:
+    """
+    Try to become the process that archives campaigns of `base_dir`. Yields
+    False, without waiting, if another process holds it.
+    """
+    if fcntl is None:
+        yield True
+        return
+    directory = archive_dir(base_dir)
+    os.makedirs(directory, exist_ok=True)
+    fd = os.open(os.path.join(directory, ARCHIVER_LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)  # Releases the flock
+
+
+def archive_dir(base_dir: Optional[str] = None) -> str:
+    base_dir = base_dir or transcript_logger.LOG_BASE_DIR
+    configured = os.getenv("CAMPAIGN_ARCHIVE_DIR")
+    if configured:
+        return configured
+    return os.path.join(os.path.dirname(os.path.abspath(base_dir)), "archive")
+
+
+def _staging_path(campaign_id: str, base_dir: str, action: str) -> str:
+    staging_dir = os.path.join(base_dir, STAGING_DIR_NAME)
+    os.makedirs(staging_dir, exist_ok=True)
+    return os.path.join(staging_dir, f"{campaign_id}.{action}-{os.getpid()}")
+
+
+def sweep_staging(base_dir: Optional[str] = None) -> int:
+    """
+    Remove directories left in the staging directory by a process that died
+    while archiving or restoring. Each is removed under its campaign's lock,
+    so a restore under way elsewhere finishes first. Returns the number removed.
+    """
+    base_dir = base_dir or transcript_logger.LOG_BASE_DIR
+    staging_dir = os.path.join(base_dir, STAGING_DIR_NAME)
+    try:
+        names = os.listdir(staging_dir)
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for name in names:
+        campaign_id, _, _ = name.rpartition(".")
+        if not campaign_id:
+            continue
+        with campaign_lock(campaign_id, base_dir):
+            path = os.path.join(staging_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+    return removed
+
+
+def archive_path(campaign_id: str, base_dir: Optional[str] = None) -> str:
+    return os.path.join(archive_dir(base_dir), campaign_id + ARCHIVE_SUFFIX)
+
+
+def is_archived(campaign_id: str, base_dir: Optional[str] = None) -> bool:
+    return os.path.exists(archive_path(campaign_id, base_dir))
+
+
+class _ThrottledReader:
+    """File wrapper whose reads are paced by `throttle(nbytes)`."""
+
+    def __init__(self, f, throttle: Callable[[int], None]):
+        self._f = f
+        self._throttle = throttle
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self._throttle(len(data))
+        return data
+
+
+def _fingerprint(directory: str) -> Dict[str, Tuple[int, int]]:
+    """Relative path -> (size, mtime_ns) of every file under a directory."""
+    result = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            result[os.path.relpath(path, directory)] = (stat.st_size, stat.st_mtime_ns)
+    return result
+
+
+def archive_campaign(
+    campaign_id: str,
+    base_dir: Optional[str] = None,
+    throttle: Optional[Callable[[int], None]] = None,
+) -> Optional[int]:
+    """
+    Pack a campaign directory into its archive and remove the directory.
+    File reads go through `throttle` (called with the bytes read) so the
+    caller can rate-limit I/O. Returns the archive size, or None if the
+    campaign changed while being packed (it is then left untouched).
+    """
+    base_dir = base_dir or transcript_logger.LOG_BASE_DIR
+    source = os.path.join(base_dir, campaign_id)
+    target = archive_path(campaign_id, base_dir)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Unique per packer: another worker packing the same campaign must not
+    # truncate this file mid-write
+    fd, tmp_target = tempfile.mkstemp(
+        prefix=f".{campaign_id}{ARCHIVE_SUFFIX}.", suffix=".tmp", dir=os.path.dirname(target)
+    )
+    os.close(fd)
+
+    try:
+        before = _fingerprint(source)
+        with tarfile.open(tmp_target, "w:gz") as tar:
+            for relative in sorted(before):
+                path = os.path.join(source, relative)
+                info = tar.gettarinfo(path, arcname=relative)
+                with open(path, "rb") as f:
+                    tar.addfile(info, _ThrottledReader(f, throttle) if throttle else f)
+    except BaseException:
+        os.remove(tmp_target)
+        raise
+
+    with campaign_lock(campaign_id, base_dir):
+        # Also catches a campaign archived by another packer meanwhile: its
+        # directory is gone
+        if not os.path.isdir(source) or _fingerprint(source) != before:
+            os.remove(tmp_target)
+            return None
+        os.replace(tmp_target, target)
+        # Move the directory out of the way first so a concurrent reader
+        # sees either the live directory or the archive, never a partial one
+        doomed = _staging_path(campaign_id, base_dir, "archiving")
+        os.rename(source, doomed)
+        get_campaign_paths().forget(campaign_id, base_dir)
+    shutil.rmtree(doomed, ignore_errors=True)
+    return os.path.getsize(target)
+
+
+def restore_if_archived(campaign_id: str, base_dir: Optional[str] = None) -> bool:
+    """Unpack a campaign's archive back into place. Returns True if it was archived."""
+    base_dir = base_dir or transcript_logger.LOG_BASE_DIR
+    source = archive_path(campaign_id, base_dir)
+    if not os.path.exists(source):
+        return False
+    with campaign_lock(campaign_id, base_dir):
+        if not os.path.exists(source):
+            return False  # Restored by another caller meanwhile
+        destination = os.path.join(base_dir, campaign_id)
+        staging = _staging_path(campaign_id, base_dir, "restoring")
+        shutil.rmtree(staging, ignore_errors=True)
+        with tarfile.open(source, "r:gz") as tar:
+            tar.extractall(staging, filter="data")
+        if os.path.isdir(destination):
+            # Files written since archival by a caller that did not restore
+            # first: the live copy wins, except the append-only transcript,
+            # whose new entries go after the archived ones
+            for root, _, files in os.walk(destination):
+                for name in files:
+                    path = os.path.join(root, name)
+                    restored = os.path.join(staging, os.path.relpath(path, destination))
+                    os.makedirs(os.path.dirname(restored), exist_ok=True)
+                    mode = "ab" if name == transcript_logger.TRANSCRIPT_FILE_NAME else "wb"
+                    with open(path, "rb") as newer, open(restored, mode) as merged:
+                        shutil.copyfileobj(newer, merged)
+            shutil.rmtree(destination)
+        os.rename(staging, destination)
+        # Stamp the restore as activity so the campaign is not re-archived at once
+        now = time.time()
+        os.utime(destination, (now, now))
+        os.remove(source)
+    return True
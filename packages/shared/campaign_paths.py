@@ -0,0 +1,167 @@
+"""
+Campaign ID validation and campaign directory resolution.
+
+A campaign ID names a directory under the saves directory, so it is checked
+before it reaches the filesystem. The rules (one precompiled regex):
+1 to 100 characters, each a letter, digit or underscore (any script), a
+space, a dash or a dot; not only spaces; not "." or STAGING_DIR_NAME
+(".staging", where the archiver moves campaign directories in and out);
+and no ".." anywhere. That rules out path separators (including the Unicode
+look-alikes), NUL and control characters.
+
+`CampaignId` is a `str` that has passed validation, so code that received
+one can skip the check. `CampaignPathResolver` caches validated IDs and,
+per (base directory, campaign), the joined paths of its files and which of
+its directories are known to exist, in maps bounded to
+CAMPAIGN_PATH_CACHE_SIZE (default 4096) campaigns, least recently used
+first out. A write to a campaign seen before then needs no validation,
+path joining, stat or mkdir.
+
+The "exists" state is only a hint. Whoever removes a campaign directory
+(archiving, deleting a store's files) calls `forget`. Writers that find the
+directory gone anyway, e.g. because another process archived it, also call
+`forget` and retry.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from packages.shared.error_handler import ValidationError
+
+MAX_CAMPAIGN_ID_LENGTH = 100
+DEFAULT_CACHE_SIZE = 4096
+STAGING_DIR_NAME = ".staging"  # Reserved under the saves directory
+
+_CAMPAIGN_ID_RE = re.compile(
+    r"(?! *\Z)(?!\.\Z)(?!%s\Z)(?!.*\.\.)[ \w.\-]{1,%d}"
+    % (re.escape(STAGING_DIR_NAME), MAX_CAMPAIGN_ID_LENGTH)
+)
+
+
+def is_valid_campaign_id(campaign_id) -> bool:
+    if type(campaign_id) is CampaignId:
+        return True
+    return isinstance(campaign_id, str) and _CAMPAIGN_ID_RE.fullmatch(campaign_id) is not None
+
+
+class CampaignId(str):
+    """A campaign ID that has been validated. Raises ValidationError otherwise."""
+
+    __slots__ = ()
+
+    def __new__(cls, value: str) -> "CampaignId":
+        if type(value) is cls:
+            return value
+        if not is_valid_campaign_id(value):
+            raise ValidationError(f"Invalid campaign_id: {value!r}")
+        return super().__new__(cls, value)
+
+
+class _CampaignDir:
+    __slots__ = ("path", "existing", "files")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.existing: Set[Tuple[str, ...]] = set()  # Subdirectories known to exist
+        self.files: Dict[Tuple[str, ...], str] = {}  # Joined paths
+
+
+class CampaignPathResolver:
+    """Validates campaign IDs once and caches their directories (see module docstring)."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(
+            os.getenv("CAMPAIGN_PATH_CACHE_SIZE", DEFAULT_CACHE_SIZE)
+        )
+        self._ids: "OrderedDict[str, CampaignId]" = OrderedDict()
+        self._dirs: "OrderedDict[Tuple[str, str], _CampaignDir]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, campaign_id: str) -> CampaignId:
+        """The CampaignId for `campaign_id`, or ValidationError if it is invalid."""
+        if type(campaign_id) is CampaignId:
+            return campaign_id
+        with self._lock:
+            parsed = self._ids.get(campaign_id)
+            if parsed is not None:
+                self._ids.move_to_end(campaign_id)
+                return parsed
+        # Invalid IDs raise here and are never cached, so junk input cannot
+        # push real campaigns out
+        parsed = CampaignId(campaign_id)
+        with self._lock:
+            self._ids[campaign_id] = parsed
+            if len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+        return parsed
+
+    def is_valid(self, campaign_id) -> bool:
+        if type(campaign_id) is CampaignId or campaign_id in self._ids:
+            return True
+        return is_valid_campaign_id(campaign_id)
+
+    def _entry(self, campaign_id: str, base_dir: str) -> _CampaignDir:
+        key = (base_dir, campaign_id)
+        with self._lock:
+            entry = self._dirs.get(key)
+            if entry is not None:
+                self._dirs.move_to_end(key)
+                return entry
+        entry = _CampaignDir(os.path.join(base_dir, self.parse(campaign_id)))
+        with self._lock:
+            entry = self._dirs.setdefault(key, entry)
+            if len(self._dirs) > self.max_entries:
+                self._dirs.popitem(last=False)
+        return entry
+
+    def campaign_dir(self, campaign_id: str, base_dir: str) -> str:
+        """<base_dir>/<campaign_id>. Raises ValidationError for an invalid ID."""
+        return self._entry(campaign_id, base_dir).path
+
+    def path(self, campaign_id: str, base_dir: str, *parts: str) -> str:
+        """<base_dir>/<campaign_id>/<parts...>, joined once per campaign."""
+        entry = self._entry(campaign_id, base_dir)
+        path = entry.files.get(parts)
+        if path is None:
+            path = entry.files[parts] = os.path.join(entry.path, *parts)
+        return path
+
+    def ensure_dir(
+        self,
+        campaign_id: str,
+        base_dir: str,
+        *parts: str,
+        on_missing: Optional[Callable[[str, str], object]] = None,
+    ) -> str:
+        """
+        Create <base_dir>/<campaign_id>/<parts...> unless it is known to
+        exist, and return it. `on_missing(campaign_id, base_dir)` runs first
+        when it is not known to exist (e.g. to restore an archived campaign).
+        """
+        entry = self._entry(campaign_id, base_dir)
+        path = self.path(campaign_id, base_dir, *parts) if parts else entry.path
+        if parts not in entry.existing:
+            if on_missing is not None:
+                on_missing(campaign_id, base_dir)
+            os.makedirs(path, exist_ok=True)
+            entry.existing.add(parts)
+        return path
+
+    def forget(self, campaign_id: str, base_dir: str) -> None:
+        """Drop what is cached about a campaign's directory (it was removed or moved)."""
+        with self._lock:
+            self._dirs.pop((base_dir, campaign_id), None)
+
+
+_campaign_paths: Optional[CampaignPathResolver] = None
+
+
+def get_campaign_paths() -> CampaignPathResolver:
+    """Process-wide resolver configured from the environment on first use."""
+    global _campaign_paths
+    if _campaign_paths is None:
+        _campaign_paths = CampaignPathResolver()
+    return _campaign_paths
@@ -0,0 +1,101 @@
+"""
+Consistent-hash routing of campaigns to backend workers.
+
+Each worker is placed on a hash ring at VNODES points; a campaign belongs to
+the first worker point clockwise from the campaign's hash. When a worker
+joins or leaves, only the campaigns on the affected arcs change owner
+(roughly 1/N of them), and `add_node`/`remove_node` report exactly which
+ones so the old owner can release their live state before the new owner
+picks it up.
+"""
+
+import bisect
+import hashlib
+import os
+from typing import Iterable, List, NamedTuple, Optional
+
+DEFAULT_VNODES = 128  # Ring points per worker; more points, more even spread
+
+
+class Handoff(NamedTuple):
+    """A campaign whose owner changed after a membership change."""
+
+    campaign_id: str
+    source: Optional[str]
+    target: Optional[str]
+
+
+def _hash(value: str) -> int:
+    # Stable across processes, unlike hash() with PYTHONHASHSEED randomization
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class CampaignRouter:
+    """Maps campaign IDs to workers (e.g. backend base URLs) on a hash ring."""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = DEFAULT_VNODES):
+        if vnodes < 1:
+            raise ValueError("vnodes must be at least 1")
+        self.vnodes = vnodes
+        self._nodes: List[str] = []
+        self._hashes: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self._place(node)
+
+    @classmethod
+    def from_env(cls, name: str = "FAST_API", default: str = "http://localhost:8000"):
+        """Build a router from a comma-separated list of worker URLs."""
+        urls = [url.strip().rstrip("/") for url in (os.getenv(name) or default).split(",")]
+        return cls([url for url in urls if url])
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def owner(self, campaign_id: str) -> str:
+        """The worker that owns a campaign."""
+        if not self._hashes:
+            raise LookupError("No workers registered")
+        index = bisect.bisect(self._hashes, _hash(campaign_id)) % len(self._hashes)
+        return self._owners[index]
+
+    def add_node(self, node: str, campaign_ids: Iterable[str] = ()) -> List[Handoff]:
+        """Add a worker. Returns the handoffs needed for the given campaigns."""
+        if node in self._nodes:
+            return []
+        return self._rebalance(campaign_ids, lambda: self._place(node))
+
+    def remove_node(self, node: str, campaign_ids: Iterable[str] = ()) -> List[Handoff]:
+        """Remove a worker. Returns the handoffs needed for the given campaigns."""
+        if node not in self._nodes:
+            return []
+        return self._rebalance(campaign_ids, lambda: self._unplace(node))
+
+    def _rebalance(self, campaign_ids, change) -> List[Handoff]:
+        campaign_ids = list(campaign_ids)
+        before = {cid: self._owner_or_none(cid) for cid in campaign_ids}
+        change()
+        handoffs = []
+        for cid in campaign_ids:
+            after = self._owner_or_none(cid)
+            if after != before[cid]:
+                handoffs.append(Handoff(cid, before[cid], after))
+        return handoffs
+
+    def _owner_or_none(self, campaign_id: str) -> Optional[str]:
+        return self.owner(campaign_id) if self._hashes else None
+
+    def _place(self, node: str) -> None:
+        self._nodes.append(node)
+        for replica in range(self.vnodes):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._hashes, point)
+            self._hashes.insert(index, point)
+            self._owners.insert(index, node)
+
+    def _unplace(self, node: str) -> None:
+        self._nodes.remove(node)
+        kept = [(h, o) for h, o in zip(self._hashes, self._owners) if o != node]
+        self._hashes = [h for h, _ in kept]
+        self._owners = [o for _, o in kept]
@@ -1,11 +1,10 @@
 import logging
-from fastapi import HTTPException
+import math
 
+from packages.shared.shutdown import get_shutdown_coordinator
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Output is configured once per process by packages.shared.logging_config
+logger = logging.getLogger(__name__)
 
 
 class CustomException(Exception):
@@ -26,16 +25,47 @@ class ValidationError(CustomException):
     pass
 
 
+class RateLimitedError(CustomException):
+    """Exception raised when an action is refused by a rate limit."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited; retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class OverloadError(CustomException):
+    """Exception raised when the backend sheds a request because it is overloaded."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Server overloaded; retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(retry_after: float) -> int:
+    """Whole seconds for a Retry-After header or message (at least 1)."""
+    return max(1, math.ceil(retry_after))
+
+
 def handle_error(error, context="fastapi"):
     """Centralized error handling function.
     context: "fastapi" (default) or "discord"
     """
-    logging.error(f"An error occurred: {error}")
+    logger.error(f"An error occurred: {error}")
     if context == "fastapi":
+        # Imported here so the bot, which only uses the discord context,
+        # does not pay for importing FastAPI
+        from fastapi import HTTPException
+
         if isinstance(error, ValidationError):
             raise HTTPException(status_code=400, detail=str(error))
         if isinstance(error, NotFoundError):
             raise HTTPException(status_code=404, detail=str(error))
+        if isinstance(error, OverloadError):
+            raise HTTPException(
+                status_code=429,
+                detail=str(error),
+                headers={"Retry-After": str(retry_after_seconds(error.retry_after))},
+            )
         # For all other errors, return 500
         raise HTTPException(status_code=500, detail=str(error))
     # For discord context, just log and do not raise
@@ -48,16 +78,30 @@ Usage:
 - In FastAPI endpoints, call handle_error(error, context="fastapi") in except blocks.
   - ValidationError -> HTTP 400
   - NotFoundError   -> HTTP 404
+  - OverloadError   -> HTTP 429 with a Retry-After header
   - Other Exception -> HTTP 500
 - In Discord command handlers, call handle_error(error, context="discord").
   - Only logs the error; does not raise.
   - Always send a user-facing message after calling handle_error.
+- discord_error_handler answers RateLimitedError (see packages/bot/rate_limiter.py)
+  with an ephemeral "slow down" message; refusals are expected under load and
+  are logged at INFO rather than through handle_error.
+- It answers OverloadError (raised by the bot when the backend replies 429, see
+  packages/backend/middleware/admission.py) with an ephemeral "busy" message,
+  also logged at INFO.
+- Once the bot is shutting down (see packages/shared/shutdown.py) it answers new
+  commands with an ephemeral "restarting" message; commands already running are
+  tracked so shutdown waits for them.
 
 Do NOT use handle_error in low-level service or database code; propagate exceptions up to the API or command handler layer.
 """
 
 import functools
 
+RATE_LIMITED_MESSAGE = "Slow down! You can try again in {seconds}s."
+OVERLOADED_MESSAGE = "The server is busy right now. Please try again in {seconds}s."
+RESTARTING_MESSAGE = "The bot is restarting. Please try again in a minute."
+
 
 def discord_error_handler(
     fallback_message="An unexpected error occurred. Please contact an administrator.",
@@ -73,8 +117,28 @@ def discord_error_handler(
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(self, interaction, *args, **kwargs):
+            coordinator = get_shutdown_coordinator()
+            if not coordinator.accepting:
+                logger.info("Refused %s: shutting down", func.__name__)
+                await _safe_send_message(interaction, RESTARTING_MESSAGE, ephemeral=True)
+                return
             try:
-                await func(self, interaction, *args, **kwargs)
+                async with coordinator.work():
+                    await func(self, interaction, *args, **kwargs)
+            except RateLimitedError as rle:
+                logger.info("Rate limited %s: %s", func.__name__, rle)
+                await _safe_send_message(
+                    interaction,
+                    RATE_LIMITED_MESSAGE.format(seconds=retry_after_seconds(rle.retry_after)),
+                    ephemeral=True,
+                )
+            except OverloadError as oe:
+                logger.info("Backend overloaded during %s: %s", func.__name__, oe)
+                await _safe_send_message(
+                    interaction,
+                    OVERLOADED_MESSAGE.format(seconds=retry_after_seconds(oe.retry_after)),
+                    ephemeral=True,
+                )
             except ValidationError as ve:
                 try:
                     handle_error(ve, context="discord")
@@ -135,7 +199,7 @@ def fastapi_error_handler(func):
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except (ValidationError, NotFoundError) as e:
+        except (ValidationError, NotFoundError, OverloadError) as e:
             handle_error(e, context="fastapi")
         except Exception as e:
             handle_error(e, context="fastapi")
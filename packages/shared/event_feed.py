@@ -0,0 +1,183 @@
+"""
+In-process pub/sub for live campaign events.
+
+Publishers (TranscriptLogger, via MessageProcessor) call `EventHub.publish`
+for every transcript entry. Each campaign channel numbers its events with an
+increasing sequence number and keeps the last EVENT_FEED_HISTORY events, so a
+subscriber that reconnects can resume from the last sequence number it saw.
+
+Every subscriber has its own bounded queue. Publishing never waits: a
+subscriber whose queue is full is dropped (its iteration ends with
+`dropped` set) and is expected to reconnect with `since`.
+
+The hub is not thread-safe; publish and subscribe from the event loop.
+"""
+
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+DEFAULT_QUEUE_SIZE = 256  # Undelivered events per subscriber before it is dropped
+DEFAULT_HISTORY_SIZE = 1024  # Events kept per campaign for resuming
+DEFAULT_MAX_CAMPAIGNS = 1024  # Campaign channels kept (LRU)
+
+_CLOSED = object()
+
+
+class Subscription:
+    """An async iterator of one campaign's events, in sequence order."""
+
+    def __init__(self, hub: "EventHub", campaign_id: str, backlog: List[Dict], queue_size: int):
+        self.campaign_id = campaign_id
+        self.dropped = False
+        # True when events after `since` are no longer retained (or the
+        # sequence restarted), so the follower may have a gap
+        self.missed_events = False
+        self._hub = hub
+        self._backlog = deque(backlog)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        if self._backlog:
+            return self._backlog.popleft()
+        if self._closed and self._queue.empty():
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if event is _CLOSED:
+            raise StopAsyncIteration
+        return event
+
+    def close(self) -> None:
+        """Unsubscribe. Pending iteration ends after the queued events."""
+        if self._closed:
+            return
+        self._closed = True
+        self._hub._unsubscribe(self)
+        self._wake()
+
+    def _offer(self, event: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._drop()
+
+    def _drop(self) -> None:
+        # Discard what is queued so the consumer finds out right away
+        self.dropped = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self.close()
+
+    def _wake(self) -> None:
+        try:
+            self._queue.put_nowait(_CLOSED)
+        except asyncio.QueueFull:
+            pass  # The consumer will see _closed once it drains the queue
+
+
+class _Channel:
+    __slots__ = ("seq", "history", "subscribers")
+
+    def __init__(self, history_size: int):
+        self.seq = 0
+        self.history: deque = deque(maxlen=history_size)
+        self.subscribers: set = set()
+
+
+class EventHub:
+    """Fans campaign events out to subscribers with bounded per-subscriber queues."""
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        history_size: Optional[int] = None,
+        max_campaigns: Optional[int] = None,
+    ):
+        self.queue_size = queue_size or int(
+            os.getenv("EVENT_FEED_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+        )
+        self.history_size = history_size or int(
+            os.getenv("EVENT_FEED_HISTORY", DEFAULT_HISTORY_SIZE)
+        )
+        self.max_campaigns = max_campaigns or DEFAULT_MAX_CAMPAIGNS
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self.dropped_subscribers = 0
+
+    def _channel(self, campaign_id: str) -> _Channel:
+        channel = self._channels.get(campaign_id)
+        if channel is None:
+            channel = self._channels[campaign_id] = _Channel(self.history_size)
+            self._evict_idle_channels()
+        else:
+            self._channels.move_to_end(campaign_id)
+        return channel
+
+    def _evict_idle_channels(self) -> None:
+        # Channels with live subscribers are never evicted
+        excess = len(self._channels) - self.max_campaigns
+        for campaign_id in list(self._channels):
+            if excess <= 0:
+                break
+            if not self._channels[campaign_id].subscribers:
+                del self._channels[campaign_id]
+                excess -= 1
+
+    def publish(self, campaign_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Number an event, record it and offer it to every subscriber."""
+        channel = self._channel(campaign_id)
+        channel.seq += 1
+        event = {"seq": channel.seq, "campaign_id": campaign_id, **event}
+        channel.history.append(event)
+        for subscription in list(channel.subscribers):
+            subscription._offer(event)
+            if subscription.dropped:
+                self.dropped_subscribers += 1
+        return event
+
+    def subscribe(self, campaign_id: str, since: Optional[int] = None) -> Subscription:
+        """
+        Follow a campaign's new events. With `since`, retained events with a
+        greater sequence number are delivered first.
+        """
+        channel = self._channel(campaign_id)
+        backlog: List[Dict] = []
+        missed = False
+        if since is not None:
+            backlog = [event for event in channel.history if event["seq"] > since]
+            oldest = backlog[0]["seq"] if backlog else channel.seq + 1
+            # A `since` ahead of the channel means the sequence restarted
+            # (e.g. a backend restart), so the follower may have missed events
+            missed = since > channel.seq or oldest > since + 1
+        subscription = Subscription(self, campaign_id, backlog, self.queue_size)
+        subscription.missed_events = missed
+        channel.subscribers.add(subscription)
+        return subscription
+
+    def last_seq(self, campaign_id: str) -> int:
+        channel = self._channels.get(campaign_id)
+        return channel.seq if channel else 0
+
+    def subscriber_count(self, campaign_id: str) -> int:
+        channel = self._channels.get(campaign_id)
+        return len(channel.subscribers) if channel else 0
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        channel = self._channels.get(subscription.campaign_id)
+        if channel is not None:
+            channel.subscribers.discard(subscription)
+
+
+_event_hub: Optional[EventHub] = None
+
+
+def get_event_hub() -> EventHub:
+    """Process-wide hub configured from the environment on first use."""
+    global _event_hub
+    if _event_hub is None:
+        _event_hub = EventHub()
+    return _event_hub
@@ -0,0 +1,143 @@
+"""
+Shared logging setup for the bot and backend processes.
+
+`setup_logging()` installs a QueueHandler on the root logger and starts a
+QueueListener thread that formats records (JSON by default) and writes them
+to stdout. Callers on the event loop only pay for an enqueue; formatting and
+I/O happen on the listener thread.
+
+Repeated WARNING+ records with the same logger and message are emitted once
+per LOG_DEDUPE_WINDOW_SECONDS; the next emitted copy carries a
+`suppressed_repeats` count.
+
+Environment:
+    LOG_LEVEL                  Root level (default INFO)
+    LOG_FORMAT                 "json" (default) or "text"
+    LOG_DEDUPE_WINDOW_SECONDS  Deduplication window (default 60, 0 disables)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+DEDUPE_MAX_KEYS = 1024  # Distinct messages tracked by the dedupe filter
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_STANDARD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DuplicateFilter(logging.Filter):
+    """Rate-limits identical WARNING+ records to one per window."""
+
+    def __init__(self, window_seconds: float, min_level: int = logging.WARNING):
+        super().__init__()
+        self.window_seconds = window_seconds
+        self.min_level = min_level
+        self._seen: "OrderedDict[tuple, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or self.window_seconds <= 0:
+            return True
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            state = self._seen.get(key)
+            if state is not None and now - state[0] < self.window_seconds:
+                state[1] += 1
+                return False
+            if state is not None and state[1]:
+                record.suppressed_repeats = state[1]
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            while len(self._seen) > DEDUPE_MAX_KEYS:
+                self._seen.popitem(last=False)
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues the record untouched. The stdlib version
+    formats the message (and traceback) in the calling thread; here that is
+    left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: Optional[str] = None) -> None:
+    """Install the queue-based handler on the root logger. Safe to call repeatedly."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        root = logging.getLogger()
+        root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+        if _queue_handler is not None:
+            return
+
+        output = logging.StreamHandler(sys.stdout)
+        if os.getenv("LOG_FORMAT", "json").lower() == "text":
+            output.setFormatter(
+                logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+            )
+        else:
+            output.setFormatter(JsonFormatter())
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = _DeferredQueueHandler(log_queue)
+        _queue_handler.addFilter(
+            DuplicateFilter(float(os.getenv("LOG_DEDUPE_WINDOW_SECONDS", "60")))
+        )
+        _listener = logging.handlers.QueueListener(
+            log_queue, output, respect_handler_level=True
+        )
+        _listener.start()
+        root.addHandler(_queue_handler)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _queue_handler = None
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
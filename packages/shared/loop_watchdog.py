@@ -0,0 +1,321 @@
+"""
+Event-loop lag watchdog for the bot and backend.
+
+Both processes run everything on one asyncio loop, so a blocking call in any
+callback stalls every guild at once. `LoopWatchdog` keeps two pieces running
+while the loop does:
+
+- a heartbeat task that sleeps LOOP_WATCHDOG_SAMPLE_MS (default 50) and
+  records how late it wakes up; the last LOOP_WATCHDOG_SAMPLES (default
+  1024) lags are reported as percentiles by `metrics()` and logged every
+  LOOP_WATCHDOG_REPORT_SECONDS (default 60, 0 disables). `current_lag()`
+  is the worst of the last RECENT_SAMPLES lags, for admission control;
+- a watchdog thread that notices when the heartbeat is overdue by more than
+  LOOP_WATCHDOG_THRESHOLD_MS (default 200, 0 disables the watchdog) and
+  logs the loop thread's stack at that moment, i.e. the callback that is
+  blocking it. Each stall is logged once.
+
+Debug mode: `forbid_blocking_io()` (or LOOP_WATCHDOG_STRICT=1 / the
+`no_blocking_io` marker in the test suite) uses audit hooks to catch
+blocking calls made from application code while it runs on an event loop:
+file opens, time.sleep, SQLite connects, socket connects and DNS lookups,
+and subprocesses. Queries on an open SQLite connection raise no audit
+event and are only caught by the watchdog when they are slow.
+"""
+
+import asyncio
+import importlib.machinery
+import inspect
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD_MS = 200
+DEFAULT_SAMPLE_MS = 50
+DEFAULT_REPORT_SECONDS = 60
+LAG_SAMPLES = 1024
+RECENT_SAMPLES = 10  # current_lag() window: half a second at the default sample rate
+STACK_LIMIT = 20  # Innermost frames kept in stall and violation reports
+
+# Audit events raised by calls that block the calling thread
+BLOCKING_AUDIT_EVENTS = frozenset(
+    {
+        "open",
+        "time.sleep",
+        "sqlite3.connect",
+        "socket.connect",
+        "socket.getaddrinfo",
+        "subprocess.Popen",
+        "os.system",
+    }
+)
+
+_PACKAGES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+# Test suites and the load generator are harnesses: their own blocking setup
+# does not count against the application
+_HARNESS_DIR_PARTS = (os.sep + "tests" + os.sep, os.sep + "loadgen" + os.sep)
+# Module loading opens source files outside of importlib frames too
+# (linecache, pkgutil); that is import cost, not blocking I/O
+_IMPORT_SUFFIXES = tuple(importlib.machinery.all_suffixes()) + (".pyc",)
+_ASYNC_FLAGS = inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes", "on")
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(q * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class LoopWatchdog:
+    """Measures a loop's lag and logs the stack of callbacks that block it."""
+
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        sample_ms: Optional[float] = None,
+        report_seconds: Optional[float] = None,
+        samples: int = LAG_SAMPLES,
+    ):
+        threshold_ms = (
+            threshold_ms
+            if threshold_ms is not None
+            else float(os.getenv("LOOP_WATCHDOG_THRESHOLD_MS", DEFAULT_THRESHOLD_MS))
+        )
+        self.threshold = threshold_ms / 1000
+        self.sample_interval = (
+            sample_ms or float(os.getenv("LOOP_WATCHDOG_SAMPLE_MS", DEFAULT_SAMPLE_MS))
+        ) / 1000
+        self.report_seconds = (
+            report_seconds
+            if report_seconds is not None
+            else float(os.getenv("LOOP_WATCHDOG_REPORT_SECONDS", DEFAULT_REPORT_SECONDS))
+        )
+        self.stalls = 0
+        self._lags: deque = deque(maxlen=int(os.getenv("LOOP_WATCHDOG_SAMPLES", samples)))
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def start(self) -> None:
+        """Watch the running loop. Call from a coroutine; a no-op when already watching it."""
+        loop = asyncio.get_running_loop()
+        if not self.enabled or (self._loop is loop and self._heartbeat is not None):
+            return
+        self.stop()
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat = loop.create_task(self._beat())
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self._loop = None
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            lags = sorted(self._lags)
+        return {
+            "samples": len(lags),
+            "lag_p50_ms": _percentile(lags, 0.50) * 1000,
+            "lag_p90_ms": _percentile(lags, 0.90) * 1000,
+            "lag_p99_ms": _percentile(lags, 0.99) * 1000,
+            "lag_max_ms": (lags[-1] if lags else 0.0) * 1000,
+            "stalls": self.stalls,
+        }
+
+    def current_lag(self) -> float:
+        """
+        The loop's lag right now, in seconds: the worst of the last
+        RECENT_SAMPLES heartbeats, or how overdue the next one is if that is
+        longer. A stall is remembered for the window so the backlog it left
+        behind can drain. 0 while the watchdog is not running.
+        """
+        if self._heartbeat is None:
+            return 0.0
+        with self._lock:
+            recent = max(itertools.islice(reversed(self._lags), RECENT_SAMPLES), default=0.0)
+            overdue = time.monotonic() - self._last_beat - self.sample_interval
+        return max(recent, overdue, 0.0)
+
+    async def _beat(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.sample_interval
+        next_report = loop.time() + self.report_seconds
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            now = loop.time()
+            with self._lock:
+                self._lags.append(max(0.0, now - started - interval))
+                self._last_beat = time.monotonic()
+            if self.report_seconds and now >= next_report:
+                next_report = now + self.report_seconds
+                logger.info("Event loop lag", extra=self.metrics())
+
+    def _watch(self) -> None:
+        # The heartbeat is overdue once it is a full sample plus the threshold late
+        overdue = self.sample_interval + self.threshold
+        reported_beat = None
+        while not self._stop_event.wait(self.threshold / 4):
+            with self._lock:
+                last_beat = self._last_beat
+            blocked = time.monotonic() - last_beat
+            if blocked <= overdue or last_beat == reported_beat:
+                continue
+            reported_beat = last_beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame else ""
+            # The stack is part of the message so repeats of the same stall
+            # are deduplicated by the logging filter, but new sites are not
+            logger.warning(
+                "Event loop blocked for over %dms in:\n%s",
+                round(self.threshold * 1000),
+                stack,
+                extra={"blocked_ms": round(blocked * 1000)},
+            )
+
+
+_loop_watchdog: Optional[LoopWatchdog] = None
+
+
+def get_loop_watchdog() -> LoopWatchdog:
+    """Process-wide watchdog configured from the environment on first use."""
+    global _loop_watchdog
+    if _loop_watchdog is None:
+        _loop_watchdog = LoopWatchdog()
+    return _loop_watchdog
+
+
+class BlockingIOOnLoopError(AssertionError):
+    """Raised by forbid_blocking_io() when blocking calls ran on an event loop."""
+
+    def __init__(self, violations: List[str]):
+        super().__init__(
+            f"{len(violations)} blocking call(s) on the event loop:\n\n" + "\n\n".join(violations)
+        )
+        self.violations = violations
+
+
+_detectors: List[List[str]] = []
+_audit_hook_installed = False
+_in_hook = threading.local()  # Formatting a report must not report itself
+_allowed = threading.local()
+
+
+def _blocked_by_application(frame) -> bool:
+    """
+    True if a blocking call was made on behalf of application code: some
+    async function of this repository (outside the tests) is on the stack,
+    or the loop ran a plain application callback. Sync application calls
+    made directly by a test body, and the tests' own fixture I/O, are the
+    test's business.
+    """
+    application_seen = False
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.startswith("<frozen importlib"):
+            return False  # Import-time work, paid once per process
+        if code.co_filename.startswith(_PACKAGES_DIR):
+            if any(part in code.co_filename for part in _HARNESS_DIR_PARTS):
+                return False
+            if code.co_flags & _ASYNC_FLAGS:
+                return True
+            application_seen = True
+        frame = frame.f_back
+    return application_seen
+
+
+def _audit_hook(event: str, args: tuple) -> None:
+    if not _detectors or event not in BLOCKING_AUDIT_EVENTS:
+        return
+    if event == "open" and (not isinstance(args[0], str) or args[0].endswith(_IMPORT_SUFFIXES)):
+        return
+    if event == "time.sleep" and not args[0]:
+        return
+    if getattr(_in_hook, "active", False) or getattr(_allowed, "depth", 0):
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Not on an event loop thread
+    frame = sys._getframe(1)
+    if not _blocked_by_application(frame):
+        return
+    _in_hook.active = True
+    try:
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+    finally:
+        _in_hook.active = False
+    # The innermost block owns the violation, so a test can assert on one
+    # of its own inside a strict-mode run
+    _detectors[-1].append(f"{event}{args!r:.200}\n{stack}")
+
+
+@contextmanager
+def forbid_blocking_io():
+    """
+    Record blocking calls application code makes on a running event loop
+    while the block runs, and raise BlockingIOOnLoopError at the end if there
+    were any. Meant for tests and debugging: audit hooks cannot be removed,
+    so the first use installs one for the rest of the process (a cheap
+    check while no block is active).
+    """
+    global _audit_hook_installed
+    if not _audit_hook_installed:
+        sys.addaudithook(_audit_hook)
+        _audit_hook_installed = True
+    violations: List[str] = []
+    _detectors.append(violations)
+    try:
+        yield violations
+    finally:
+        _detectors.remove(violations)
+    if violations:
+        raise BlockingIOOnLoopError(violations)
+
+
+@contextmanager
+def allow_blocking_io():
+    """Mark a block whose blocking I/O on the loop is deliberate (e.g. debug-only dumps)."""
+    _allowed.depth = getattr(_allowed, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _allowed.depth -= 1
+
+
+def strict_mode() -> bool:
+    """Whether LOOP_WATCHDOG_STRICT asks for every test to forbid blocking I/O."""
+    return _env_flag("LOOP_WATCHDOG_STRICT")
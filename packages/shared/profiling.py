@@ -0,0 +1,210 @@
+"""
+Opt-in, sampled profiling for backend requests and Discord commands.
+
+Enabled with PROFILING_ENABLED=1. A PROFILING_SAMPLE_RATE fraction of
+requests/commands is profiled and dumped to PROFILING_DIR:
+
+- PROFILING_FORMAT=pstats (default): cProfile output (`.prof`), loadable with
+  `pstats` or snakeviz. cProfile only sees the thread it was started on,
+  which is the event loop thread for async endpoints and commands.
+- PROFILING_FORMAT=collapsed: a background thread samples every thread's
+  stack every PROFILING_INTERVAL_MS and writes collapsed stacks
+  (`.collapsed`), ready for flamegraph.pl or speedscope.
+
+Only one profile runs at a time; requests arriving while one is active are
+not sampled. The oldest dumps beyond PROFILING_MAX_FILES are deleted.
+"""
+
+import cProfile
+import functools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from packages.shared.loop_watchdog import allow_blocking_io
+
+PROFILE_BASE_DIR = os.path.join("data", "profiles")
+PROFILE_FORMATS = {"pstats": ".prof", "collapsed": ".collapsed"}
+
+_LABEL_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+\.(prof|collapsed)$")
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes", "on")
+
+
+class _StackSampler(threading.Thread):
+    """Samples all thread stacks at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, interval_s: float):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.interval_s = interval_s
+        self.counts: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop_event.wait(self.interval_s):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                thread_name = names.get(thread_id) or str(thread_id)
+                self.counts[";".join([thread_name] + stack[::-1])] += 1
+
+    def stop(self) -> str:
+        self._stop_event.set()
+        self.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.items())
+
+
+class Profiler:
+    """Decides which requests to profile and manages the dump directory."""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        sample_rate: Optional[float] = None,
+        output_dir: Optional[str] = None,
+        output_format: Optional[str] = None,
+        interval_ms: Optional[float] = None,
+        max_files: Optional[int] = None,
+    ):
+        self.enabled = _env_flag("PROFILING_ENABLED") if enabled is None else enabled
+        self.sample_rate = (
+            float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+            if sample_rate is None
+            else sample_rate
+        )
+        self.output_dir = output_dir or os.getenv("PROFILING_DIR", PROFILE_BASE_DIR)
+        self.output_format = output_format or os.getenv("PROFILING_FORMAT", "pstats")
+        if self.output_format not in PROFILE_FORMATS:
+            raise ValueError(f"PROFILING_FORMAT must be one of {list(PROFILE_FORMATS)}")
+        self.interval_s = (
+            interval_ms or float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+        ) / 1000
+        self.max_files = max_files or int(os.getenv("PROFILING_MAX_FILES", "100"))
+        self._active = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    @contextmanager
+    def profile(self, label: str, force: bool = False):
+        """
+        Profile the enclosed block if this call is sampled (or `force` is set).
+        Yields the dump path, or None if the block is not being profiled.
+        """
+        if not (force or self.should_sample()) or not self._active.acquire(blocking=False):
+            yield None
+            return
+        try:
+            started = time.perf_counter()
+            if self.output_format == "pstats":
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    yield label
+                finally:
+                    profile.disable()
+                    self._write(label, started, profile=profile)
+            else:
+                sampler = _StackSampler(self.interval_s)
+                sampler.start()
+                try:
+                    yield label
+                finally:
+                    self._write(label, started, collapsed=sampler.stop())
+        finally:
+            self._active.release()
+
+    def _write(self, label: str, started: float, profile=None, collapsed=None) -> None:
+        # Dumps are written inline, on the loop for async callers; that is
+        # accepted for an opt-in, sampled debugging aid
+        with allow_blocking_io():
+            self._dump(label, started, profile, collapsed)
+
+    def _dump(self, label: str, started: float, profile, collapsed) -> None:
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        safe_label = _LABEL_RE.sub("_", label).strip("_")[:60] or "profile"
+        name = f"{stamp}-{safe_label}-{duration_ms}ms{PROFILE_FORMATS[self.output_format]}"
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, name)
+        if profile is not None:
+            profile.dump_stats(path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(collapsed)
+        self._prune()
+
+    def _prune(self) -> None:
+        for stale in self.list_profiles()[self.max_files :]:
+            try:
+                os.remove(os.path.join(self.output_dir, stale["name"]))
+            except FileNotFoundError:
+                pass
+
+    def list_profiles(self) -> List[Dict]:
+        """Dumps in the output directory, newest first."""
+        if not os.path.isdir(self.output_dir):
+            return []
+        profiles = []
+        for name in os.listdir(self.output_dir):
+            if not _NAME_RE.match(name):
+                continue
+            stat = os.stat(os.path.join(self.output_dir, name))
+            profiles.append({"name": name, "size": stat.st_size, "created": stat.st_mtime})
+        return sorted(profiles, key=lambda p: p["name"], reverse=True)
+
+    def profile_path(self, name: str) -> Optional[str]:
+        """Resolve a dump name to its path, or None if it is not a known dump."""
+        if not _NAME_RE.match(name):
+            return None
+        path = os.path.join(self.output_dir, name)
+        return path if os.path.isfile(path) else None
+
+
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Profiler:
+    """Process-wide profiler configured from the environment on first use."""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+def profiled_command():
+    """
+    Decorator for Discord command methods that profiles a sampled fraction of
+    invocations. Place it between the app command decorator and
+    @discord_error_handler() so the error handling is profiled too.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, interaction, *args, **kwargs):
+            profiler = get_profiler()
+            if not profiler.enabled:
+                return await func(self, interaction, *args, **kwargs)
+            with profiler.profile(f"discord-{func.__name__}"):
+                return await func(self, interaction, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
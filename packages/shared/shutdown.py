@@ -0,0 +1,150 @@
+"""
+Coordinated graceful shutdown for the bot and backend.
+
+`ShutdownCoordinator.shutdown()` runs in three phases, all within
+SHUTDOWN_DEADLINE_SECONDS (default 15):
+
+1. Stop accepting: `accepting` turns False. In the bot,
+   discord_error_handler checks it and tells users the bot is restarting.
+   The backend's edge is uvicorn: it stops accepting connections and drains
+   requests (up to --timeout-graceful-shutdown) before the lifespan
+   shutdown runs this.
+2. Drain: wait for work tracked with `async with coordinator.work():`
+   (transcript writes, Discord commands) to finish.
+3. Steps: run the registered cleanup steps in order (closing the Discord
+   connection and HTTP client, committing queued transcript syncs, closing
+   SQLite connections). Each gets what is left of the deadline.
+
+A deadline of 0 skips the drain and runs the steps straight away, each
+to completion.
+
+The returned report says how much tracked work completed during the drain
+and how much was abandoned at the deadline, and how each step went. It is
+also logged, at WARNING if anything was abandoned or failed; the log queue
+itself is flushed at interpreter exit (see logging_config).
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_SECONDS = 15
+
+Step = Callable[[], Union[None, Awaitable[None]]]
+
+
+class ShutdownCoordinator:
+    """Tracks in-flight work and runs shutdown within a deadline."""
+
+    def __init__(
+        self,
+        deadline_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.deadline_seconds = (
+            deadline_seconds
+            if deadline_seconds is not None
+            else float(os.getenv("SHUTDOWN_DEADLINE_SECONDS", DEFAULT_DEADLINE_SECONDS))
+        )
+        self.accepting = True
+        self.in_flight = 0
+        self._clock = clock
+        self._steps: List[Tuple[str, Step]] = []
+        self._drained = 0  # Work that finished after shutdown began
+        self._idle: Optional[asyncio.Event] = None
+        self._report: Optional[Dict] = None
+
+    def add_step(self, name: str, step: Step) -> None:
+        """Register a cleanup step (sync, run in a thread, or async). Steps run in order."""
+        self._steps.append((name, step))
+
+    @asynccontextmanager
+    async def work(self):
+        """Track a unit of work so shutdown waits for it."""
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if not self.accepting:
+                self._drained += 1
+                if self.in_flight == 0 and self._idle is not None:
+                    self._idle.set()
+
+    async def shutdown(self) -> Dict:
+        """Stop accepting, drain and run the steps. Later calls return the first report."""
+        if self._report is not None or not self.accepting:
+            return self._report or {}
+        started = self._clock()
+        deadline = started + self.deadline_seconds
+        self.accepting = False
+        self._idle = asyncio.Event()
+        if self.in_flight and self.deadline_seconds:
+            try:
+                await asyncio.wait_for(self._idle.wait(), max(0.0, deadline - self._clock()))
+            except asyncio.TimeoutError:
+                pass
+        completed, abandoned = self._drained, self.in_flight
+
+        steps: Dict[str, str] = {}
+        for name, step in self._steps:
+            remaining = deadline - self._clock() if self.deadline_seconds else None
+            if remaining is not None and remaining <= 0:
+                steps[name] = "skipped"
+                continue
+            try:
+                if inspect.iscoroutinefunction(step):
+                    await asyncio.wait_for(step(), remaining)
+                else:
+                    # A thread cannot be stopped at the deadline; it is left
+                    # to finish while shutdown moves on
+                    await asyncio.wait_for(asyncio.to_thread(step), remaining)
+                steps[name] = "ok"
+            except asyncio.TimeoutError:
+                steps[name] = "timeout"
+            except Exception as exc:
+                steps[name] = f"error: {exc}"
+
+        self._report = {
+            "completed": completed,
+            "abandoned": abandoned,
+            "steps": steps,
+            "elapsed_s": round(self._clock() - started, 3),
+        }
+        clean = abandoned == 0 and all(status == "ok" for status in steps.values())
+        logger.log(logging.INFO if clean else logging.WARNING, "Shutdown finished", extra=self._report)
+        return self._report
+
+
+_shutdown_coordinator: Optional[ShutdownCoordinator] = None
+
+
+def get_shutdown_coordinator() -> ShutdownCoordinator:
+    """Process-wide coordinator configured from the environment on first use."""
+    global _shutdown_coordinator
+    if _shutdown_coordinator is None:
+        _shutdown_coordinator = ShutdownCoordinator()
+    return _shutdown_coordinator
+
+
+def reset_shutdown_coordinator() -> None:
+    """Forget the process-wide coordinator so the next get starts fresh (after an app restart)."""
+    global _shutdown_coordinator
+    _shutdown_coordinator = None
+
+
+def flush_transcripts() -> None:
+    """Commit queued transcript syncs and close the shared SQLite transcript store."""
+    # Imported here so error_handler, which imports this module, stays free
+    # of storage imports
+    from packages.shared.transcript_durability import close_group_committer
+    from packages.shared.transcript_store import close_shared_store
+
+    close_group_committer()
+    close_shared_store()
@@ -0,0 +1,248 @@
+"""
+Durability of transcript writes, selected with TRANSCRIPT_DURABILITY:
+
+- "none" (default): entries are written to the OS and never fsynced. They
+  survive a crash of the process but not of the machine.
+- "group-commit": an append returns once its entry is fsynced, but fsyncs
+  are shared. One `GroupCommitter` per process collects the files written by
+  every campaign and syncs them together every TRANSCRIPT_GROUP_COMMIT_MS
+  milliseconds (default 10), or as soon as TRANSCRIPT_GROUP_COMMIT_ENTRIES
+  entries (default 256) are waiting, so a busy server pays for one sync per
+  file per cycle instead of one per message.
+- "always": every entry is fsynced before its append returns.
+
+A machine crash can still leave a partial line at the end of a transcript,
+even with fsync. `trim_partial_tail` cuts it off; the JSONL store calls it
+the first time it writes to a transcript in a process, so recovery happens
+on startup rather than as a separate step.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+DURABILITY_MODES = ("none", "group-commit", "always")
+DEFAULT_GROUP_COMMIT_MS = 10
+DEFAULT_GROUP_COMMIT_ENTRIES = 256
+_TAIL_CHUNK_SIZE = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def durability_mode(mode: Optional[str] = None) -> str:
+    mode = (mode or os.getenv("TRANSCRIPT_DURABILITY", "none")).lower()
+    if mode not in DURABILITY_MODES:
+        raise ValueError(
+            f"TRANSCRIPT_DURABILITY must be one of {list(DURABILITY_MODES)}, not {mode!r}"
+        )
+    return mode
+
+
+def fsync_directory(path: str) -> None:
+    """Make a directory's entries (created or renamed files) durable."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_all(fd: int, data: bytes) -> None:
+    """Write all of `data`; on an O_APPEND descriptor this is normally one write()."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def commit_write(fd: int, durability: str, new_in: Optional[str] = None) -> Optional[Future]:
+    """
+    Finish a write to `fd` according to `durability`, taking ownership of
+    the descriptor. With "always" it is synced before returning; with
+    "group-commit" the returned future resolves once the shared committer
+    has synced it. `new_in` is the directory of a file that was just created
+    or renamed, whose entry must be synced too.
+    """
+    if durability == "group-commit":
+        return get_group_committer().add(fd, new_in)
+    try:
+        if durability == "always":
+            os.fsync(fd)
+            if new_in is not None:
+                fsync_directory(new_in)
+    finally:
+        os.close(fd)
+    return None
+
+
+class GroupCommitter:
+    """
+    Shared fsync cycle for writers in any thread.
+
+    A writer hands over an open descriptor of the file it just appended to
+    and waits on the returned future. The committer thread syncs every file
+    in the current batch once (descriptors of the same file are deduplicated
+    by inode, so a rename by log rotation does not matter) and resolves the
+    batch's futures, with the OSError if a sync failed. A batch is committed
+    `interval_ms` after its first entry, or earlier once it holds
+    `max_entries` entries.
+    """
+
+    def __init__(self, interval_ms: Optional[float] = None, max_entries: Optional[int] = None):
+        self.interval = (
+            interval_ms
+            if interval_ms is not None
+            else float(os.getenv("TRANSCRIPT_GROUP_COMMIT_MS", DEFAULT_GROUP_COMMIT_MS))
+        ) / 1000
+        self.max_entries = max_entries or int(
+            os.getenv("TRANSCRIPT_GROUP_COMMIT_ENTRIES", DEFAULT_GROUP_COMMIT_ENTRIES)
+        )
+        self.commits = 0
+        self._cond = threading.Condition()
+        # (st_dev, st_ino) -> (descriptor, futures waiting on it)
+        self._batch: Dict[Tuple[int, int], Tuple[int, List[Future]]] = {}
+        self._entries = 0
+        self._opened_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def add(self, fd: int, directory: Optional[str] = None) -> Future:
+        """
+        Queue an open descriptor for the next commit; the committer takes
+        ownership of it. `directory` is also synced, for a file that was just
+        created or rotated.
+        """
+        future: Future = Future()
+        fds = [fd]
+        if directory is not None:
+            fds.append(os.open(directory, os.O_RDONLY))
+        with self._cond:
+            if self._closed:
+                for extra in fds:
+                    os.close(extra)
+                raise RuntimeError("GroupCommitter is closed")
+            was_empty = not self._batch
+            if was_empty:
+                self._opened_at = time.monotonic()
+            for extra in fds:
+                stat = os.fstat(extra)
+                key = (stat.st_dev, stat.st_ino)
+                if key in self._batch:
+                    os.close(extra)
+                    self._batch[key][1].append(future)
+                else:
+                    self._batch[key] = (extra, [future])
+            self._entries += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="transcript-group-commit", daemon=True
+                )
+                self._thread.start()
+            if was_empty or self._entries >= self.max_entries:
+                self._cond.notify()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._batch and not self._closed:
+                    self._cond.wait()
+                if not self._batch:
+                    return
+                while not self._closed and self._entries < self.max_entries:
+                    remaining = self._opened_at + self.interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._batch, self._entries = self._batch, {}, 0
+            self._commit(batch)
+
+    def _commit(self, batch: Dict[Tuple[int, int], Tuple[int, List[Future]]]) -> None:
+        errors: Dict[Future, OSError] = {}
+        for fd, futures in batch.values():
+            try:
+                os.fsync(fd)
+            except OSError as exc:
+                logger.error("Transcript fsync failed: %s", exc)
+                errors.update(dict.fromkeys(futures, exc))
+            finally:
+                os.close(fd)
+        self.commits += 1
+        for future in {f for _, futures in batch.values() for f in futures}:
+            if future in errors:
+                future.set_exception(errors[future])
+            else:
+                future.set_result(None)
+
+    def close(self) -> None:
+        """Commit what is queued and stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+
+_group_committer: Optional[GroupCommitter] = None
+_group_committer_lock = threading.Lock()
+
+
+def get_group_committer() -> GroupCommitter:
+    """Process-wide committer configured from the environment on first use."""
+    global _group_committer
+    with _group_committer_lock:
+        if _group_committer is None:
+            _group_committer = GroupCommitter()
+        return _group_committer
+
+
+def close_group_committer() -> None:
+    """Commit what the process-wide committer has queued and stop it (at shutdown)."""
+    global _group_committer
+    with _group_committer_lock:
+        committer, _group_committer = _group_committer, None
+    if committer is not None:
+        committer.close()
+
+
+def trim_partial_tail(path: str) -> int:
+    """
+    Truncate a JSONL file after its last complete line. Bytes after the last
+    newline are removed, then any trailing lines of NUL bytes (blocks
+    allocated but never written before a crash) and empty lines. Returns the
+    number of bytes cut.
+    """
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        return 0
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        end = _last_line_end(f, size)
+        while end > 0:
+            start = _last_line_end(f, end - 1)
+            f.seek(start)
+            if f.read(end - 1 - start).strip(b"\0"):
+                break
+            end = start
+        if end < size:
+            f.truncate(end)
+            logger.warning("Trimmed %d bytes of partial transcript entry from %s", size - end, path)
+        return size - end
+
+
+def _last_line_end(f, end: int) -> int:
+    """Offset just after the last newline before `end` (0 if there is none)."""
+    position = end
+    while position > 0:
+        start = max(position - _TAIL_CHUNK_SIZE, 0)
+        f.seek(start)
+        chunk = f.read(position - start)
+        newline = chunk.rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        position = start
+    return 0
@@ -1,92 +1,201 @@
 import asyncio
 import json
+import logging
 import os
 import re
+from concurrent.futures import Future
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from packages.shared import campaign_archive
+from packages.shared.campaign_paths import CampaignPathResolver, get_campaign_paths
+from packages.shared.shutdown import get_shutdown_coordinator
+from packages.shared.transcript_durability import (
+    commit_write,
+    durability_mode,
+    trim_partial_tail,
+    write_all,
+)
+from packages.shared.transcript_store import TranscriptStore
 
 LOG_BASE_DIR = os.path.join("data", "saves")
 MAX_LOG_SIZE_BYTES = 10 * 1024 * 1024  # 10 MB
 MAX_ROTATED_LOGS = 3  # Keep up to 3 rotated logs
+TRANSCRIPT_FILE_NAME = "transcript.log"
+READ_CHUNK_SIZE = 64 * 1024  # Characters decoded at a time by read_entries
+
+_WHITESPACE_RE = re.compile(r"\s*")
+
+# Transcripts already checked for a partial trailing line in this process
+_recovered_paths: Set[str] = set()
+
+logger = logging.getLogger(__name__)
 
 
 class TranscriptLogger:
     """
     Asynchronous, robust logger for campaign transcripts.
-    Writes structured JSONL entries to data/saves/[campaign_id]/transcript.log.
+    Writes structured entries through a TranscriptStore chosen by
+    TRANSCRIPT_STORE; by default JSONL entries in
+    data/saves/[campaign_id]/transcript.log (see JsonlTranscriptStore).
 
     Log rotation: If transcript.log exceeds MAX_LOG_SIZE_BYTES, it is rotated to transcript.log.1,
     and older logs are shifted up to MAX_ROTATED_LOGS. Only the most recent logs are kept.
+
+    If an event hub (packages.shared.event_feed.EventHub) is given, every
+    entry written is also published to the campaign's live event feed.
     """
 
     @staticmethod
     def _is_valid_campaign_id(campaign_id: str) -> bool:
-        # Reject empty/whitespace, reserved names, path separators, control chars, unicode separators, only-dots, and too long
-        if not campaign_id or campaign_id.strip() == "":
-            return False
-        if campaign_id in (".", ".."):
-            return False
-        if len(campaign_id) > 100:
-            return False
-        # Only dots (e.g., "...", "....") are not allowed
-        if re.fullmatch(r"\.+", campaign_id):
-            return False
-        # Control chars (ASCII < 32)
-        if any(ord(c) < 32 for c in campaign_id):
-            return False
-        # Unicode path separators
-        if "\u2215" in campaign_id or "\u29f5" in campaign_id:
-            return False
-        # Path separators
-        if "/" in campaign_id or "\\" in campaign_id or "\0" in campaign_id:
-            return False
-        # Only allow: alphanum, dash, underscore, space, dot, and unicode (emoji, CJK, etc.)
-        # Forbid any character not in the allowed set
-        if not re.fullmatch(r"[ \w\-.]+", campaign_id, re.UNICODE):
-            return False
-        # Forbid any occurrence of ".." anywhere in the campaign_id
-        if ".." in campaign_id:
-            return False
-        return True
+        # See packages/shared/campaign_paths.py for the rules
+        return get_campaign_paths().is_valid(campaign_id)
 
-    def __init__(self):
-        self._lock = asyncio.Lock()
+    def __init__(self, event_hub=None, store=None):
+        # Imported here: transcript_store imports this module for the JSONL store
+        from packages.shared.transcript_store import create_transcript_store
+
+        self.store = store or create_transcript_store()
+        self.event_hub = event_hub
 
-    async def log_message(self, campaign_id: str, author: str, message: str) -> None:
+    async def log_message(self, campaign_id: str, author: str, message: str) -> bool:
         """
-        Appends a structured log entry to the campaign's transcript log.
-        Non-blocking: uses asyncio.to_thread for file I/O.
-        Rotates the log if it exceeds MAX_LOG_SIZE_BYTES.
+        Appends a structured log entry to the campaign's transcript.
+        Non-blocking: the store does its I/O off the event loop. The write
+        is tracked by the shutdown coordinator, so shutdown waits for it.
+
+        Errors are logged rather than raised; returns False if the entry was
+        not stored (invalid campaign ID or a failed write).
         """
         if not self._is_valid_campaign_id(campaign_id):
-            print(f"[TranscriptLogger] Invalid campaign_id: {campaign_id!r}")
-            return
-        log_dir = os.path.join(LOG_BASE_DIR, campaign_id)
-        log_path = os.path.join(log_dir, "transcript.log")
+            logger.warning("Invalid campaign_id: %r", campaign_id)
+            return False
         entry = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "author": author,
             "message": message,
         }
         try:
-            os.makedirs(log_dir, exist_ok=True)
-            line = json.dumps(entry, ensure_ascii=False)
-            # Use a lock to avoid race conditions in concurrent writes and rotation
-            async with self._lock:
-                await asyncio.to_thread(self._rotate_if_needed, log_path)
-                await asyncio.to_thread(self._append_line, log_path, line)
+            async with get_shutdown_coordinator().work():
+                await self.store.append(campaign_id, entry)
+            # Published before yielding to the loop, so feed order matches
+            # the order entries were stored in
+            if self.event_hub is not None:
+                self.event_hub.publish(campaign_id, entry)
         except Exception as e:
             # Optionally, integrate with shared error handler
-            print(f"[TranscriptLogger] Error writing log: {e}")
+            logger.error(f"Error writing log: {e}")
+            return False
+        return True
+
+
+class JsonlTranscriptStore(TranscriptStore):
+    """
+    The default transcript store: JSONL entries in
+    <base_dir>/<campaign_id>/transcript.log, rotated by size. base_dir
+    defaults to LOG_BASE_DIR, read at call time.
+
+    Each entry is appended with a single write() so other processes never
+    see half of it. How far it is synced before `append` returns depends on
+    `durability` (TRANSCRIPT_DURABILITY, see transcript_durability.py). The
+    first write to a transcript in a process trims a partial line left at
+    its end by a crash.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, durability: Optional[str] = None):
+        self._base_dir = base_dir
+        self.durability = durability_mode(durability)
+        # Serializes writes and rotation
+        self._lock = asyncio.Lock()
+
+    @property
+    def base_dir(self) -> str:
+        return self._base_dir or LOG_BASE_DIR
+
+    async def append(self, campaign_id: str, entry: Dict[str, Any]) -> None:
+        data = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        async with self._lock:
+            commit = await asyncio.to_thread(
+                self._write, campaign_id, self.base_dir, data, self.durability
+            )
+        if commit is not None:
+            # Awaited outside the lock so later entries join the same commit
+            await asyncio.wrap_future(commit)
+
+    @classmethod
+    def _write(
+        cls, campaign_id: str, base_dir: str, data: bytes, durability: str = "none"
+    ) -> Optional[Future]:
+        paths = get_campaign_paths()
+        log_path = paths.path(campaign_id, base_dir, TRANSCRIPT_FILE_NAME)
+        # Held so the campaign cannot be archived between the check and the write
+        with campaign_archive.campaign_lock(campaign_id, base_dir):
+            try:
+                return cls._write_locked(paths, campaign_id, base_dir, log_path, data, durability)
+            except FileNotFoundError:
+                # The directory was removed behind the path cache's back
+                # (e.g. archived by another worker): resolve it again
+                paths.forget(campaign_id, base_dir)
+                return cls._write_locked(paths, campaign_id, base_dir, log_path, data, durability)
+
+    @classmethod
+    def _write_locked(
+        cls,
+        paths: CampaignPathResolver,
+        campaign_id: str,
+        base_dir: str,
+        log_path: str,
+        data: bytes,
+        durability: str,
+    ) -> Optional[Future]:
+        log_dir = paths.ensure_dir(
+            campaign_id, base_dir, on_missing=campaign_archive.restore_if_archived
+        )
+        if log_path not in _recovered_paths:
+            trim_partial_tail(log_path)
+            _recovered_paths.add(log_path)
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # One fstat instead of exists/getsize calls: the size decides both
+        # rotation and whether the file is new (its entry in the directory
+        # then needs syncing too)
+        size = os.fstat(fd).st_size
+        if size >= MAX_LOG_SIZE_BYTES:
+            os.close(fd)
+            cls._rotate_if_needed(log_path)
+            fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            size = 0
+        return cls._append_fd(fd, data, durability, log_dir if size == 0 else None)
+
+    def iter_entries(self, campaign_id: str) -> Iterator[Dict[str, Any]]:
+        campaign_archive.restore_if_archived(campaign_id, self.base_dir)
+        for path in transcript_segments(campaign_id, self.base_dir):
+            yield from read_entries(path)
+
+    def campaign_ids(self) -> List[str]:
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.base_dir)
+            if TranscriptLogger._is_valid_campaign_id(name)
+            and transcript_segments(name, self.base_dir)
+        )
 
     @staticmethod
-    def _append_line(path: str, line: str) -> None:
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+    def _append_fd(
+        fd: int, data: bytes, durability: str = "none", new_in: Optional[str] = None
+    ) -> Optional[Future]:
+        """Append one encoded entry to an open transcript; see transcript_durability.commit_write."""
+        try:
+            write_all(fd, data)
+        except BaseException:
+            os.close(fd)
+            raise
+        return commit_write(fd, durability, new_in)
 
     @staticmethod
-    def _rotate_if_needed(log_path: str) -> None:
-        """Rotate the log file if it exceeds MAX_LOG_SIZE_BYTES."""
+    def _rotate_if_needed(log_path: str) -> bool:
+        """Rotate the log file if it exceeds MAX_LOG_SIZE_BYTES. Returns True if it did."""
         if os.path.exists(log_path) and os.path.getsize(log_path) >= MAX_LOG_SIZE_BYTES:
             # Remove the oldest rotated log if it exists
             oldest = f"{log_path}.{MAX_ROTATED_LOGS}"
@@ -100,3 +209,61 @@ class TranscriptLogger:
                     os.rename(src, dst)
             # Rotate current log
             os.rename(log_path, f"{log_path}.1")
+            return True
+        return False
+
+
+def transcript_segments(campaign_id: str, base_dir: Optional[str] = None) -> List[str]:
+    """
+    Existing transcript files of a campaign, oldest first: the rotated
+    segments (transcript.log.N ... transcript.log.1) followed by the current
+    transcript.log.
+    """
+    log_dir = get_campaign_paths().campaign_dir(campaign_id, base_dir or LOG_BASE_DIR)
+    if not os.path.isdir(log_dir):
+        return []
+    rotated = []
+    for name in os.listdir(log_dir):
+        suffix = name[len(TRANSCRIPT_FILE_NAME) + 1 :]
+        if name.startswith(TRANSCRIPT_FILE_NAME + ".") and suffix.isdigit():
+            rotated.append((int(suffix), os.path.join(log_dir, name)))
+    segments = [path for _, path in sorted(rotated, reverse=True)]
+    current = os.path.join(log_dir, TRANSCRIPT_FILE_NAME)
+    if os.path.exists(current):
+        segments.append(current)
+    return segments
+
+
+def read_entries(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the JSON entries of one transcript file without loading it whole.
+
+    The file is decoded chunk by chunk with JSONDecoder.raw_decode, so memory
+    stays bounded by the chunk size plus one entry. A malformed line is
+    logged and skipped; an incomplete trailing entry (a write cut short) is
+    ignored.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            pos = 0
+            while True:
+                pos = _WHITESPACE_RE.match(buffer, pos).end()
+                if pos == len(buffer):
+                    break
+                try:
+                    entry, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    newline = buffer.find("\n", pos)
+                    if newline == -1:
+                        break  # Incomplete entry; wait for the next chunk
+                    logger.warning("Skipping malformed transcript line in %s", path)
+                    pos = newline + 1
+                    continue
+                yield entry
+            buffer = buffer[pos:]
+            if not chunk:
+                return
@@ -0,0 +1,452 @@
+"""
+Compact binary transcript segments (TRANSCRIPT_STORE=segment).
+
+A campaign's entries are appended to numbered segment files in
+<base_dir>/<campaign_id>/segments/ (00000001.seg, 00000002.seg, ...). A
+segment is sealed and the next one started once it reaches
+TRANSCRIPT_SEGMENT_MAX_BYTES (default 1 MB).
+
+Layout of a segment (little-endian):
+
+    SEGMENT_MAGIC
+    record*             u32 payload length, u8 type, payload
+    [index record]      sealed segments only
+    [trailer]           u64 index record offset, u32 entry count, INDEX_MAGIC
+
+Record types:
+
+- RECORD_AUTHOR: u32 author ID, UTF-8 name. Authors are interned per
+  segment; the definition precedes the author's first entry.
+- RECORD_ENTRY: i64 timestamp (microseconds since the epoch, UTC), u32
+  author ID, UTF-8 message.
+- RECORD_INDEX: u32 author count, then per author a u16 length and the
+  UTF-8 name (in ID order), then a u64 offset for every entry record.
+
+`SegmentReader` maps a segment into memory. A sealed segment is read
+through its footer, so any entry is one offset lookup away; the segment
+still being written is scanned once on open. Timestamps are returned as UTC
+ISO 8601 strings, the format TranscriptLogger writes.
+
+The JSONL form stays available: `GET /campaigns/{id}/transcript` streams
+any store as JSONL.
+"""
+
+import asyncio
+import mmap
+import os
+import shutil
+import struct
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writers are then single-process only
+    fcntl = None
+
+from packages.shared import campaign_archive, transcript_logger
+from packages.shared.campaign_paths import CampaignPathResolver, get_campaign_paths
+from packages.shared.transcript_durability import commit_write, durability_mode, write_all
+from packages.shared.transcript_store import Entry, TranscriptStore
+
+SEGMENT_DIR_NAME = "segments"
+SEGMENT_SUFFIX = ".seg"
+SEGMENT_MAGIC = b"AIDMSEG1"
+INDEX_MAGIC = b"AIDMIDX1"
+DEFAULT_SEGMENT_MAX_BYTES = 1024 * 1024
+
+RECORD_AUTHOR = 1
+RECORD_ENTRY = 2
+RECORD_INDEX = 3
+
+_RECORD_HEADER = struct.Struct("<IB")
+_AUTHOR_ID = struct.Struct("<I")
+_ENTRY_HEADER = struct.Struct("<qI")
+_NAME_LENGTH = struct.Struct("<H")
+_OFFSET = struct.Struct("<Q")
+_TRAILER = struct.Struct("<QI8s")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def timestamp_to_micros(timestamp: str) -> int:
+    moment = datetime.fromisoformat(timestamp)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def micros_to_timestamp(micros: int) -> str:
+    return (_EPOCH + micros * _MICROSECOND).isoformat()
+
+
+def _record(record_type: int, payload: bytes) -> bytes:
+    return _RECORD_HEADER.pack(len(payload), record_type) + payload
+
+
+class SegmentReader:
+    """
+    Random access to the entries of one segment through mmap. Supports
+    len(), indexing (including negative indexes) and iteration; close it, or
+    use it as a context manager, to release the mapping.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self._mm[: len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a transcript segment")
+        self.authors: List[str] = []
+        self._offsets: List[int] = []
+        self._index_at = 0
+        self._count = 0
+        self._second: Optional[int] = None
+        self._second_text = ""
+        self.sealed = self._read_footer(size)
+        if not self.sealed:
+            self.end = self._scan(len(SEGMENT_MAGIC), size)
+
+    def _read_footer(self, size: int) -> bool:
+        if size < len(SEGMENT_MAGIC) + _TRAILER.size:
+            return False
+        index_offset, count, magic = _TRAILER.unpack_from(self._mm, size - _TRAILER.size)
+        if magic != INDEX_MAGIC or index_offset >= size:
+            return False
+        length, record_type = _RECORD_HEADER.unpack_from(self._mm, index_offset)
+        index_end = index_offset + _RECORD_HEADER.size + length
+        if record_type != RECORD_INDEX or index_end != size - _TRAILER.size:
+            return False
+        position = index_offset + _RECORD_HEADER.size
+        (author_count,) = _AUTHOR_ID.unpack_from(self._mm, position)
+        position += _AUTHOR_ID.size
+        for _ in range(author_count):
+            (name_length,) = _NAME_LENGTH.unpack_from(self._mm, position)
+            position += _NAME_LENGTH.size
+            self.authors.append(str(self._mm[position : position + name_length], "utf-8"))
+            position += name_length
+        self._index_at, self._count = position, count
+        self.end = index_offset
+        return True
+
+    def _scan(self, position: int, size: int) -> int:
+        """Walk the records of an unsealed segment; returns where the valid records end."""
+        while position + _RECORD_HEADER.size <= size:
+            length, record_type = _RECORD_HEADER.unpack_from(self._mm, position)
+            payload = position + _RECORD_HEADER.size
+            if payload + length > size:
+                break  # Cut short by a crash
+            if record_type == RECORD_AUTHOR:
+                (author_id,) = _AUTHOR_ID.unpack_from(self._mm, payload)
+                name = str(self._mm[payload + _AUTHOR_ID.size : payload + length], "utf-8")
+                while len(self.authors) <= author_id:
+                    self.authors.append("")
+                self.authors[author_id] = name
+            elif record_type == RECORD_ENTRY:
+                self._offsets.append(position)
+            position = payload + length
+        self._count = len(self._offsets)
+        return position
+
+    def __len__(self) -> int:
+        return self._count
+
+    def offset(self, number: int) -> int:
+        if self.sealed:
+            return _OFFSET.unpack_from(self._mm, self._index_at + number * _OFFSET.size)[0]
+        return self._offsets[number]
+
+    def __getitem__(self, number: int) -> Entry:
+        if number < 0:
+            number += self._count
+        if not 0 <= number < self._count:
+            raise IndexError(number)
+        return self._decode(self.offset(number))
+
+    def _decode(self, position: int) -> Entry:
+        length, _ = _RECORD_HEADER.unpack_from(self._mm, position)
+        payload = position + _RECORD_HEADER.size
+        micros, author_id = _ENTRY_HEADER.unpack_from(self._mm, payload)
+        seconds, micro = divmod(micros, 1_000_000)
+        if seconds != self._second:
+            # Entries often share a second; format it once
+            self._second = seconds
+            self._second_text = (_EPOCH + timedelta(seconds=seconds)).isoformat()[:-6]
+        timestamp = f"{self._second_text}.{micro:06d}+00:00" if micro else self._second_text + "+00:00"
+        return {
+            "timestamp": timestamp,
+            "author": self.authors[author_id],
+            "message": str(self._mm[payload + _ENTRY_HEADER.size : payload + length], "utf-8"),
+        }
+
+    def __iter__(self) -> Iterator[Entry]:
+        if self.sealed:
+            index = self._mm[self._index_at : self._index_at + self._count * _OFFSET.size]
+            offsets = (offset for (offset,) in _OFFSET.iter_unpack(index))
+        else:
+            offsets = iter(self._offsets)
+        decode = self._decode
+        for offset in offsets:
+            yield decode(offset)
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    def __enter__(self) -> "SegmentReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _ActiveSegment(NamedTuple):
+    """What a writer knows about the segment it appends to."""
+
+    path: str
+    end: int
+    authors: Dict[str, int]
+    entries: int
+
+
+def segment_paths(segment_dir: str) -> List[str]:
+    """Segment files of a campaign, oldest first."""
+    try:
+        names = os.listdir(segment_dir)
+    except FileNotFoundError:
+        return []
+    numbered = sorted(
+        (int(name[: -len(SEGMENT_SUFFIX)]), name)
+        for name in names
+        if name.endswith(SEGMENT_SUFFIX) and name[: -len(SEGMENT_SUFFIX)].isdigit()
+    )
+    return [os.path.join(segment_dir, name) for _, name in numbered]
+
+
+def _segment_name(number: int) -> str:
+    return f"{number:08d}{SEGMENT_SUFFIX}"
+
+
+class SegmentTranscriptStore(TranscriptStore):
+    """
+    Transcripts as binary segments under <base_dir>/<campaign_id>/segments/
+    (base_dir defaults to LOG_BASE_DIR, read at call time).
+
+    Appends follow TRANSCRIPT_DURABILITY like the JSONL store. Each writer
+    caches the author IDs and end offset of the segments it appends to and
+    rescans a segment when its size differs (another process appended, or a
+    crash left a partial record, which is then truncated). Writes from
+    different processes are serialized with flock.
+    """
+
+    def __init__(
+        self,
+        base_dir: Optional[str] = None,
+        durability: Optional[str] = None,
+        max_segment_bytes: Optional[int] = None,
+    ):
+        self._base_dir = base_dir
+        self.durability = durability_mode(durability)
+        self.max_segment_bytes = max_segment_bytes or int(
+            os.getenv("TRANSCRIPT_SEGMENT_MAX_BYTES", DEFAULT_SEGMENT_MAX_BYTES)
+        )
+        # Segment directory -> the segment currently appended to
+        self._active: Dict[str, _ActiveSegment] = {}
+        # Serializes this store's writes
+        self._lock = asyncio.Lock()
+
+    @property
+    def base_dir(self) -> str:
+        return self._base_dir or transcript_logger.LOG_BASE_DIR
+
+    def segment_dir(self, campaign_id: str) -> str:
+        return get_campaign_paths().path(campaign_id, self.base_dir, SEGMENT_DIR_NAME)
+
+    async def append(self, campaign_id: str, entry: Entry) -> None:
+        async with self._lock:
+            commit = await asyncio.to_thread(self.append_sync, campaign_id, entry)
+        if commit is not None:
+            # Awaited outside the lock so later entries join the same commit
+            await asyncio.wrap_future(commit)
+
+    def append_sync(self, campaign_id: str, entry: Entry) -> Optional[Future]:
+        """
+        Append one entry from a worker thread. Returns the group commit to
+        wait for, if any (see transcript_durability.commit_write).
+        """
+        micros = timestamp_to_micros(entry["timestamp"])
+        author = str(entry.get("author", ""))
+        message = str(entry.get("message", "")).encode("utf-8")
+        paths = get_campaign_paths()
+        with campaign_archive.campaign_lock(campaign_id, self.base_dir):
+            try:
+                return self._append_locked(paths, campaign_id, micros, author, message)
+            except FileNotFoundError:
+                # The directory was removed behind the path cache's back
+                # (e.g. archived by another worker): resolve it again
+                paths.forget(campaign_id, self.base_dir)
+                self._active.pop(self.segment_dir(campaign_id), None)
+                return self._append_locked(paths, campaign_id, micros, author, message)
+
+    def _append_locked(
+        self,
+        paths: CampaignPathResolver,
+        campaign_id: str,
+        micros: int,
+        author: str,
+        message: bytes,
+    ) -> Optional[Future]:
+        segment_dir = paths.ensure_dir(
+            campaign_id,
+            self.base_dir,
+            SEGMENT_DIR_NAME,
+            on_missing=campaign_archive.restore_if_archived,
+        )
+        while True:
+            active = self._active.get(segment_dir)
+            path = active.path if active else self._current_path(segment_dir)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                size = os.fstat(fd).st_size
+                if active is None or active.end != size:
+                    active = self._load(fd, path, size)
+                if active is None:
+                    # Sealed by another writer; move on to the next segment
+                    self._active[segment_dir] = self._next(path)
+                    os.close(fd)
+                    continue
+                active = self._write_entry(fd, active, micros, author, message)
+                if active.end >= self.max_segment_bytes:
+                    self._seal(fd, path, active.end)
+                    self._active[segment_dir] = self._next(path)
+                else:
+                    self._active[segment_dir] = active
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            except BaseException:
+                os.close(fd)
+                raise
+            return commit_write(fd, self.durability, segment_dir if size == 0 else None)
+
+    def append_many(self, rows: Iterable[tuple]) -> int:
+        """Append (campaign_id, entry) pairs from a worker thread. Returns the count."""
+        commits, count = [], 0
+        for campaign_id, entry in rows:
+            commit = self.append_sync(campaign_id, entry)
+            if commit is not None:
+                commits.append(commit)
+            count += 1
+        for commit in commits:
+            commit.result()
+        return count
+
+    @staticmethod
+    def _current_path(segment_dir: str) -> str:
+        paths = segment_paths(segment_dir)
+        return paths[-1] if paths else os.path.join(segment_dir, _segment_name(1))
+
+    @staticmethod
+    def _next(path: str) -> _ActiveSegment:
+        number = int(os.path.basename(path)[: -len(SEGMENT_SUFFIX)]) + 1
+        next_path = os.path.join(os.path.dirname(path), _segment_name(number))
+        return _ActiveSegment(next_path, -1, {}, 0)
+
+    @staticmethod
+    def _load(fd: int, path: str, size: int) -> Optional[_ActiveSegment]:
+        """Writer state of a segment from its contents; None if it is sealed."""
+        if size < len(SEGMENT_MAGIC):
+            # New, or created just before a crash
+            os.ftruncate(fd, 0)
+            write_all(fd, SEGMENT_MAGIC)
+            return _ActiveSegment(path, len(SEGMENT_MAGIC), {}, 0)
+        with SegmentReader(path) as reader:
+            if reader.sealed:
+                return None
+            if reader.end < size:
+                os.ftruncate(fd, reader.end)
+            authors = {name: author_id for author_id, name in enumerate(reader.authors)}
+            return _ActiveSegment(path, reader.end, authors, len(reader))
+
+    @staticmethod
+    def _write_entry(
+        fd: int, active: _ActiveSegment, micros: int, author: str, message: bytes
+    ) -> _ActiveSegment:
+        data = b""
+        author_id = active.authors.get(author)
+        authors = active.authors
+        if author_id is None:
+            author_id = len(authors)
+            authors = {**authors, author: author_id}
+            data += _record(RECORD_AUTHOR, _AUTHOR_ID.pack(author_id) + author.encode("utf-8"))
+        data += _record(RECORD_ENTRY, _ENTRY_HEADER.pack(micros, author_id) + message)
+        write_all(fd, data)
+        return _ActiveSegment(active.path, active.end + len(data), authors, active.entries + 1)
+
+    @staticmethod
+    def _seal(fd: int, path: str, end: int) -> None:
+        """Append the footer index, making the segment read-only."""
+        with SegmentReader(path) as reader:
+            offsets = [reader.offset(number) for number in range(len(reader))]
+            payload = bytearray(_AUTHOR_ID.pack(len(reader.authors)))
+            for name in reader.authors:
+                encoded = name.encode("utf-8")
+                payload += _NAME_LENGTH.pack(len(encoded)) + encoded
+        payload += struct.pack(f"<{len(offsets)}Q", *offsets)
+        trailer = _TRAILER.pack(end, len(offsets), INDEX_MAGIC)
+        write_all(fd, _record(RECORD_INDEX, bytes(payload)) + trailer)
+
+    def readers(self, campaign_id: str) -> List[SegmentReader]:
+        """Readers of every segment of a campaign, oldest first; close them after use."""
+        campaign_archive.restore_if_archived(campaign_id, self.base_dir)
+        return [SegmentReader(path) for path in segment_paths(self.segment_dir(campaign_id))]
+
+    def iter_entries(self, campaign_id: str) -> Iterator[Entry]:
+        campaign_archive.restore_if_archived(campaign_id, self.base_dir)
+        for path in segment_paths(self.segment_dir(campaign_id)):
+            with SegmentReader(path) as reader:
+                yield from reader
+
+    def recent_entries(self, campaign_id: str, limit: int) -> List[Entry]:
+        """The last `limit` entries, oldest first, read without scanning older segments."""
+        entries: List[Entry] = []
+        readers = self.readers(campaign_id)
+        try:
+            for reader in reversed(readers):
+                take = min(limit - len(entries), len(reader))
+                entries[:0] = [reader[number] for number in range(len(reader) - take, len(reader))]
+                if len(entries) >= limit:
+                    break
+        finally:
+            for reader in readers:
+                reader.close()
+        return entries
+
+    def count(self, campaign_id: str) -> int:
+        readers = self.readers(campaign_id)
+        try:
+            return sum(len(reader) for reader in readers)
+        finally:
+            for reader in readers:
+                reader.close()
+
+    def campaign_ids(self) -> List[str]:
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.base_dir)
+            if transcript_logger.TranscriptLogger._is_valid_campaign_id(name)
+            and segment_paths(self.segment_dir(name))
+        )
+
+    def delete_campaign(self, campaign_id: str) -> None:
+        segment_dir = self.segment_dir(campaign_id)
+        with campaign_archive.campaign_lock(campaign_id, self.base_dir):
+            self._active.pop(segment_dir, None)
+            shutil.rmtree(segment_dir, ignore_errors=True)
+            get_campaign_paths().forget(campaign_id, self.base_dir)
@@ -0,0 +1,319 @@
+"""
+Storage backends for campaign transcripts.
+
+`TranscriptStore` is the interface `TranscriptLogger` writes through. Two
+backends exist, selected with TRANSCRIPT_STORE:
+
+- "jsonl" (default): `JsonlTranscriptStore` in transcript_logger.py, the
+  rotated data/saves/<campaign_id>/transcript.log files.
+- "sqlite": `SQLiteTranscriptStore` below, one database
+  (TRANSCRIPT_SQLITE_PATH, default data/transcripts.db) indexed by
+  (campaign_id, timestamp) and author, with a trigram FTS5 index over
+  messages so text search is the same substring match as the other stores.
+- "segment": `SegmentTranscriptStore` in transcript_segment_store.py,
+  compact binary segments with a footer index for random access.
+
+Existing JSONL transcripts can be copied into SQLite with
+`python -m packages.backend.tools.migrate_transcripts`.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from packages.shared.transcript_durability import durability_mode
+
+SQLITE_DEFAULT_PATH = os.path.join("data", "transcripts.db")
+DEFAULT_BATCH_SIZE = 256  # Entries inserted per transaction
+TRANSCRIPT_STORES = ("jsonl", "sqlite", "segment")
+# Shortest text the trigram index can match; shorter text is scanned with LIKE
+MIN_INDEXED_TEXT = 3
+
+Entry = Dict[str, Any]
+
+
+class TranscriptStore(ABC):
+    """Append-only transcript storage keyed by campaign."""
+
+    @abstractmethod
+    async def append(self, campaign_id: str, entry: Entry) -> None:
+        """Persist one entry ({"timestamp", "author", "message"})."""
+
+    @abstractmethod
+    def iter_entries(self, campaign_id: str) -> Iterator[Entry]:
+        """All entries of a campaign, oldest first."""
+
+    @abstractmethod
+    def campaign_ids(self) -> List[str]:
+        """Campaigns with at least one entry."""
+
+    def query(
+        self,
+        campaign_id: str,
+        author: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Entry]:
+        """
+        Entries of a campaign filtered by author, ISO timestamp range
+        [since, until) and case-insensitive text, oldest first. This default
+        scans every entry; indexed backends override it.
+        """
+        needle = text.lower() if text else None
+        results = []
+        for entry in self.iter_entries(campaign_id):
+            if author is not None and entry.get("author") != author:
+                continue
+            timestamp = entry.get("timestamp", "")
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp >= until:
+                continue
+            if needle is not None and needle not in str(entry.get("message", "")).lower():
+                continue
+            results.append(entry)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def close(self) -> None:
+        """Release resources held by the store."""
+
+
+class SQLiteTranscriptStore(TranscriptStore):
+    """
+    Transcripts in one SQLite database.
+
+    Concurrent `append` calls are grouped: entries queued while a batch is
+    being written go into the next transaction (up to `batch_size` entries
+    each), so a busy campaign costs one commit per batch rather than per
+    message. `append` returns once its entry is committed.
+
+    TRANSCRIPT_DURABILITY maps onto SQLite's own sync setting: "none" keeps
+    synchronous=NORMAL (WAL commits are not synced), while "group-commit"
+    and "always" use synchronous=FULL. Commits are already grouped, so both
+    sync once per batch.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        durability: Optional[str] = None,
+    ):
+        self.db_path = db_path or os.getenv("TRANSCRIPT_SQLITE_PATH", SQLITE_DEFAULT_PATH)
+        self.batch_size = batch_size
+        self.durability = durability_mode(durability)
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        with self._lock:
+            self._init_db()
+
+    def _init_db(self) -> None:
+        if self.db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            synchronous = "NORMAL" if self.durability == "none" else "FULL"
+            self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS transcript_entries (
+                    id INTEGER PRIMARY KEY,
+                    campaign_id TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    message TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_transcript_campaign_time
+                    ON transcript_entries (campaign_id, timestamp);
+                CREATE INDEX IF NOT EXISTS idx_transcript_author
+                    ON transcript_entries (author);
+                CREATE VIRTUAL TABLE IF NOT EXISTS transcript_fts USING fts5(
+                    message, content='transcript_entries', content_rowid='id',
+                    tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS transcript_fts_insert
+                AFTER INSERT ON transcript_entries BEGIN
+                    INSERT INTO transcript_fts (rowid, message) VALUES (new.id, new.message);
+                END;
+                CREATE TRIGGER IF NOT EXISTS transcript_fts_delete
+                AFTER DELETE ON transcript_entries BEGIN
+                    INSERT INTO transcript_fts (transcript_fts, rowid, message)
+                    VALUES ('delete', old.id, old.message);
+                END;
+                """
+            )
+
+    async def append(self, campaign_id: str, entry: Entry) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((campaign_id, entry, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_pending())
+        await future
+
+    async def _flush_pending(self) -> None:
+        while self._pending:
+            batch = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            try:
+                await asyncio.to_thread(
+                    self.append_many, [(cid, entry) for cid, entry, _ in batch]
+                )
+            except Exception as exc:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+
+    def append_many(self, rows: Iterable[tuple]) -> int:
+        """Insert (campaign_id, entry) pairs in one transaction. Returns the count."""
+        values = [
+            (cid, e.get("timestamp", ""), e.get("author", ""), e.get("message", ""))
+            for cid, e in rows
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO transcript_entries (campaign_id, timestamp, author, message)"
+                " VALUES (?, ?, ?, ?)",
+                values,
+            )
+        return len(values)
+
+    def delete_campaign(self, campaign_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM transcript_entries WHERE campaign_id = ?", (campaign_id,)
+            )
+
+    def count(self, campaign_id: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM transcript_entries WHERE campaign_id = ?",
+                (campaign_id,),
+            ).fetchone()[0]
+
+    def iter_entries(self, campaign_id: str) -> Iterator[Entry]:
+        # Page by rowid so the lock is not held while the caller iterates
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, timestamp, author, message FROM transcript_entries"
+                    " WHERE campaign_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (campaign_id, last_id, self.batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_entry(row)
+            last_id = rows[-1]["id"]
+
+    def campaign_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT campaign_id FROM transcript_entries ORDER BY campaign_id"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def query(
+        self,
+        campaign_id: str,
+        author: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Entry]:
+        """
+        Like TranscriptStore.query. `text` is a plain substring, looked up in
+        the trigram index (shorter than MIN_INDEXED_TEXT: a LIKE scan of the
+        campaign, case-insensitive for ASCII only).
+        """
+        sql = "SELECT e.id, e.timestamp, e.author, e.message FROM transcript_entries e"
+        where = ["e.campaign_id = ?"]
+        params: List[Any] = [campaign_id]
+        if text and len(text) >= MIN_INDEXED_TEXT:
+            sql += " JOIN transcript_fts f ON f.rowid = e.id"
+            where.append("transcript_fts MATCH ?")
+            # One quoted phrase, so punctuation and words like AND are literal
+            params.append('"' + text.replace('"', '""') + '"')
+        elif text:
+            where.append("e.message LIKE ? ESCAPE '\\'")
+            escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        if author is not None:
+            where.append("e.author = ?")
+            params.append(author)
+        if since is not None:
+            where.append("e.timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("e.timestamp < ?")
+            params.append(until)
+        sql += " WHERE " + " AND ".join(where) + " ORDER BY e.timestamp, e.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_row_to_entry(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _row_to_entry(row: sqlite3.Row) -> Entry:
+    return {"timestamp": row["timestamp"], "author": row["author"], "message": row["message"]}
+
+
+_sqlite_store: Optional[SQLiteTranscriptStore] = None
+
+
+def create_transcript_store(
+    kind: Optional[str] = None, base_dir: Optional[str] = None, shared: bool = True
+):
+    """
+    Store selected by `kind` or TRANSCRIPT_STORE. The SQLite store is shared
+    by the whole process unless `shared` is False (e.g. in worker processes,
+    which must not reuse a connection opened before a fork); JSONL and
+    segment stores are cheap and created per caller.
+    """
+    global _sqlite_store
+    kind = (kind or os.getenv("TRANSCRIPT_STORE", "jsonl")).lower()
+    if kind == "jsonl":
+        from packages.shared.transcript_logger import JsonlTranscriptStore
+
+        return JsonlTranscriptStore(base_dir)
+    if kind == "segment":
+        from packages.shared.transcript_segment_store import SegmentTranscriptStore
+
+        return SegmentTranscriptStore(base_dir)
+    if kind == "sqlite":
+        if not shared:
+            return SQLiteTranscriptStore()
+        if _sqlite_store is None:
+            _sqlite_store = SQLiteTranscriptStore()
+        return _sqlite_store
+    raise ValueError(f"TRANSCRIPT_STORE must be one of {list(TRANSCRIPT_STORES)}, not {kind!r}")
+
+
+def close_shared_store() -> None:
+    """Close the process-wide SQLite store, if one was opened (at shutdown)."""
+    global _sqlite_store
+    store, _sqlite_store = _sqlite_store, None
+    if store is not None:
+        store.close()